@@ -0,0 +1,280 @@
+"""
+Speed benchmarks for the solver backends.
+
+    python benchmark.py [--backends NAME ...] [--corpora NAME ...]
+                        [--strategies NAME ...]
+                        [--corpus NAME=FILE] [--repeat N] [--timeout S]
+                        [--output FILE] [--compare BASELINE]
+                        [--threshold FRACTION]
+
+Every backend is run over every corpus, and for each pair we report
+the median, p95 and p99 latency of a single solve, the puzzles solved
+per second, the search nodes per puzzle and the peak memory of a
+solve. The bitmask backend is run once per strategy, so the search
+nodes of the row-major and most-constrained-first orders can be
+compared. The results can be written as JSON with --output, and checked
+against a saved baseline with --compare: the run fails (exit status
+1) if the throughput of any pair dropped by more than the threshold.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from board import Board
+from corpus import read_puzzles
+from oop_solver import (BACKENDS, BITMASK, DLX, MRV, ROW_MAJOR, STRATEGIES,
+                        SudokuSolver)
+from result import BUDGET_EXCEEDED
+
+# The standard corpora, in the one-line format. They start from the
+# puzzles in test_solver.py and test_oop_solver.py.
+CORPORA = {
+    'easy': (
+        '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
+        '006007300001000040000420050070905000025600000900000800080004030700090060000302400',
+    ),
+    'hard': (
+        '005300000800000020070010500400005300010070006003200080060500009004000030000009700',
+        '100007090030020008009600500005300900010080002600004000300000010040000007007000300',
+    ),
+    'minimal-17': (
+        '400000805030000000000700000020000060000080400000010000000603070500200000104000000',
+        '000000010400000000020000000000050407008000300001090000300400200050100000000806000',
+        '000000012000035000000600070700000300000400800100000000000120000080000040050000600',
+        '000000012003600000000007000410020000000500300700000600280000040000300500000000000',
+        '000000012008030000000000040120500000000004700060000000507000300000620000000100000',
+    ),
+    'unsolvable': (
+        # Valid givens, but every branch of the search has to be
+        # explored to prove there is no solution.
+        '400100805030000000000700000020000060000080400000010000000603070500200000104000000',
+        '000000702000000702020817009562798104137042890090351627273900000609004073810273956',
+        '600195000600195000098000060800060003400803001700020006060000280000419005000080079',
+    ),
+}
+
+# The list-scan backend takes minutes on the hard corpora, so it is
+# only run when asked for.
+DEFAULT_BACKENDS = (BITMASK, DLX)
+# The strategies the bitmask backend is run with. The others only have
+# one order: list-scan is row-major, and DLX always picks the column
+# with the fewest rows.
+DEFAULT_STRATEGIES = (ROW_MAJOR, MRV)
+STRATEGY_BACKENDS = (BITMASK,)
+# The largest drop in puzzles per second allowed by --compare.
+DEFAULT_THRESHOLD = 0.10
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the sorted list values,
+    e.g. fraction=0.95 for p95.
+    """
+    rank = max(1, -(-len(values) * fraction // 1))
+    return values[int(rank) - 1]
+
+
+def solveOnce(line: str, backend: str, timeout=None, strategy=ROW_MAJOR) -> tuple:
+    """
+    Solves one puzzle with the backend and strategy.
+
+    Returns a tuple (seconds, stats, result) where result is the
+    SolveResult and stats its SolveStats.
+    """
+    sudoku = SudokuSolver(Board.fromString(line).toRows())
+    start = time.perf_counter()
+    result = sudoku.solve(backend=backend, strategy=strategy, timeout=timeout,
+                          stats=True)
+    return time.perf_counter() - start, result.stats, result
+
+
+def runCorpus(puzzles, backend: str, repeat=5, timeout=None,
+              strategy=ROW_MAJOR) -> dict:
+    """
+    Benchmarks a backend on a corpus.
+
+    Takes as input:
+        - puzzles -> the puzzles, in the one-line format.
+        - backend -> one of BACKENDS.
+        - repeat -> the number of times each puzzle is solved.
+        - timeout -> seconds after which a solve is given up on.
+            Solves that give up count towards the latencies and
+            are also counted in budget_exceeded.
+        - strategy -> one of STRATEGIES.
+
+    Returns a dict of the metrics. Latencies are in milliseconds
+    and the peak memory, taken on a separate pass with tracemalloc
+    on, is in kilobytes.
+    """
+    puzzles = list(puzzles)
+    latencies = []
+    nodes = 0
+    exceeded = 0
+    for _ in range(repeat):
+        for line in puzzles:
+            seconds, stats, result = solveOnce(line, backend, timeout, strategy)
+            latencies.append(seconds)
+            nodes += stats.nodes
+            exceeded += result.status == BUDGET_EXCEEDED
+
+    peak = 0
+    for line in puzzles:
+        tracemalloc.start()
+        try:
+            solveOnce(line, backend, timeout, strategy)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'strategy': strategy,
+        'puzzles': len(puzzles),
+        'solves': len(latencies),
+        'median_ms': percentile(latencies, 0.5) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'puzzles_per_second': len(latencies) / total if total else 0.0,
+        'nodes_per_puzzle': nodes / len(latencies),
+        'peak_memory_kb': peak / 1024,
+        'budget_exceeded': exceeded,
+    }
+
+
+def runLabel(backend: str, strategy: str) -> str:
+    """
+    Returns the name a (backend, strategy) pair goes by in the
+    results: the backend alone for the row-major order, e.g.
+    'bitmask-mrv' otherwise.
+    """
+    return backend if strategy == ROW_MAJOR else f'{backend}-{strategy}'
+
+
+def runBenchmarks(corpora: dict, backends=DEFAULT_BACKENDS, repeat=5,
+                  timeout=None, strategies=DEFAULT_STRATEGIES) -> dict:
+    """
+    Runs runCorpus for every backend on every corpus (a dict of
+    name -> puzzles), once per strategy for the STRATEGY_BACKENDS
+    and once (row-major) for the others.
+
+    Returns the JSON-ready results:
+        {'python': ..., 'platform': ..., 'repeat': ...,
+         'results': {run: {corpus: metrics}}}
+    where run is the runLabel of the pair.
+    """
+    results = {}
+    for backend in backends:
+        for strategy in strategies if backend in STRATEGY_BACKENDS else (ROW_MAJOR,):
+            results[runLabel(backend, strategy)] = {
+                name: runCorpus(puzzles, backend, repeat, timeout, strategy)
+                for name, puzzles in corpora.items()}
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compareResults(current: dict, baseline: dict,
+                   threshold=DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Compares the throughput of two runBenchmarks results. Only the
+    (backend, corpus) pairs found in both are compared.
+
+    Returns a list of messages, one per pair whose puzzles per second
+    dropped by more than threshold (a fraction). Empty if there is
+    no regression.
+    """
+    regressions = []
+    for backend, corpora in current['results'].items():
+        for name, metrics in corpora.items():
+            before = baseline['results'].get(backend, {}).get(name)
+            if before is None or not before['puzzles_per_second']:
+                continue
+            change = metrics['puzzles_per_second'] / before['puzzles_per_second'] - 1
+            if change < -threshold:
+                regressions.append(
+                    f"{backend}/{name}: {metrics['puzzles_per_second']:.1f} "
+                    f"puzzles/s, {-change:.0%} slower than the baseline "
+                    f"({before['puzzles_per_second']:.1f} puzzles/s).")
+    return regressions
+
+
+def formatReport(report: dict) -> str:
+    """
+    Lays out the results of runBenchmarks as a table.
+    """
+    lines = [f"{'backend':<12} {'corpus':<12} {'median ms':>10} {'p95 ms':>10} "
+             f"{'p99 ms':>10} {'puzzles/s':>10} {'nodes':>10} {'peak KB':>9}"]
+    for backend, corpora in report['results'].items():
+        for name, m in corpora.items():
+            lines.append(
+                f"{backend:<12} {name:<12} {m['median_ms']:>10.3f} {m['p95_ms']:>10.3f} "
+                f"{m['p99_ms']:>10.3f} {m['puzzles_per_second']:>10.1f} "
+                f"{m['nodes_per_puzzle']:>10.1f} {m['peak_memory_kb']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def _corpusArgument(value: str) -> tuple:
+    name, sep, path = value.partition('=')
+    if not sep or not name or not path:
+        raise argparse.ArgumentTypeError("expected NAME=FILE")
+    return name, path
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='benchmark', description=__doc__.split('\n\n')[0])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS,
+                        default=list(DEFAULT_BACKENDS))
+    parser.add_argument('--corpora', nargs='+', choices=tuple(CORPORA),
+                        default=list(CORPORA),
+                        help="the standard corpora to run")
+    parser.add_argument('--strategies', nargs='+', choices=STRATEGIES,
+                        default=list(DEFAULT_STRATEGIES),
+                        help="search orders to run the bitmask backend with")
+    parser.add_argument('--corpus', action='append', type=_corpusArgument,
+                        default=[], metavar='NAME=FILE',
+                        help="an extra corpus file in the one-line format")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="times each puzzle is solved")
+    parser.add_argument('--timeout', type=float, default=None,
+                        help="seconds after which a solve is given up on")
+    parser.add_argument('--output', help="file to write the results to as JSON")
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help="JSON results to check the throughput against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="largest throughput drop allowed, as a fraction")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = buildParser().parse_args(argv)
+    corpora = {name: CORPORA[name] for name in args.corpora}
+    for name, path in args.corpus:
+        corpora[name] = [str(board) for board in read_puzzles(path)]
+
+    report = runBenchmarks(corpora, args.backends, args.repeat, args.timeout,
+                           args.strategies)
+    print(formatReport(report))
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compareResults(report, baseline, args.threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
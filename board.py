@@ -0,0 +1,134 @@
+# Translation tables between the one-line puzzle format (81
+# characters, '0' or '.' for empty cells) and cell values.
+# Anything that isn't a digit or '.' becomes INVALID_CELL.
+INVALID_CELL = 0xFF
+PARSE_TABLE = bytes(
+    ch - 48 if 48 <= ch <= 57 else 0 if ch == 46 else INVALID_CELL
+    for ch in range(256))
+FORMAT_TABLE = bytes(48 + value if value <= 9 else 63 for value in range(256))
+# Cell values 0 to 9 map to themselves; anything else is invalid.
+CHECK_TABLE = bytes(value if value <= 9 else INVALID_CELL for value in range(256))
+
+
+class Board:
+    """
+    A compact sudoku board: the 81 cell values in row-major order,
+    held in a single bytearray, with 0 for empty cells.
+
+    Boards parse straight from the one-line format (fromString) and
+    convert to and from the nested list format the rest of the solver
+    uses (fromRows, toRows) only when asked to.
+    """
+
+    __slots__ = ('cells',)
+
+    def __init__(self, cells=None) -> None:
+        """
+        Takes as input:
+            - cells -> 81 cell values (bytes, bytearray, memoryview or
+                any iterable of ints in range(10)). An empty board
+                if None.
+
+        Raises ValueError if cells is not 81 values in range(10).
+        """
+        if cells is None:
+            self.cells = bytearray(81)
+            return
+        cells = bytearray(cells)
+        if len(cells) != 81 or INVALID_CELL in cells.translate(CHECK_TABLE):
+            raise ValueError("A board needs 81 cell values in range(10).")
+        self.cells = cells
+
+    @classmethod
+    def fromString(cls, line) -> 'Board':
+        """
+        Parses a puzzle in the one-line format: 81 characters in
+        row-major order, with '0' or '.' for empty cells.
+
+        Takes as input a str, bytes, bytearray or memoryview.
+        Raises ValueError if the line is not a valid puzzle.
+        """
+        if isinstance(line, str):
+            line = line.encode('ascii', 'replace')
+        cells = bytearray(line).translate(PARSE_TABLE)
+        if len(cells) != 81 or INVALID_CELL in cells:
+            raise ValueError(f"Not a valid one-line sudoku: {bytes(line)[:90]!r}")
+        board = cls.__new__(cls)
+        board.cells = cells
+        return board
+
+    @classmethod
+    def fromRows(cls, puzzle) -> 'Board':
+        """
+        Builds a board from the nested format: 9 rows, each a list,
+        tuple or string of 9 integers or numeric strings.
+
+        Raises ValueError if puzzle is not a valid 9 x 9 sudoku.
+        """
+        if not isinstance(puzzle, (list, tuple)) or len(puzzle) != 9:
+            raise ValueError("Not a valid 9 X 9 sudoku.")
+        cells = bytearray()
+        for row in puzzle:
+            if not isinstance(row, (list, tuple, str)) or len(row) != 9:
+                raise ValueError("Not a valid 9 X 9 sudoku.")
+            # String rows go digit by digit, so '.' (empty in the
+            # one-line format only) is rejected here as it is there.
+            for num in row:
+                # Same rule as SudokuValidator: integers or numeric strings.
+                if not isinstance(num, (int, str)):
+                    raise ValueError("Not a valid 9 X 9 sudoku.")
+                try:
+                    cells.append(int(num))
+                except ValueError:
+                    raise ValueError("Not a valid 9 X 9 sudoku.") from None
+        if INVALID_CELL in cells.translate(CHECK_TABLE):
+            raise ValueError("Not a valid 9 X 9 sudoku.")
+        board = cls.__new__(cls)
+        board.cells = cells
+        return board
+
+    def toRows(self) -> list[list]:
+        """
+        Returns the board in the nested format: a list of 9 lists
+        of 9 integers.
+        """
+        cells = self.cells
+        return [list(cells[start:start + 9]) for start in range(0, 81, 9)]
+
+    def copy(self) -> 'Board':
+        board = Board.__new__(Board)
+        board.cells = bytearray(self.cells)
+        return board
+
+    def __getitem__(self, position: tuple) -> int:
+        row, col = position
+        return self.cells[row * 9 + col]
+
+    def __setitem__(self, position: tuple, value: int) -> None:
+        if not 0 <= value <= 9:
+            raise ValueError("Cell values should be in range(10).")
+        row, col = position
+        self.cells[row * 9 + col] = value
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self) -> int:
+        return 81
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Board):
+            return self.cells == other.cells
+        return NotImplemented
+
+    # Boards are mutable, so they can't be dictionary keys.
+    __hash__ = None
+
+    def __bytes__(self) -> bytes:
+        return bytes(self.cells)
+
+    def __str__(self) -> str:
+        return self.cells.translate(FORMAT_TABLE).decode('ascii')
+
+    def __repr__(self) -> str:
+        return f"Board('{self}')"
@@ -0,0 +1,106 @@
+import sys
+import time
+
+# How many search nodes go by between two checks of a budget. Checks
+# look at the clock, so we keep them rare enough not to show up in
+# the search time.
+CHECK_INTERVAL = 4096
+# What the next check is set to when there is no budget at all.
+NO_CHECK = sys.maxsize
+
+# Why a search was stopped.
+NODES = 'nodes'
+TIMEOUT = 'timeout'
+CANCELLED = 'cancelled'
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised by a search when its Budget runs out, and returned by
+    SudokuSolver.solveSudoku in place of a solution.
+
+    It is falsy, so code that only checks whether the solve
+    succeeded treats it like False.
+
+    Attributes:
+        - reason -> NODES, TIMEOUT or CANCELLED.
+        - nodes, backtracks, propagated -> the search statistics at
+            the time the search was stopped (filled in by the
+            solver).
+        - elapsed -> seconds spent on the solve (filled in by the
+            solver).
+    """
+
+    def __init__(self, reason: str) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.nodes = 0
+        self.backtracks = 0
+        self.propagated = 0
+        self.elapsed = 0.0
+
+    def __bool__(self) -> bool:
+        return False
+
+
+class Budget:
+    """
+    Limits on a single search: a number of nodes, a time limit and a
+    cancellation token.
+
+    Searches don't look at the budget on every node. They keep a
+    node count at which to call check next, and check hands back the
+    following one, at most CHECK_INTERVAL nodes later. A new search
+    starts with next_check at 0, and checks before each node:
+
+        if self.nodes >= self.next_check:
+            self.next_check = self.budget.check(self.nodes)
+        self.nodes += 1
+    """
+
+    def __init__(self, max_nodes=0, timeout=None, cancel=None) -> None:
+        """
+        Takes as input:
+            - max_nodes -> the most nodes the search may try. 0 means
+                no limit.
+            - timeout -> the most seconds the search may take, from
+                now. None means no limit.
+            - cancel -> a cancellation token: any object with an
+                is_set method, e.g. a threading.Event. The search
+                stops soon after it is set.
+
+        Raises ValueError if max_nodes or timeout is negative.
+        """
+        if max_nodes < 0:
+            raise ValueError("max_nodes can't be negative.")
+        if timeout is not None and timeout < 0:
+            raise ValueError("timeout can't be negative.")
+        self.max_nodes = max_nodes
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.cancel = cancel
+
+    def remaining(self) -> float | None:
+        """
+        Returns the seconds left before the deadline, or None if
+        there is no time limit.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self, nodes: int) -> int:
+        """
+        Raises BudgetExceeded if the search, having tried nodes
+        nodes, has to stop. Otherwise, returns the node count at
+        which to check again.
+        """
+        if self.cancel is not None and self.cancel.is_set():
+            raise BudgetExceeded(CANCELLED)
+        if self.max_nodes and nodes >= self.max_nodes:
+            raise BudgetExceeded(NODES)
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise BudgetExceeded(TIMEOUT)
+        next_check = nodes + CHECK_INTERVAL
+        if self.max_nodes:
+            next_check = min(next_check, self.max_nodes)
+        return next_check
@@ -0,0 +1,434 @@
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+
+from board import Board
+from canonical import canonicalize
+from dlx import DancingLinks
+from oop_solver import (BITMASK, DLX, MRV, BitmaskEngine, format_puzzle,
+                        parse_puzzle, solve_many)
+
+# How the cache picks the entry to drop when it is full.
+LRU = 'lru'   # The least recently used one.
+FIFO = 'fifo'  # The oldest one, however often it has been used since.
+EVICTIONS = (LRU, FIFO)
+
+DEFAULT_MAXSIZE = 1024
+# Stands for "not in the cache", as None is a cached result (the
+# puzzle has no solution).
+_MISSING = object()
+
+# PersistentCache reads and writes this many puzzles per query, which
+# keeps us under SQLite's limit on the number of query parameters.
+BATCH_SIZE = 500
+# Seconds a process waits for another one to finish writing to the
+# database before giving up.
+BUSY_TIMEOUT = 30.0
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS solutions (
+        puzzle TEXT PRIMARY KEY,
+        solution TEXT,
+        nodes INTEGER NOT NULL,
+        seconds REAL NOT NULL,
+        used REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)",
+)
+
+
+def _cellsOf(puzzle) -> bytearray:
+    """
+    Returns the 81 cell values of a puzzle in the one-line format
+    (str, bytes or Board) or the nested format.
+    Raises ValueError if the puzzle isn't valid.
+    """
+    if isinstance(puzzle, (list, tuple)):
+        return Board.fromRows(puzzle).cells
+    return parse_puzzle(puzzle)
+
+
+def _solveEntries(puzzles: list, backend: str, strategy: str,
+                  propagate: bool) -> list[tuple]:
+    """
+    Solves puzzles (in the one-line format), timing each solve.
+    Called by PersistentCache.solveMany, in this process or in a
+    worker.
+
+    Returns a list of (solution, nodes, seconds) tuples, one per
+    puzzle, with solution None if the puzzle has no solution.
+    """
+    engine = BitmaskEngine()
+    entries = []
+    for line in puzzles:
+        start = time.perf_counter()
+        cells = parse_puzzle(line)
+        if backend == DLX:
+            links = DancingLinks(cells)
+            solution = links.solve()
+            nodes = links.nodes
+        else:
+            solution = None
+            if engine.load(cells) and (not propagate or engine.propagate()):
+                empties = [idx for idx in range(81) if not engine.cells[idx]]
+                if engine.search(empties, strategy=strategy, propagate=propagate):
+                    solution = engine.cells
+            nodes = engine.nodes
+        if solution is not None:
+            solution = format_puzzle(solution)
+        entries.append((solution, nodes, time.perf_counter() - start))
+    return entries
+
+
+class SolutionCache:
+    """
+    A cache of solutions in front of the solver, shared by all the
+    puzzles that are the same up to a symmetry of the sudoku (see
+    canonical.py).
+
+    Each puzzle is turned into its canonical form. The solution of
+    the canonical form is looked up (or found and stored), then
+    turned back into a solution of the puzzle with the inverse of
+    the transform. Canonicalizing takes a few milliseconds, so the
+    cache pays off when solves are expensive or the same puzzles
+    (up to symmetry) come back often.
+
+    Attributes:
+        - hits, misses -> lookups that did and didn't find a
+            solution in the cache.
+        - evictions -> entries dropped to make room.
+        - bypasses -> puzzles with too much symmetry to
+            canonicalize, solved without the cache.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, eviction=LRU,
+                 backend=BITMASK, strategy=MRV, propagate=True) -> None:
+        """
+        Takes as input:
+            - maxsize -> the most solutions kept. 0 means no limit.
+            - eviction -> LRU or FIFO.
+            - backend, strategy, propagate -> as for solve_many.
+
+        Raises ValueError on an unknown eviction or backend, or a
+        negative maxsize.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize can't be negative.")
+        if eviction not in EVICTIONS:
+            raise ValueError(f"eviction must be one of {EVICTIONS}.")
+        if backend not in (BITMASK, DLX):
+            raise ValueError(
+                f"SolutionCache supports the {BITMASK!r} and {DLX!r} backends.")
+        self.maxsize = maxsize
+        self.eviction = eviction
+        self.backend = backend
+        self.strategy = strategy
+        self.propagate = propagate
+        # Canonical puzzle (as bytes) -> canonical solution (as an
+        # 81-character str), or None if there is no solution. The
+        # first entry is the next to be evicted.
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = self.bypasses = 0
+
+    def solve(self, puzzle) -> str | None:
+        """
+        Solves a puzzle, through the cache.
+
+        Takes as input a puzzle in the one-line format (str, bytes or
+        Board) or the nested format (9 rows of 9 integers or numeric
+        strings).
+
+        Returns the solution as an 81-character str, or None if the
+        puzzle has no solution. Raises ValueError if the puzzle isn't
+        valid.
+        """
+        cells = _cellsOf(puzzle)
+        found = canonicalize(cells)
+        if found is None:
+            self.bypasses += 1
+            return self._solve(cells)
+        canonical, transform = found
+
+        key = bytes(canonical)
+        solution = self.entries.get(key, _MISSING)
+        if solution is _MISSING:
+            self.misses += 1
+            solution = self._solve(canonical)
+            self._store(key, solution)
+        else:
+            self.hits += 1
+            if self.eviction == LRU:
+                self.entries.move_to_end(key)
+
+        if solution is None:
+            return None
+        return format_puzzle(transform.revert(parse_puzzle(solution)))
+
+    def _solve(self, cells) -> str | None:
+        return next(iter(solve_many([Board(cells)], self.strategy,
+                                    self.propagate, backend=self.backend)))
+
+    def _store(self, key: bytes, solution) -> None:
+        self.entries[key] = solution
+        if self.maxsize and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        Empties the cache and resets the counters.
+        """
+        self.entries.clear()
+        self.hits = self.misses = self.evictions = self.bypasses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return (f"SolutionCache(size={len(self)}, maxsize={self.maxsize}, "
+                f"hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, bypasses={self.bypasses})")
+
+
+class PersistentCache:
+    """
+    A cache of solutions kept in an SQLite database, so it outlives
+    the process and can be shared by several processes at once.
+
+    Each row maps a puzzle (in the one-line format, with '0' for
+    empty cells) to its solution, or to NULL if it has none, along
+    with the search nodes and the seconds the solve took. By default
+    puzzles are solved and stored by their canonical form (see
+    canonical.py), so a row serves every puzzle equivalent to it.
+    Canonicalizing costs a few milliseconds per puzzle, more than
+    most solves, so puzzles are also stored as given and looked up
+    that way first: rerunning a corpus is then just lookups. With
+    canonical=False, puzzles are only ever stored as given.
+
+    The database is in write-ahead logging mode: readers don't block
+    the writer, and writers take turns (waiting up to BUSY_TIMEOUT
+    seconds). Every process has to open its own PersistentCache.
+
+    Attributes:
+        - hits, misses, evictions, bypasses -> as for SolutionCache.
+    """
+
+    def __init__(self, path, maxsize=0, backend=BITMASK, strategy=MRV,
+                 propagate=True, canonical=True) -> None:
+        """
+        Takes as input:
+            - path -> the database file. It is created if need be.
+            - maxsize -> the most rows kept. When there are more, the
+                least recently used are deleted. 0 means no limit.
+            - backend, strategy, propagate -> as for solve_many.
+            - canonical -> whether puzzles are looked up by their
+                canonical form.
+
+        Raises ValueError on an unknown backend or a negative maxsize.
+        """
+        if maxsize < 0:
+            raise ValueError("maxsize can't be negative.")
+        if backend not in (BITMASK, DLX):
+            raise ValueError(
+                f"PersistentCache supports the {BITMASK!r} and {DLX!r} backends.")
+        self.path = path
+        self.maxsize = maxsize
+        self.backend = backend
+        self.strategy = strategy
+        self.propagate = propagate
+        self.canonical = canonical
+        self.hits = self.misses = self.evictions = self.bypasses = 0
+        # We manage the transactions ourselves.
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT,
+                                          isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self._transaction():
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the body as a write transaction. We take the write lock
+        up front, so two processes can't both read and then fail to
+        write.
+        """
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def getMany(self, puzzles) -> dict:
+        """
+        Bulk lookup.
+
+        Takes as input an iterable of puzzles in the one-line format,
+        as stored (that is, already canonical if need be).
+
+        Returns a dict mapping the puzzles found to their (solution,
+        nodes, seconds) tuples, and marks them as used. Doesn't
+        touch the counters.
+        """
+        puzzles = list(dict.fromkeys(puzzles))
+        found = {}
+        for start in range(0, len(puzzles), BATCH_SIZE):
+            batch = puzzles[start:start + BATCH_SIZE]
+            marks = ','.join('?' * len(batch))
+            for puzzle, *entry in self.connection.execute(
+                    "SELECT puzzle, solution, nodes, seconds FROM solutions "
+                    f"WHERE puzzle IN ({marks})", batch):
+                found[puzzle] = tuple(entry)
+        if found and self.maxsize:
+            # Only needed to pick what to evict.
+            now = time.time()
+            with self._transaction() as connection:
+                connection.executemany(
+                    "UPDATE solutions SET used = ? WHERE puzzle = ?",
+                    ((now, puzzle) for puzzle in found))
+        return found
+
+    def putMany(self, entries) -> None:
+        """
+        Bulk insert.
+
+        Takes as input an iterable of (puzzle, solution, nodes,
+        seconds) tuples, with puzzle in the one-line format as it is
+        to be stored and solution None if it has none. Rows already
+        there are replaced. Evicts the least recently used rows if
+        there are more than maxsize.
+        """
+        now = time.time()
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)",
+                ((puzzle, solution, nodes, seconds, now)
+                 for puzzle, solution, nodes, seconds in entries))
+            if self.maxsize:
+                excess = len(self) - self.maxsize
+                if excess > 0:
+                    connection.execute(
+                        "DELETE FROM solutions WHERE puzzle IN (SELECT puzzle "
+                        "FROM solutions ORDER BY used LIMIT ?)", (excess,))
+                    self.evictions += excess
+
+    def solveMany(self, puzzles, jobs=1):
+        """
+        Solves many puzzles through the cache.
+
+        Takes as input:
+            - puzzles -> an iterable of puzzles in the one-line
+                format (str, bytes or Board) or the nested format.
+            - jobs -> number of worker processes the puzzles missing
+                from the cache are solved in.
+
+        Puzzles are handled BATCH_SIZE at a time. They are first
+        looked up as given, so a rerun over the same puzzles is one
+        query per batch. Only the ones not found are canonicalized
+        and looked up again, and only the ones still not found are
+        solved. Both the canonical forms solved and the puzzles as
+        given are then stored.
+
+        Yields the solution of each puzzle, in order, as an
+        81-character str, or None if it has no solution. Raises
+        ValueError on a puzzle that isn't valid.
+        """
+        puzzles = iter(puzzles)
+        executor = ProcessPoolExecutor(jobs) if jobs > 1 else None
+        try:
+            while batch := list(islice(puzzles, BATCH_SIZE)):
+                lines = [format_puzzle(_cellsOf(puzzle)) for puzzle in batch]
+                found = self.getMany(lines)
+                missing = [line for line in dict.fromkeys(lines)
+                           if line not in found]
+                self.hits += len(lines) - len(missing)
+                if missing:
+                    found.update(self._fill(missing, executor, jobs))
+                for line in lines:
+                    yield found[line][0]
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def solve(self, puzzle) -> str | None:
+        """
+        Solves one puzzle through the cache. See solveMany.
+        """
+        return next(self.solveMany([puzzle]))
+
+    def _fill(self, lines: list, executor, jobs: int) -> dict:
+        """
+        Finds the entries of puzzles (distinct, in the one-line
+        format) that aren't stored as given, and stores them.
+        Called by the solveMany method.
+
+        Returns a dict mapping each puzzle to its (solution, nodes,
+        seconds) tuple.
+        """
+        # Puzzle -> (the puzzle its solution is stored under, and
+        # the Transform that maps the puzzle there, if any).
+        keys = {}
+        for line in lines:
+            key, transform = line, None
+            if self.canonical:
+                found = canonicalize(parse_puzzle(line))
+                if found is None:
+                    self.bypasses += 1
+                else:
+                    key, transform = format_puzzle(found[0]), found[1]
+            keys[line] = key, transform
+
+        stored = self.getMany(key for key, _ in keys.values())
+        missing = [key for key in dict.fromkeys(key for key, _ in keys.values())
+                   if key not in stored]
+        self.misses += len(missing)
+        self.hits += len(lines) - len(missing)
+        if missing:
+            stored.update(zip(missing, self._solve(missing, executor, jobs)))
+
+        entries = {}
+        for line, (key, transform) in keys.items():
+            solution, nodes, seconds = stored[key]
+            if solution is not None and transform is not None:
+                solution = format_puzzle(transform.revert(parse_puzzle(solution)))
+            entries[line] = solution, nodes, seconds
+        rows = {key: stored[key] for key in missing}
+        rows.update(entries)
+        self.putMany((puzzle, *entry) for puzzle, entry in rows.items())
+        return entries
+
+    def _solve(self, puzzles: list, executor, jobs: int) -> list[tuple]:
+        """
+        Solves the puzzles missing from the cache, in the workers
+        if there are any.
+        """
+        args = (self.backend, self.strategy, self.propagate)
+        if executor is None or len(puzzles) < 2:
+            return _solveEntries(puzzles, *args)
+        size = -(-len(puzzles) // jobs)
+        chunks = [puzzles[start:start + size]
+                  for start in range(0, len(puzzles), size)]
+        futures = [executor.submit(_solveEntries, chunk, *args) for chunk in chunks]
+        return [entry for future in futures for entry in future.result()]
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'PersistentCache':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return (f"PersistentCache(path={self.path!r}, maxsize={self.maxsize}, "
+                f"hits={self.hits}, misses={self.misses}, "
+                f"evictions={self.evictions}, bypasses={self.bypasses})")
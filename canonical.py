@@ -0,0 +1,269 @@
+# Canonical forms of sudokus under their symmetries.
+#
+# Two puzzles are equivalent if one can be turned into the other by
+#   - relabelling the digits,
+#   - permuting the rows within a band (or the columns within a
+#       stack),
+#   - permuting the bands (or the stacks), and
+#   - transposing the grid.
+# Equivalent puzzles have the same number of solutions, and the
+# solutions are turned into each other by the same transform.
+#
+# The canonical form of a puzzle is the smallest of the puzzles
+# equivalent to it, reading them row by row with empty cells after
+# every digit and with the digits relabelled 1, 2, 3, ... in order of
+# first appearance. We find it by branch and bound: the rows of the
+# canonical form are picked one at a time, and only the partial
+# transforms that give the smallest rows so far are kept.
+from itertools import permutations, product
+
+# Empty cells compare after every digit, so that the canonical form
+# puts the givens as early as it can. This keeps the number of tied
+# partial transforms (which we have to follow) small.
+EMPTY_KEY = 10
+# Past this many tied partial transforms, we give up. That only
+# happens for puzzles with a lot of symmetry (the empty grid, full
+# grids...), and happens for all the puzzles equivalent to them.
+MAX_STATES = 50000
+# The orders of 3 rows, columns, bands or stacks.
+ORDERS = tuple(permutations(range(3)))
+# Every column (or row) permutation that keeps the stacks (bands)
+# together: 6 orders of the stacks times 6 ** 3 orders within them.
+ALL_ORDERS = tuple(tuple(stack * 3 + i for stack, order in zip(stacks, inner)
+                         for i in order)
+                   for stacks in ORDERS for inner in product(ORDERS, repeat=3))
+
+
+class Transform:
+    """
+    A symmetry of the sudoku: apply turns a puzzle into the
+    equivalent puzzle, and revert turns it back.
+
+    Attributes:
+        - transpose -> whether the grid is transposed first.
+        - rows, cols -> row rows[r] (column cols[c]) of the
+            (transposed) grid becomes row r (column c).
+        - labels -> digit d becomes labels[d]. labels[0] is 0.
+    """
+
+    __slots__ = ('transpose', 'rows', 'cols', 'labels')
+
+    def __init__(self, transpose: bool, rows: tuple, cols: tuple,
+                 labels: tuple) -> None:
+        self.transpose = transpose
+        self.rows = rows
+        self.cols = cols
+        self.labels = labels
+
+    def apply(self, cells) -> bytearray:
+        """
+        Returns the 81 cell values of the transformed grid.
+        """
+        cells = _transposed(cells) if self.transpose else cells
+        labels = self.labels
+        return bytearray(labels[cells[row * 9 + col]]
+                         for row in self.rows for col in self.cols)
+
+    def revert(self, cells) -> bytearray:
+        """
+        Returns the 81 cell values of the grid that apply would have
+        turned into cells.
+        """
+        unlabels = [0] * 10
+        for digit, label in enumerate(self.labels):
+            unlabels[label] = digit
+        original = bytearray(81)
+        for r, row in enumerate(self.rows):
+            for c, col in enumerate(self.cols):
+                original[row * 9 + col] = unlabels[cells[r * 9 + c]]
+        return _transposed(original) if self.transpose else original
+
+    def __repr__(self) -> str:
+        return (f"Transform(transpose={self.transpose}, rows={self.rows}, "
+                f"cols={self.cols}, labels={self.labels})")
+
+
+def random_transform(rng) -> Transform:
+    """
+    Draws a symmetry of the sudoku from rng (a random.Random), each
+    of them as likely as the others.
+    """
+    bands = rng.choice(ORDERS)
+    stacks = rng.choice(ORDERS)
+    rows = tuple(band * 3 + i for band in bands for i in rng.choice(ORDERS))
+    cols = tuple(stack * 3 + i for stack in stacks for i in rng.choice(ORDERS))
+    labels = (0,) + tuple(rng.sample(range(1, 10), 9))
+    return Transform(rng.random() < 0.5, rows, cols, labels)
+
+
+def _transposed(cells) -> bytearray:
+    return bytearray(cells[col * 9 + row] for row in range(9) for col in range(9))
+
+
+def _bestColumnOrders(row) -> tuple:
+    """
+    Finds the column permutations that make the first row of the
+    canonical form as small as possible, given the row that goes
+    there. Called by the canonicalize function.
+
+    If the digits of the row are all different, they get relabelled
+    1, 2, 3, ... whatever the order, and only where the givens end
+    up matters: as far left as possible. That is, the best order
+    within each stack puts its givens first, and the best order of
+    the stacks follows from those. Rows with a repeated digit (only
+    found in puzzles with conflicting givens) are compared on every
+    column permutation instead.
+
+    Returns a pair (key, cols) where key is the relabelled row (see
+    _relabel) and cols is the list of the column permutations that
+    give it.
+    """
+    givens = [value for value in row if value]
+    if len(set(givens)) < len(givens):
+        keys = {order: _relabel([row[col] for col in order], [0] * 10, 1)[0]
+                for order in ALL_ORDERS}
+        best = min(keys.values())
+        return best, [order for order in ALL_ORDERS if keys[order] == best]
+
+    stack_patterns = []
+    stack_orders = []
+    for stack in range(3):
+        patterns = {order: tuple(not row[stack * 3 + i] for i in order)
+                    for order in ORDERS}
+        best = min(patterns.values())
+        stack_patterns.append(best)
+        stack_orders.append([order for order in ORDERS if patterns[order] == best])
+
+    patterns = {order: sum((stack_patterns[s] for s in order), ())
+                for order in ORDERS}
+    best = min(patterns.values())
+    cols = []
+    for stacks in ORDERS:
+        if patterns[stacks] != best:
+            continue
+        for inner in product(*(stack_orders[s] for s in stacks)):
+            cols.append(tuple(stack * 3 + i
+                              for stack, order in zip(stacks, inner)
+                              for i in order))
+    return _relabel([row[col] for col in cols[0]], [0] * 10, 1)[0], cols
+
+
+def _firstRowKey(row) -> tuple:
+    """
+    Returns the key (see _relabel) row would have as the first row
+    of the canonical form, without working out the column
+    permutations that give it.
+    Called by the canonicalize function.
+    """
+    givens = [value for value in row if value]
+    if len(set(givens)) < len(givens):
+        return _bestColumnOrders(row)[0]
+    # The stacks with the most givens go first, their givens first.
+    counts = sorted((sum(1 for value in row[stack * 3:stack * 3 + 3] if value)
+                     for stack in range(3)), reverse=True)
+    key = []
+    label = 1
+    for count in counts:
+        key.extend(range(label, label + count))
+        key.extend([EMPTY_KEY] * (3 - count))
+        label += count
+    return tuple(key)
+
+
+def _relabel(values, labels: list, next_label: int) -> tuple:
+    """
+    Relabels values (the cells of a row, in order), giving new
+    digits the next labels. labels is updated in place.
+
+    Returns a pair (key, next_label) where key is the relabelled row
+    with EMPTY_KEY for empty cells.
+    """
+    key = []
+    for value in values:
+        if not value:
+            key.append(EMPTY_KEY)
+            continue
+        label = labels[value]
+        if not label:
+            label = labels[value] = next_label
+            next_label += 1
+        key.append(label)
+    return tuple(key), next_label
+
+
+def canonicalize(cells, max_states=MAX_STATES):
+    """
+    Finds the canonical form of a puzzle.
+
+    Takes as input:
+        - cells -> the 81 cell values in row-major order, with 0 for
+            empty cells (e.g. a bytearray from parse_puzzle).
+        - max_states -> the most tied partial transforms to follow.
+
+    Returns a pair (canonical, transform) where canonical is the 81
+    cell values of the canonical form and transform is a Transform
+    with transform.apply(cells) == canonical. Equivalent puzzles
+    have the same canonical form.
+
+    Returns None if the puzzle has so much symmetry that more than
+    max_states partial transforms tie along the way.
+    """
+    cells = bytes(cells)
+    grids = (cells, bytes(_transposed(cells)))
+
+    # The first row: any row of either grid, with the best column
+    # permutations for it.
+    keys = {(transpose, row): _firstRowKey(grid[row * 9:row * 9 + 9])
+            for transpose, grid in enumerate(grids) for row in range(9)}
+    best = min(keys.values())
+    states = []
+    for (transpose, row), key in keys.items():
+        if key != best:
+            continue
+        values = grids[transpose][row * 9:row * 9 + 9]
+        for order in _bestColumnOrders(values)[1]:
+            labels = [0] * 10
+            next_label = _relabel([values[col] for col in order], labels, 1)[1]
+            states.append((transpose, (row,), order, labels, next_label))
+        if len(states) > max_states:
+            return None
+    prefix = [best]
+
+    # The other rows, one at a time. Rows 1 and 2 come from the band
+    # of row 0, row 3 from any other band, and so on.
+    for position in range(1, 9):
+        best = None
+        following = []
+        for transpose, rows, cols, labels, next_label in states:
+            grid = grids[transpose]
+            if position % 3:
+                band = rows[-1] // 3
+                candidates = [row for row in range(band * 3, band * 3 + 3)
+                              if row not in rows]
+            else:
+                used = {row // 3 for row in rows}
+                candidates = [row for row in range(9) if row // 3 not in used]
+            for row in candidates:
+                new_labels = list(labels)
+                key, new_next = _relabel([grid[row * 9 + col] for col in cols],
+                                         new_labels, next_label)
+                if best is None or key < best:
+                    best, following = key, []
+                if key == best:
+                    following.append((transpose, rows + (row,), cols,
+                                      new_labels, new_next))
+            if len(following) > max_states:
+                return None
+        states = following
+        prefix.append(best)
+
+    transpose, rows, cols, labels, next_label = states[0]
+    # Digits missing from the puzzle get the labels left over, so the
+    # transform can also map solutions.
+    for digit in range(1, 10):
+        if not labels[digit]:
+            labels[digit] = next_label
+            next_label += 1
+    canonical = bytearray(0 if value == EMPTY_KEY else value
+                          for key in prefix for value in key)
+    return canonical, Transform(bool(transpose), rows, cols, tuple(labels))
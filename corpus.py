@@ -0,0 +1,148 @@
+import io
+import mmap
+import os
+
+from board import Board
+
+# Written in place of a solution for puzzles that have none, so
+# output files keep one line per input puzzle. It is a comment, so
+# reading an output file back never mistakes it for a puzzle (a line
+# of dots would be the empty grid).
+NO_SOLUTION_LINE = '# no solution'
+
+
+def _lines(source):
+    """
+    Yields the raw lines (as bytes, without line endings) of source,
+    which is a path or a binary file object. Regular files are
+    memory-mapped, so we never hold more than a line in memory.
+    Anything that can't be mapped (pipes, empty files) is read
+    line by line instead.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as file:
+            yield from _lines(file)
+        return
+
+    try:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        # Not a regular file (or an empty one).
+        for line in source:
+            yield line.rstrip(b'\r\n')
+        return
+
+    with mapped:
+        start, size = 0, len(mapped)
+        while start < size:
+            end = mapped.find(b'\n', start)
+            if end < 0:
+                end = size
+            yield mapped[start:end].rstrip(b'\r')
+            start = end + 1
+
+
+def read_puzzles(source):
+    """
+    Reads puzzles from a corpus in the one-line format: one puzzle of
+    81 characters per line, with '0' or '.' for empty cells. Blank
+    lines and lines starting with '#' are skipped.
+
+    Takes as input a path or a binary file object (e.g.
+    sys.stdin.buffer).
+
+    Yields the puzzles lazily, as Boards. Raises ValueError, with the
+    line number, on a line that isn't a valid puzzle.
+    """
+    for number, line in enumerate(_lines(source), 1):
+        line = line.strip()
+        if not line or line.startswith(b'#'):
+            continue
+        try:
+            yield Board.fromString(line)
+        except ValueError as error:
+            raise ValueError(f"Line {number}: {error}") from None
+
+
+class PuzzleWriter:
+    """
+    Buffered writer for corpus files in the one-line format.
+
+    Lines are gathered in a buffer and written out in blocks of about
+    buffer_size bytes, so memory stays flat however many puzzles go
+    through it.
+
+    Use as a context manager, or call close when done:
+        with PuzzleWriter('solutions.txt') as writer:
+            for solution in solve_many(read_puzzles('puzzles.txt')):
+                writer.write(solution)
+    """
+
+    def __init__(self, target, buffer_size=1 << 16) -> None:
+        """
+        Takes as input:
+            - target -> a path, or a binary file object (e.g.
+                sys.stdout.buffer), which is left open on close.
+            - buffer_size -> how many bytes to gather before writing.
+        """
+        if isinstance(target, (str, os.PathLike)):
+            self.file = open(target, 'wb')
+            self.owns_file = True
+        else:
+            self.file = target
+            self.owns_file = False
+        self.buffer_size = buffer_size
+        self.buffer = bytearray()
+        # Number of lines written so far.
+        self.count = 0
+
+    def write(self, puzzle) -> None:
+        """
+        Writes one puzzle (or solution) as a line.
+
+        Takes as input an 81-character str, bytes, a Board or None.
+        None (no solution) is written as NO_SOLUTION_LINE.
+        """
+        if puzzle is None:
+            puzzle = NO_SOLUTION_LINE
+        if isinstance(puzzle, Board):
+            puzzle = str(puzzle)
+        if isinstance(puzzle, str):
+            puzzle = puzzle.encode('ascii')
+        self.buffer += puzzle
+        self.buffer += b'\n'
+        self.count += 1
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def writeComment(self, text: str) -> None:
+        """
+        Writes text as a comment line, which readers skip.
+        """
+        self.writeText('# ' + text + '\n')
+
+    def writeText(self, text: str) -> None:
+        """
+        Writes text as is, through the same buffer. Used for output
+        in other formats than the one-line format.
+        """
+        self.buffer += text.encode('utf-8')
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self) -> 'PuzzleWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
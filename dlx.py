@@ -0,0 +1,238 @@
+from budget import NO_CHECK
+
+# A 9 x 9 sudoku is an exact cover problem with 324 constraints
+# (columns), each of which must be satisfied exactly once:
+#   - 81 cell constraints -> every cell holds a digit,
+#   - 81 row constraints -> every row holds every digit,
+#   - 81 column constraints -> every column holds every digit,
+#   - 81 box constraints -> every box holds every digit.
+# Each of the 729 (cell, digit) choices covers exactly four of them.
+CELL_CONSTRAINT = 0
+ROW_CONSTRAINT = 81
+COL_CONSTRAINT = 162
+BOX_CONSTRAINT = 243
+NUM_CONSTRAINTS = 324
+
+
+def choiceConstraints(idx: int, digit: int) -> tuple:
+    """
+    Returns the four constraint columns (numbered from 1, since
+    column 0 is the root) covered by putting digit in cell idx.
+    """
+    row, col = divmod(idx, 9)
+    box = (row // 3) * 3 + col // 3
+    return (1 + CELL_CONSTRAINT + idx,
+            1 + ROW_CONSTRAINT + row * 9 + digit - 1,
+            1 + COL_CONSTRAINT + col * 9 + digit - 1,
+            1 + BOX_CONSTRAINT + box * 9 + digit - 1)
+
+
+class DancingLinks:
+    """
+    Exact cover solver for the sudoku using Knuth's Dancing Links
+    (Algorithm X).
+
+    The toroidal doubly-linked lists are kept in flat integer lists
+    (left, right, up, down, column), with node 0 as the root and
+    nodes 1 to 324 as the column headers. Every other node belongs
+    to one (cell, digit) choice, recorded in choice.
+
+    Givens are covered once when the puzzle is loaded, so the search
+    only deals with the empty cells.
+    """
+
+    def __init__(self, cells, budget=None) -> None:
+        """
+        Takes as input:
+            - cells -> an iterable of the 81 cell values in row-major
+                order, with 0 for empty cells.
+            - budget -> a budget.Budget limiting the search, or None.
+                When it runs out, the search raises BudgetExceeded
+                and leaves the links in a mess; the DancingLinks
+                object can't be used again after that.
+        """
+        self.cells = list(cells)
+        # Number of choices tried during search.
+        self.nodes = 0
+        # Most choices made on top of each other during search.
+        self.max_depth = 0
+        self.budget = budget
+        self.next_check = NO_CHECK if budget is None else 0
+
+        headers = NUM_CONSTRAINTS + 1
+        self.left = [i - 1 for i in range(headers)]
+        self.right = [i + 1 for i in range(headers)]
+        self.left[0] = NUM_CONSTRAINTS
+        self.right[NUM_CONSTRAINTS] = 0
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.size = [0] * headers
+        self.choice = [None] * headers
+
+        for idx in range(81):
+            for digit in range(1, 10):
+                self._addChoice(idx, digit)
+
+        # Cover the givens. If two givens need the same constraint,
+        # one of its columns has already gone by the time we get to
+        # it and the puzzle has no solution.
+        self.consistent = True
+        covered = set()
+        for idx, digit in enumerate(self.cells):
+            if not digit:
+                continue
+            constraints = choiceConstraints(idx, digit)
+            if covered.intersection(constraints):
+                self.consistent = False
+                return
+            covered.update(constraints)
+            for col in constraints:
+                self._cover(col)
+
+    def _addChoice(self, idx: int, digit: int) -> None:
+        """
+        Appends the four nodes for putting digit in cell idx.
+        """
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = len(left)
+        for offset, col in enumerate(choiceConstraints(idx, digit)):
+            node = first + offset
+            left.append(first + (offset - 1) % 4)
+            right.append(first + (offset + 1) % 4)
+            # Insert at the bottom of the column.
+            up.append(up[col])
+            down.append(col)
+            down[up[col]] = node
+            up[col] = node
+            self.column.append(col)
+            self.choice.append((idx, digit))
+            self.size[col] += 1
+
+    def _cover(self, col: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        row = down[col]
+        while row != col:
+            node = right[row]
+            while node != row:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                size[column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def _uncover(self, col: int) -> None:
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+        row = up[col]
+        while row != col:
+            node = left[row]
+            while node != row:
+                size[column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def _search(self, solution: list, limit: int, rng) -> int:
+        """
+        The recursive Algorithm X search.
+
+        Takes as input:
+            - solution -> the nodes of the choices made so far.
+            - limit -> stop once this many solutions have been
+                found. 0 means no limit.
+            - rng -> a random.Random used to shuffle the choices for
+                each constraint, or None to try them in order.
+
+        Returns the number of solutions found. When it stops at the
+        limit, the choices of the last solution are left in solution.
+        """
+        right, down, size = self.right, self.down, self.size
+        if right[0] == 0:
+            # Every constraint is satisfied.
+            return 1
+
+        # Pick the constraint with the fewest choices left.
+        col = right[0]
+        best = col
+        while col != 0:
+            if size[col] < size[best]:
+                best = col
+                if size[col] <= 1:
+                    break
+            col = right[col]
+        col = best
+        if not size[col]:
+            return 0
+
+        rows = []
+        row = down[col]
+        while row != col:
+            rows.append(row)
+            row = down[row]
+        if rng is not None:
+            rng.shuffle(rows)
+
+        found = 0
+        self._cover(col)
+        for row in rows:
+            if self.nodes >= self.next_check:
+                self.next_check = self.budget.check(self.nodes)
+            self.nodes += 1
+            solution.append(row)
+            if len(solution) > self.max_depth:
+                self.max_depth = len(solution)
+            node = right[row]
+            while node != row:
+                self._cover(self.column[node])
+                node = right[node]
+
+            found += self._search(solution, limit - found if limit else 0,
+                                  rng)
+
+            node = self.left[row]
+            while node != row:
+                self._uncover(self.column[node])
+                node = self.left[node]
+            if limit and found >= limit:
+                # Leave the links as they are; we're done.
+                self._uncover(col)
+                return found
+            solution.pop()
+        self._uncover(col)
+        return found
+
+    def solve(self, rng=None) -> list | None:
+        """
+        Finds one solution. With rng (a random.Random), the choices
+        are tried in an order drawn from it; otherwise the search is
+        deterministic.
+
+        Returns the 81 cell values of the solution in row-major
+        order, or None if the puzzle has no solution.
+        """
+        if not self.consistent:
+            return None
+        solution = []
+        if not self._search(solution, 1, rng):
+            return None
+        cells = list(self.cells)
+        for node in solution:
+            idx, digit = self.choice[node]
+            cells[idx] = digit
+        return cells
+
+    def count(self, limit=0) -> int:
+        """
+        Counts the solutions of the puzzle, stopping as soon as
+        limit of them have been found (0 means count them all).
+        """
+        if not self.consistent:
+            return 0
+        return self._search([], limit, None)
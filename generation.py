@@ -0,0 +1,202 @@
+"""
+Batch generation of puzzles with a unique solution.
+
+generate_many fans the work of SudokuGenerator.generatePuzzle out
+over a process pool, in chunks. Puzzles that are the same up to a
+symmetry of the sudoku (see canonical.py) are only kept once, and
+the results come out in the same order for a given seed whatever the
+number of workers.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from hashlib import blake2b
+from itertools import count as counter
+from random import Random
+import os
+
+from canonical import canonicalize
+from oop_solver import (BITMASK, MRV, TEMPLATE, BitmaskEngine,
+                        SudokuGenerator, format_puzzle, remove_clues)
+
+# Difficulty is rated by the number of digits the bitmask engine
+# (most constrained cell first, propagating singles) tries to prove
+# the solution unique, i.e., its search nodes (see rate_puzzle). Each
+# band is a (min, max) range of digits tried, max being None for no
+# limit. Singles leave at least 2 candidates in every empty cell, and
+# proving uniqueness tries them all, so no puzzle scores 1.
+EASY = 'easy'
+MEDIUM = 'medium'
+HARD = 'hard'
+DIFFICULTIES = {
+    EASY: (0, 0),      # Singles alone solve it.
+    MEDIUM: (2, 9),
+    HARD: (10, None),
+}
+
+DEFAULT_CLUES = (24, 32)
+# Number of puzzles attempted per task sent to a worker.
+DEFAULT_CHUNKSIZE = 32
+# We give up once this many attempts per puzzle asked for have been
+# made, so a band that the clue range can't reach doesn't run
+# forever.
+MAX_ATTEMPTS_PER_PUZZLE = 50
+# Bytes of the canonical form hashes kept to spot duplicates. With 8,
+# a million puzzles take a few tens of megabytes and a collision is
+# very unlikely.
+HASH_SIZE = 8
+
+
+def rate_puzzle(cells, engine=None) -> int:
+    """
+    Rates the difficulty of a puzzle with a unique solution.
+
+    Takes as input:
+        - cells -> the 81 cell values, with 0 for empty cells.
+        - engine -> a BitmaskEngine to work in. A new one if None.
+
+    Returns the number of digits the engine tries (its search nodes)
+    to find the solution and prove there is no other, propagating
+    singles along the way. 0 means singles alone solve the puzzle;
+    otherwise it is at least 2.
+    """
+    if engine is None:
+        engine = BitmaskEngine()
+    engine.load(cells)
+    if not engine.propagate():
+        return 0
+    empties = [idx for idx in range(81) if not engine.cells[idx]]
+    if empties:
+        engine.count(empties, 2, strategy=MRV, propagate=True)
+    return engine.nodes
+
+
+def _generateChunk(args: tuple) -> list[tuple]:
+    """
+    Makes a chunk of attempts at a puzzle, in a worker process.
+    Called by the generate_many function.
+
+    Takes as input a tuple (seed, size, clues, band, source,
+    backend), where the chunk draws all its randomness from
+    Random(seed) and makes size attempts.
+
+    Returns a list of (key, puzzle) pairs, one per attempt that gave
+    a puzzle in the clue range and the difficulty band, with key the
+    hash of the canonical form of the puzzle.
+    """
+    seed, size, clues, band, source, backend = args
+    rng = Random(seed)
+    engine = BitmaskEngine()
+    low, high = clues
+    accepted = []
+    for _ in range(size):
+        grid = SudokuGenerator(rng, source).generateSudoku()
+        cells = remove_clues([num for row in grid for num in row], rng,
+                             rng.randint(low, high), engine, backend)
+        if 81 - cells.count(0) > high:
+            # The grid ran out of removable clues first.
+            continue
+        if band is not None:
+            tried = rate_puzzle(cells, engine)
+            if tried < band[0] or (band[1] is not None and tried > band[1]):
+                continue
+
+        found = canonicalize(cells)
+        canonical = bytes(cells) if found is None else bytes(found[0])
+        accepted.append((blake2b(canonical, digest_size=HASH_SIZE).digest(),
+                         format_puzzle(cells)))
+    return accepted
+
+
+def generate_many(count: int, clues=DEFAULT_CLUES, difficulty=None,
+                  seed=None, jobs=1, chunksize=DEFAULT_CHUNKSIZE,
+                  source=TEMPLATE, progress=None, backend=BITMASK):
+    """
+    Generates many puzzles with a unique solution.
+
+    Takes as input:
+        - count -> the number of puzzles wanted.
+        - clues -> a (min, max) range. Each attempt aims for a
+            number of clues drawn from it, and puzzles that end up
+            with more clues than max are dropped.
+        - difficulty -> EASY, MEDIUM or HARD (see DIFFICULTIES), or
+            None for any.
+        - seed -> the seed all the randomness is drawn from. The
+            same seed gives the same puzzles, whatever jobs is. A
+            random one if None.
+        - jobs -> number of worker processes. None means one per CPU.
+        - chunksize -> number of attempts sent to a worker at a time.
+        - source -> where the full grids come from (see
+            SudokuGenerator).
+        - progress -> a function called as progress(generated,
+            attempts) after every chunk, or None.
+        - backend -> BITMASK or DLX, the solver that checks the
+            clues taken out keep the solution unique (see
+            remove_clues).
+
+    Yields the puzzles as 81-character strs, no two of them the same
+    up to symmetry. Stops early, with fewer than count, if
+    MAX_ATTEMPTS_PER_PUZZLE * count attempts didn't give enough.
+    Raises ValueError on a count below 1, a bad clue range or
+    difficulty.
+    """
+    if count < 1:
+        raise ValueError("The number of puzzles must be at least 1.")
+    low, high = clues
+    if not 17 <= low <= high <= 81:
+        raise ValueError("The clue range must be within 17 to 81, min first.")
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(
+            f"Unknown difficulty {difficulty!r}. Choose one of {tuple(DIFFICULTIES)}.")
+    if seed is None:
+        seed = Random().getrandbits(64)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    band = DIFFICULTIES.get(difficulty)
+
+    # Chunk k draws from its own seed, so chunks don't depend on
+    # which worker runs them or in what order.
+    tasks = ((f'{seed}:{chunk}', chunksize, (low, high), band, source, backend)
+             for chunk in counter())
+    max_attempts = MAX_ATTEMPTS_PER_PUZZLE * count
+    seen = set()
+    generated = attempts = 0
+    for chunk in _runChunks(tasks, jobs):
+        attempts += chunksize
+        for key, puzzle in chunk:
+            if key in seen:
+                continue
+            seen.add(key)
+            yield puzzle
+            generated += 1
+            if generated >= count:
+                break
+        if progress is not None:
+            progress(generated, attempts)
+        if generated >= count or attempts >= max_attempts:
+            return
+
+
+def _runChunks(tasks, jobs: int):
+    """
+    Yields the results of _generateChunk on the tasks, in order,
+    running them in a pool of jobs processes if jobs > 1. We keep a
+    few chunks per worker in flight, so the workers never wait on
+    us.
+    """
+    if jobs <= 1:
+        for task in tasks:
+            yield _generateChunk(task)
+        return
+
+    executor = ProcessPoolExecutor(jobs)
+    try:
+        pending = deque(executor.submit(_generateChunk, next(tasks))
+                        for _ in range(jobs * 2))
+        while True:
+            result = pending.popleft().result()
+            pending.append(executor.submit(_generateChunk, next(tasks)))
+            yield result
+    finally:
+        # Once we have enough puzzles, the chunks in flight are of no
+        # use.
+        executor.shutdown(cancel_futures=True)
@@ -1,6 +1,6 @@
 import time
 
-from solver import SudokuSolver
+from solver import STRATEGIES, SudokuSolver
 
 # More example sudokus can be found in test_solver.py
 
@@ -17,6 +17,10 @@ solvable_puzzle1 = (
     [0, 0, 0, '3', 0, 2, 4, 0, 0]
 )
 
+# Solving works on the puzzle in place, so we keep a
+# pristine copy for the node-count comparison below.
+pristine_puzzle1 = [list(row) for row in solvable_puzzle1]
+
 start = time.perf_counter()
 sudoku = SudokuSolver(solvable_puzzle1)
 solved_sudoku = sudoku.solveSudoku()
@@ -28,3 +32,12 @@ if solved_sudoku:
 elif solved_sudoku == False:
     print(
         f"It took {round(end - start, 3)}s to determine there's no solution for this puzzle.")
+
+# Compare how many search nodes each cell ordering needs.
+print()
+for strategy in STRATEGIES:
+    sudoku = SudokuSolver([list(row) for row in pristine_puzzle1])
+    start = time.perf_counter()
+    sudoku.solveSudoku(strategy=strategy)
+    end = time.perf_counter()
+    print(f"{strategy:>10}: {sudoku.nodes} nodes in {round(end - start, 3)}s.")
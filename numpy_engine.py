@@ -0,0 +1,222 @@
+# Vectorized batch solving with NumPy.
+#
+# N puzzles are held as an (N, 9, 9) uint8 array, and the naked and
+# hidden singles propagation runs on all of them at once with
+# whole-array operations. Puzzles that propagation alone can't finish
+# are handed to the scalar BitmaskEngine, starting from where
+# propagation left them.
+#
+# NumPy is only needed by this module; the rest of the solver works
+# without it.
+import numpy as np
+
+from oop_solver import MRV, format_puzzle, parse_puzzle, solve_many
+
+ALL_DIGITS = 0x1FF
+# Bit for each digit, indexed by cell value (0 for empty cells).
+DIGIT_BIT = np.array([0] + [1 << (d - 1) for d in range(1, 10)], dtype=np.uint16)
+# Number of digits in each 9-bit mask.
+MASK_COUNT = np.array([bin(mask).count('1') for mask in range(512)], dtype=np.uint8)
+# Lowest digit in each 9-bit mask (0 for the empty mask).
+MASK_DIGIT = np.array([(mask & -mask).bit_length() for mask in range(512)],
+                      dtype=np.uint8)
+# Shifts to spread a mask over its 9 digit bits.
+DIGIT_SHIFTS = np.arange(9, dtype=np.uint16)
+
+
+def load_batch(puzzles) -> np.ndarray:
+    """
+    Parses puzzles in the one-line format (see oop_solver.parse_puzzle)
+    into an (N, 9, 9) uint8 array.
+    """
+    data = b''.join(parse_puzzle(line) for line in puzzles)
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 9, 9).copy()
+
+
+def _boxes(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a view of an (N, 9, 9) array as (N, 3, 3, 3, 3), indexed
+    by (puzzle, box row, row in box, box column, column in box).
+    """
+    return array.reshape(array.shape[0], 3, 3, 3, 3)
+
+
+def _unitMasks(bits: np.ndarray) -> tuple:
+    """
+    ORs the digit bits of an (N, 9, 9) array over every row, column
+    and box.
+
+    Returns a tuple (rows, cols, boxes, conflicts) where rows and
+    cols are (N, 9), boxes is (N, 3, 3) and conflicts is an (N,) bool
+    array flagging puzzles where some digit repeats in a unit. Since
+    every digit is a single bit, a unit has a repeat exactly when the
+    sum of its bits is bigger than their OR.
+    """
+    boxed = _boxes(bits)
+    rows = np.bitwise_or.reduce(bits, axis=2)
+    cols = np.bitwise_or.reduce(bits, axis=1)
+    boxes = np.bitwise_or.reduce(boxed, axis=(2, 4))
+    conflicts = ((bits.sum(axis=2, dtype=np.uint16) != rows).any(axis=1) |
+                 (bits.sum(axis=1, dtype=np.uint16) != cols).any(axis=1) |
+                 (boxed.sum(axis=(2, 4), dtype=np.uint16) != boxes).any(axis=(1, 2)))
+    return rows, cols, boxes, conflicts
+
+
+def _spread(rows: np.ndarray, cols: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """
+    ORs row, column and box masks onto the cells they cover,
+    giving an (N, 9, 9) array.
+    """
+    cells = rows[:, :, None] | cols[:, None, :]
+    return (_boxes(cells) | boxes[:, :, None, :, None]).reshape(cells.shape)
+
+
+def candidate_masks(grid: np.ndarray) -> tuple:
+    """
+    Computes the candidates of every cell of every puzzle at once.
+
+    Takes as input an (N, 9, 9) array of cell values.
+
+    Returns a pair (candidates, conflicts):
+        - candidates -> (N, 9, 9) uint16 array of 9-bit candidate
+            masks, 0 for filled cells.
+        - conflicts -> (N,) bool array flagging puzzles where some
+            digit repeats in a row, column or box.
+    """
+    rows, cols, boxes, conflicts = _unitMasks(DIGIT_BIT[grid])
+    used = _spread(rows, cols, boxes)
+    candidates = np.where(grid > 0, 0, ~used & ALL_DIGITS).astype(np.uint16)
+    return candidates, conflicts
+
+
+def _onceAndTwice(units: list) -> tuple:
+    """
+    Takes the candidate masks of the 9 cells of some units (a list of
+    9 arrays of the same shape) and returns a pair (once, twice) of
+    the digits that are candidates in at least one and at least two
+    of the cells.
+    """
+    once = np.zeros_like(units[0])
+    twice = np.zeros_like(units[0])
+    for candidates in units:
+        twice |= once & candidates
+        once |= candidates
+    return once, twice
+
+
+def _hiddenSingles(candidates: np.ndarray, rows: np.ndarray,
+                   cols: np.ndarray, boxes: np.ndarray) -> tuple:
+    """
+    Finds hidden singles in every row, column and box at once.
+    Called by the propagate_batch function.
+
+    Takes as input the (N, 9, 9) candidate masks and the masks of
+    the digits already placed in each row, column and box.
+
+    Returns a pair (hidden, dead):
+        - hidden -> (N, 9, 9) masks of the digits that have only that
+            cell left in one of its units.
+        - dead -> (N,) bool array flagging puzzles where some digit
+            has no cell left in a unit that doesn't already hold it,
+            or where a cell is the only home of two digits.
+    """
+    boxed = _boxes(candidates)
+    row_once, row_twice = _onceAndTwice([candidates[:, :, k] for k in range(9)])
+    col_once, col_twice = _onceAndTwice([candidates[:, k, :] for k in range(9)])
+    box_once, box_twice = _onceAndTwice([boxed[:, :, i, :, j]
+                                         for i in range(3) for j in range(3)])
+
+    dead = (((rows | row_once) != ALL_DIGITS).any(axis=1) |
+            ((cols | col_once) != ALL_DIGITS).any(axis=1) |
+            ((boxes | box_once) != ALL_DIGITS).any(axis=(1, 2)))
+
+    hidden = candidates & _spread(row_once & ~row_twice,
+                                  col_once & ~col_twice,
+                                  box_once & ~box_twice)
+    dead |= (MASK_COUNT[hidden] > 1).any(axis=(1, 2))
+    return hidden, dead
+
+
+def propagate_batch(grid: np.ndarray, max_sweeps=81) -> np.ndarray:
+    """
+    Fills naked and hidden singles in every puzzle of grid, in place,
+    with vectorized sweeps until no puzzle changes any more.
+
+    Each sweep fills every naked single, then every hidden single,
+    of every puzzle still in play. Puzzles that run into a
+    contradiction are dropped from further sweeps.
+
+    Returns an (N,) bool array flagging the puzzles found to have
+    no solution.
+    """
+    dead = np.zeros(grid.shape[0], dtype=bool)
+    live = np.flatnonzero((grid == 0).any(axis=(1, 2)))
+
+    for _ in range(max_sweeps):
+        if not live.size:
+            break
+        sub = grid[live]
+        rows, cols, boxes, stuck = _unitMasks(DIGIT_BIT[sub])
+        used = _spread(rows, cols, boxes)
+        empty = sub == 0
+        candidates = np.where(empty, ~used & ALL_DIGITS, 0).astype(np.uint16)
+        counts = MASK_COUNT[candidates]
+        stuck |= (empty & (counts == 0)).any(axis=(1, 2))
+
+        # Naked singles, then hidden singles in the cells left over.
+        hidden, no_home = _hiddenSingles(candidates, rows, cols, boxes)
+        stuck |= no_home
+        singles = np.where(counts == 1, candidates, hidden)
+        singles[stuck] = 0
+
+        # Filling several singles at once can put the same digit twice
+        # in a unit. That's only possible if the puzzle was already
+        # dead, and the next sweep's conflicts will catch it.
+        sub += MASK_DIGIT[singles]
+        grid[live] = sub
+        dead[live[stuck]] = True
+        changed = singles.any(axis=(1, 2))
+        live = live[changed & (sub == 0).any(axis=(1, 2))]
+
+    # The last sweep may have left a conflict behind.
+    dead |= _unitMasks(DIGIT_BIT[grid])[3]
+    return dead
+
+
+def solve_batch(puzzles, batch_size=4096, strategy=MRV, jobs=1, chunksize=256):
+    """
+    Solves puzzles in the one-line format, batch_size at a time.
+
+    Each batch is propagated with propagate_batch. Solved puzzles are
+    done; the others are finished by oop_solver.solve_many, starting
+    from the propagated grid, with jobs worker processes and
+    chunksize puzzles sent to a worker at a time (as for solve_many).
+
+    Yields, in order, the solution of each puzzle as an 81-character
+    str, or None if the puzzle has no solution.
+    """
+    puzzles = iter(puzzles)
+    while True:
+        batch = []
+        for line in puzzles:
+            batch.append(line)
+            if len(batch) == batch_size:
+                break
+        if not batch:
+            return
+
+        grid = load_batch(batch)
+        dead = propagate_batch(grid)
+        flat = grid.reshape(len(batch), 81)
+        open_puzzles = np.flatnonzero(~dead & (flat == 0).any(axis=1))
+        searched = dict(zip(open_puzzles.tolist(), solve_many(
+            (format_puzzle(flat[i].tobytes()) for i in open_puzzles),
+            strategy=strategy, jobs=jobs, chunksize=chunksize)))
+
+        for i in range(len(batch)):
+            if dead[i]:
+                yield None
+            elif i in searched:
+                yield searched[i]
+            else:
+                yield format_puzzle(flat[i].tobytes())
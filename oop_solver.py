@@ -1,7 +1,17 @@
-
-from random import randint, shuffle
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from random import Random
+import os
 import time
 
+from board import FORMAT_TABLE, Board
+from budget import NO_CHECK, Budget, BudgetExceeded
+from canonical import random_transform
+from dlx import DancingLinks
+from result import (BUDGET_EXCEEDED, INVALID, NO_EMPTY_CELLS, SOLVED,
+                    UNSOLVABLE, SolveResult)
+
 PUZZLE_NOT_SOLVABLE = """
 Could not solve puzzle! Please, check that enough clues are given,
 all the given clues are correct, and there are no repeated entries
@@ -14,18 +24,191 @@ unique solution, you need to provide at least 17 correct clues
 (which unfortunately also doesn't guarantee uniqueness, but is
 necessary).
 """
+CONFLICTING_CLUES = """
+Could not solve puzzle! Some clues repeat in a row, column or box:
+{conflicts}
+"""
+NO_EMPTY_CELLS_LEFT = "Puzzle has no zero entry."
+NOT_A_SUDOKU = "Not a valid 9 X 9 sudoku."
+SEARCH_BUDGET_EXCEEDED = """
+Gave up on the puzzle! The search ran out of budget ({reason}) after
+trying {nodes} values.
+"""
+
+# The backends available to SudokuSolver.solveSudoku.
+#   - BITMASK -> the bitmask candidate engine (the default).
+#   - LIST_SCAN -> the original list-scanning recursive solver.
+#   - DLX -> the Dancing Links exact cover solver in dlx.py.
+BITMASK = 'bitmask'
+LIST_SCAN = 'list'
+DLX = 'dlx'
+BACKENDS = (BITMASK, LIST_SCAN, DLX)
+
+# The orders in which the search visits empty cells.
+#   - ROW_MAJOR -> fixed row-major order (the default).
+#   - MRV -> most constrained cell first (minimum remaining values),
+#       ties going to the cell that comes first in row-major order.
+ROW_MAJOR = 'row-major'
+MRV = 'mrv'
+STRATEGIES = (ROW_MAJOR, MRV)
+
+# The events reported to observers of the bitmask engine (see
+# BitmaskEngine.observe).
+#   - PLACE -> a digit was put in an empty cell.
+#   - UNPLACE -> a digit was taken back out of its cell.
+PLACE = 'place'
+UNPLACE = 'unplace'
+
+# How often (in seconds) parallel_search checks its budget while
+# waiting on the workers.
+POLL_SECONDS = 0.05
+
+# Where SudokuGenerator gets its full grids from.
+#   - SEARCH -> a randomized search, starting from a random digit in
+#       a random cell (the default).
+#   - TEMPLATE -> a random symmetry of the sudoku (see
+#       canonical.random_transform) applied to one of SEED_GRIDS.
+#       There is no search, so it always takes the same short time.
+SEARCH = 'search'
+TEMPLATE = 'template'
+GRID_SOURCES = (SEARCH, TEMPLATE)
+# The solved grids TEMPLATE starts from: the solutions of the easy,
+# hard and minimal puzzles of benchmark.py. The symmetries of each
+# of them give 2 * 6 ** 8 * 9! (about 1.2 trillion) grids.
+SEED_GRIDS = tuple(Board.fromString(line).cells for line in (
+    '483921657967345821251876493548132976729564138136798245372689514814253769695417382',
+    '496157382251836947837429156178945623325681794964273815682714539743598261519362478',
+    '145327698839654127672918543496185372218473956753296481367542819984761235521839764',
+    '162857493534129678789643521475312986913586742628794135356478219241935867897261354',
+    '417369825632158947958724316825437169791586432346912758289643571573291684164875293',
+    '693784512487512936125963874932651487568247391741398625319475268856129743274836159',
+))
+
+# Lookup tables used by the bitmask engine. Cells are addressed
+# by their flat index (row * 9 + col) and digit d is represented
+# by the bit 1 << (d - 1), so a 9-bit mask holds a set of digits.
+CELL_ROW = tuple(idx // 9 for idx in range(81))
+CELL_COL = tuple(idx % 9 for idx in range(81))
+CELL_BOX = tuple((idx // 27) * 3 + (idx % 9) // 3 for idx in range(81))
+ALL_DIGITS = 0x1FF
+# DIGIT_BIT[0] is 0 so that placing an "empty" digit is a no-op.
+DIGIT_BIT = (0,) + tuple(1 << (d - 1) for d in range(1, 10))
+# MASK_DIGITS[mask] is the tuple of digits whose bits are set in mask.
+MASK_DIGITS = tuple(tuple(d for d in range(1, 10) if mask & DIGIT_BIT[d])
+                    for mask in range(512))
+# MASK_COUNT[mask] is the number of digits in mask.
+MASK_COUNT = tuple(len(digits) for digits in MASK_DIGITS)
+# The flat indices of the cells in each row, column and box.
+UNITS = (tuple(tuple(r * 9 + c for c in range(9)) for r in range(9)) +
+         tuple(tuple(r * 9 + c for r in range(9)) for c in range(9)) +
+         tuple(tuple(idx for idx in range(81) if CELL_BOX[idx] == b)
+               for b in range(9)))
+# The kinds of unit, in the order of UNITS.
+ROW_UNIT = 'row'
+COL_UNIT = 'column'
+BOX_UNIT = 'box'
+UNIT_KINDS = (ROW_UNIT,) * 9 + (COL_UNIT,) * 9 + (BOX_UNIT,) * 9
+# The three units of each cell, as indices into UNITS.
+CELL_UNITS = tuple((CELL_ROW[idx], 9 + CELL_COL[idx], 18 + CELL_BOX[idx])
+                   for idx in range(81))
+
+
+class Conflict:
+    """
+    A digit given more than once in a row, column or box.
+
+    Attributes:
+        - unit -> ROW_UNIT, COL_UNIT or BOX_UNIT.
+        - index -> which row, column or box (0 to 8). Boxes are
+            numbered in row-major order.
+        - digit -> the repeated digit.
+        - cells -> the (row, col) positions of the clues, in
+            row-major order.
+    """
+
+    __slots__ = ('unit', 'index', 'digit', 'cells')
+
+    def __init__(self, unit: str, index: int, digit: int, cells: tuple) -> None:
+        self.unit = unit
+        self.index = index
+        self.digit = digit
+        self.cells = cells
+
+    def asDict(self) -> dict:
+        return {'unit': self.unit, 'index': self.index, 'digit': self.digit,
+                'cells': [list(cell) for cell in self.cells]}
+
+    def __str__(self) -> str:
+        cells = ', '.join(f"({row}, {col})" for row, col in self.cells)
+        return f"{self.digit} appears in {self.unit} {self.index} at {cells}"
+
+    def __repr__(self) -> str:
+        return (f"Conflict(unit={self.unit!r}, index={self.index}, "
+                f"digit={self.digit}, cells={self.cells})")
 
 
 class SudokuValidator:
-    def __init__(self, puzzle: list[list]) -> None:
-        if puzzle:
+    def __init__(self, puzzle: list[list], quiet=False) -> None:
+        """
+        Takes as input:
+            - puzzle -> the sudoku to check.
+            - quiet -> if True, nothing is printed. Either way, what
+                is wrong with an invalid puzzle is left in
+                self.error.
+        """
+        self.error = None
+        if isinstance(puzzle, Board):
+            # Boards only ever hold valid cell values, so all that's
+            # left to do is convert to the nested format.
+            self.puzzle = puzzle.toRows()
+            self.isValid = True
+        elif puzzle:
             if isinstance(puzzle, tuple):
                 self.puzzle = list(puzzle)
             else:
                 self.puzzle = puzzle
             self.isValid = self.__isValidSudoku()
+            if self.error is not None and not quiet:
+                print(self.error)
         else:
             self.isValid = False
+            self.error = NOT_A_SUDOKU
+        # Clues that repeat in a row, column or box. Only looked for
+        # once the puzzle is known to be a 9 x 9 grid of digits.
+        self.conflicts = self.findConflicts() if self.isValid else []
+
+    def findConflicts(self) -> list[Conflict]:
+        """
+        Looks for digits given more than once in a row, column or
+        box. Only call it on a valid puzzle.
+
+        We go over the cells once, keeping a mask of the digits seen
+        so far in each unit and of the digits seen twice. Only if a
+        digit was seen twice do we go back for the cells.
+
+        Returns a list of Conflicts, one per unit and repeated digit,
+        ordered as UNITS. Empty if the clues are consistent.
+        """
+        cells = [num for row in self.puzzle for num in row]
+        seen = [0] * 27
+        repeated = [0] * 27
+        clash = False
+        for idx, digit in enumerate(cells):
+            if digit:
+                bit = DIGIT_BIT[digit]
+                for unit in CELL_UNITS[idx]:
+                    if seen[unit] & bit:
+                        repeated[unit] |= bit
+                        clash = True
+                    seen[unit] |= bit
+        if not clash:
+            return []
+
+        return [Conflict(UNIT_KINDS[unit], unit % 9, digit,
+                         tuple(divmod(idx, 9) for idx in UNITS[unit]
+                               if cells[idx] == digit))
+                for unit, mask in enumerate(repeated)
+                for digit in MASK_DIGITS[mask]]
 
     def __isRightType(self, type_tuple: tuple, idx1: int, idx2=None) -> bool:
         """
@@ -88,7 +271,7 @@ class SudokuValidator:
             - cell entries are in range(10).
 
         Returns boolean indicating if the sudoku is
-        valid or not. 
+        valid or not. If not, the reason is left in self.error.
         """
 
         # We permit tuples instead of lists for the puzzle.
@@ -96,24 +279,24 @@ class SudokuValidator:
         # Note that this transformation has already been done
         # in the init function.
         if not isinstance(self.puzzle, list):
-            print("Not a valid 9 X 9 sudoku. It should be either a list or tuple.")
+            self.error = "Not a valid 9 X 9 sudoku. It should be either a list or tuple."
             return False
 
         if len(self.puzzle) != 9:
-            print("Not a valid 9 X 9 sudoku. It should be a 9 x 9 grid.")
+            self.error = "Not a valid 9 X 9 sudoku. It should be a 9 x 9 grid."
             return False
 
         for row_index in range(9):
             # We permit tuples or strings instead of lists for the rows.
             if not self.__isRightType((list, (tuple, str)), row_index):
-                print(
+                self.error = (
                     "Not a valid 9 X 9 sudoku. Rows should be only lists, tuples or strings of length 9.")
                 return False
 
             for entry_index in range(9):
                 # We also permit ints masked as strs for the cell entries.
                 if not self.__isRightType((int, str), row_index, entry_index):
-                    print(
+                    self.error = (
                         "Not a valid 9 X 9 sudoku. All cell entries should be numerics in range(10).")
                     return False
 
@@ -121,51 +304,823 @@ class SudokuValidator:
         return True
 
 
+class BitmaskEngine:
+    """
+    Candidate engine for the sudoku.
+
+    It keeps one 9-bit occupancy mask per row, column and box,
+    updated incrementally as digits are placed and removed. The
+    candidates for a cell are then just the digits missing from
+    all three masks, a few bitwise operations away.
+
+    Cells filled during search and propagation are pushed onto
+    trail so they can be undone in one go when we backtrack.
+
+    Every change to the cells goes through place and unplace, which
+    an observer can hook into (see observe).
+    """
+
+    def __init__(self, budget=None) -> None:
+        """
+        Takes as input:
+            - budget -> a budget.Budget limiting the searches run
+                on the engine, or None. Nodes are counted from the
+                last load. When it runs out, the search raises
+                BudgetExceeded and leaves the engine where it stopped.
+        """
+        self.budget = budget
+        self.next_check = NO_CHECK
+        self.cells = [0] * 81
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.trail = []
+        # Number of digits tried during search.
+        self.nodes = 0
+        # Number of tried digits that had to be taken back.
+        self.backtracks = 0
+        # Number of cells filled by propagation.
+        self.propagated = 0
+        # Most guesses stacked on top of each other during search.
+        self.max_depth = 0
+
+    def load(self, cells) -> bool:
+        """
+        Loads a puzzle into the engine and resets its counters.
+
+        Takes as input:
+            - cells -> an iterable of the 81 cell values in row-major
+                order, with 0 for empty cells.
+
+        Returns a boolean indicating whether or not the givens are
+        free of conflicts (i.e., no digit repeats in a row, column
+        or box).
+        """
+        rows, cols, boxes = self.rows, self.cols, self.boxes
+        for unit in range(9):
+            rows[unit] = cols[unit] = boxes[unit] = 0
+        self.trail.clear()
+        self.nodes = self.backtracks = self.propagated = self.max_depth = 0
+        self.next_check = NO_CHECK if self.budget is None else 0
+
+        consistent = True
+        for idx, digit in enumerate(cells):
+            self.cells[idx] = digit
+            if not digit:
+                continue
+            bit = DIGIT_BIT[digit]
+            r, c, b = CELL_ROW[idx], CELL_COL[idx], CELL_BOX[idx]
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                consistent = False
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+        return consistent
+
+    def observe(self, observer, every=1) -> None:
+        """
+        Attaches an observer to the engine, or detaches it if
+        observer is None.
+
+        Takes as input:
+            - observer -> a callable, called as
+                observer(event, idx, digit) with event PLACE or
+                UNPLACE, the flat index of the cell and its digit.
+            - every -> only every this many-th event is reported.
+
+        Without an observer, place and unplace are the plain methods
+        of the class and cost nothing extra. With one, we shadow them
+        on the instance with versions that count the events and
+        report a sample of them.
+
+        Raises ValueError if every is less than 1.
+        """
+        if every < 1:
+            raise ValueError("Observers need every to be at least 1.")
+        if observer is None:
+            self.__dict__.pop('place', None)
+            self.__dict__.pop('unplace', None)
+            return
+
+        place = type(self).place.__get__(self)
+        unplace = type(self).unplace.__get__(self)
+        cells = self.cells
+        events = 0
+
+        def observedPlace(idx: int, digit: int) -> None:
+            nonlocal events
+            place(idx, digit)
+            events += 1
+            if not events % every:
+                observer(PLACE, idx, digit)
+
+        def observedUnplace(idx: int) -> None:
+            nonlocal events
+            digit = cells[idx]
+            unplace(idx)
+            events += 1
+            if not events % every:
+                observer(UNPLACE, idx, digit)
+
+        self.place = observedPlace
+        self.unplace = observedUnplace
+
+    def candidates(self, idx: int) -> int:
+        """
+        Returns the mask of digits that can legally go in cell idx.
+        """
+        return ~(self.rows[CELL_ROW[idx]] |
+                 self.cols[CELL_COL[idx]] |
+                 self.boxes[CELL_BOX[idx]]) & ALL_DIGITS
+
+    def place(self, idx: int, digit: int) -> None:
+        """
+        Puts digit in the (empty) cell idx and updates the masks.
+        """
+        bit = DIGIT_BIT[digit]
+        self.cells[idx] = digit
+        self.rows[CELL_ROW[idx]] |= bit
+        self.cols[CELL_COL[idx]] |= bit
+        self.boxes[CELL_BOX[idx]] |= bit
+
+    def unplace(self, idx: int) -> None:
+        """
+        Empties cell idx and clears its digit from the masks.
+        """
+        bit = DIGIT_BIT[self.cells[idx]]
+        self.cells[idx] = 0
+        self.rows[CELL_ROW[idx]] &= ~bit
+        self.cols[CELL_COL[idx]] &= ~bit
+        self.boxes[CELL_BOX[idx]] &= ~bit
+
+    def undo(self, mark: int) -> None:
+        """
+        Empties every cell pushed onto the trail since it had
+        length mark.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            self.unplace(trail.pop())
+
+    def propagate(self) -> bool:
+        """
+        Fills naked singles (cells with a single candidate) and
+        hidden singles (digits with a single possible cell in a row,
+        column or box) until neither is left. Filled cells are
+        pushed onto the trail.
+
+        Returns False as soon as a contradiction shows up, i.e.,
+        an empty cell with no candidates or a digit with no
+        possible cell in some unit. Returns True otherwise.
+        """
+        cells = self.cells
+        candidates = self.candidates
+        trail = self.trail
+
+        progress = True
+        while progress:
+            progress = False
+
+            # Naked singles.
+            for idx in range(81):
+                if cells[idx]:
+                    continue
+                free = candidates(idx)
+                if not free:
+                    return False
+                if not free & (free - 1):
+                    self.place(idx, MASK_DIGITS[free][0])
+                    trail.append(idx)
+                    self.propagated += 1
+                    progress = True
+            if progress:
+                # Naked singles are cheaper to find, so we exhaust
+                # them before looking for hidden ones.
+                continue
+
+            # Hidden singles.
+            for unit in UNITS:
+                occupied = seen_once = seen_twice = 0
+                for idx in unit:
+                    if cells[idx]:
+                        occupied |= DIGIT_BIT[cells[idx]]
+                    else:
+                        free = candidates(idx)
+                        seen_twice |= seen_once & free
+                        seen_once |= free
+                if (occupied | seen_once) != ALL_DIGITS:
+                    # Some digit has nowhere to go in this unit.
+                    return False
+
+                hidden = seen_once & ~seen_twice & ~occupied
+                while hidden:
+                    bit = hidden & -hidden
+                    hidden ^= bit
+                    for idx in unit:
+                        if not cells[idx] and candidates(idx) & bit:
+                            self.place(idx, MASK_DIGITS[bit][0])
+                            trail.append(idx)
+                            self.propagated += 1
+                            progress = True
+                            break
+                    else:
+                        # The only cell for this digit was just taken
+                        # by another hidden single.
+                        return False
+        return True
+
+    def _pickMostConstrained(self, empties: list[int], pos: int) -> int:
+        """
+        Moves the empty cell with the fewest candidates among
+        empties[pos:] to position pos and returns its index, or
+        -1 if every cell there has been filled (by propagation).
+        Ties go to the cell that comes first in empties, so the
+        choice is deterministic.
+        """
+        cells = self.cells
+        best_pos = -1
+        best_count = 10
+        for i in range(pos, len(empties)):
+            if cells[empties[i]]:
+                continue
+            count = MASK_COUNT[self.candidates(empties[i])]
+            if count < best_count:
+                best_pos, best_count = i, count
+                if count <= 1:
+                    # Can't do better than a forced (or dead) cell.
+                    break
+        if best_pos < 0:
+            return -1
+        empties[pos], empties[best_pos] = empties[best_pos], empties[pos]
+        return empties[pos]
+
+    def search(self, empties: list[int], pos=0, rng=None,
+               strategy=ROW_MAJOR, propagate=False) -> bool:
+        """
+        The search over the empty cells.
+
+        Takes as input:
+            - empties -> flat indices of the empty cells, in the order
+                they should be filled. With the MRV strategy, the list
+                is reordered in place as cells are picked. Cells that
+                get filled by propagation are skipped.
+            - pos -> integer indicating which empty cell we start from.
+            - rng -> a random.Random used to shuffle the candidates
+                of each cell. Used when generating sudokus. If None,
+                candidates are tried in increasing order, so the
+                search is deterministic.
+            - strategy -> ROW_MAJOR or MRV.
+            - propagate -> if True, singles are propagated after every
+                guess, and the guess is dropped as soon as that runs
+                into a contradiction.
+
+        Returns a boolean indicating whether or not we were able to
+        fill every empty cell. On success, the solution is in cells.
+        On failure, the engine is back where it started.
+        """
+        return self._explore(empties, pos, rng, strategy,
+                             propagate, 1) == 1
+
+    def count(self, empties: list[int], limit=0, strategy=MRV,
+              propagate=True) -> int:
+        """
+        Counts the ways to fill the empty cells, stopping as soon as
+        limit of them have been found (0 means count them all).
+
+        Takes as input:
+            - empties, strategy, propagate -> as for search.
+            - limit -> the number of solutions after which we stop.
+
+        Returns the number of solutions found. If it is below limit,
+        the engine is back where it started. Otherwise, the last
+        solution found is left in cells.
+        """
+        return self._explore(empties, 0, None, strategy, propagate, limit)
+
+    def _explore(self, empties: list[int], pos: int, rng,
+                 strategy: str, propagate: bool, limit: int) -> int:
+        """
+        The search behind search and count.
+
+        Rather than recursing once per empty cell, we keep an explicit
+        stack with one frame per guess: (pos, cell, iterator over the
+        digits left to try, trail mark). Going back up the tree is
+        then just popping a frame and undoing the trail to its mark.
+        When a solution is found and we haven't reached limit, we
+        treat it as a dead end and carry on from the last guess.
+
+        Returns the number of solutions found, at most limit
+        (unless limit is 0).
+        """
+        cells = self.cells
+        trail = self.trail
+        mrv = strategy == MRV
+        num_empties = len(empties)
+        stack = []
+        found = 0
+
+        while True:
+            # Pick the next cell to fill.
+            if mrv:
+                idx = self._pickMostConstrained(empties, pos)
+            else:
+                while pos < num_empties and cells[empties[pos]]:
+                    pos += 1
+                idx = empties[pos] if pos < num_empties else -1
+
+            if idx < 0:
+                # We've filled every empty cell.
+                found += 1
+                if found == limit or not stack:
+                    return found
+                # Carry on with the next digit for the last guess.
+                pos, idx, digits, mark = stack.pop()
+                self.undo(mark)
+            else:
+                digits = MASK_DIGITS[self.candidates(idx)]
+                if rng is not None:
+                    digits = list(digits)
+                    rng.shuffle(digits)
+                digits = iter(digits)
+                mark = len(trail)
+
+            # Find a digit for idx that doesn't lead straight into a
+            # contradiction, going back up the stack whenever a cell
+            # runs out of digits to try.
+            while True:
+                for digit in digits:
+                    if self.nodes >= self.next_check:
+                        self.next_check = self.budget.check(self.nodes)
+                    self.nodes += 1
+                    self.place(idx, digit)
+                    trail.append(idx)
+                    if not propagate or self.propagate():
+                        break
+                    self.undo(mark)
+                    self.backtracks += 1
+                else:
+                    # We couldn't find a value that works.
+                    if not stack:
+                        return found
+                    pos, idx, digits, mark = stack.pop()
+                    self.undo(mark)
+                    self.backtracks += 1
+                    continue
+                break
+
+            stack.append((pos, idx, digits, mark))
+            if len(stack) > self.max_depth:
+                self.max_depth = len(stack)
+            pos += 1
+
+
+def _splitSubproblems(engine: BitmaskEngine, count: int, propagate: bool,
+                      budget=None):
+    """
+    Expands the top levels of the search tree, breadth first, until
+    there are at least count open branches.
+    Called by the parallel_search function.
+
+    Each level guesses every candidate of the most constrained empty
+    cell of every branch (propagating singles if propagate is True)
+    and drops the branches that run into a contradiction.
+
+    Returns a tuple (subproblems, solution, nodes):
+        - subproblems -> the open branches, each as 81 cell values.
+        - solution -> the cell values of a solution, if one turned up
+            while expanding. Otherwise None.
+        - nodes -> the number of digits guessed while expanding.
+    Both are empty/None if every branch died, i.e., there is no
+    solution. The engine is used as scratch space.
+
+    Raises BudgetExceeded, with its nodes set, if budget (a
+    budget.Budget) runs out while expanding.
+    """
+    frontier = [bytes(engine.cells)]
+    if 0 not in frontier[0]:
+        # Propagation already filled in the grid: nothing to split.
+        return [], frontier[0], 0
+    nodes = 0
+    next_check = NO_CHECK if budget is None else 0
+    while len(frontier) < count:
+        branches = []
+        for cells in frontier:
+            engine.load(cells)
+            empties = [idx for idx in range(81) if not cells[idx]]
+            idx = engine._pickMostConstrained(empties, 0)
+            for digit in MASK_DIGITS[engine.candidates(idx)]:
+                if nodes >= next_check:
+                    try:
+                        next_check = budget.check(nodes)
+                    except BudgetExceeded as exceeded:
+                        exceeded.nodes = nodes
+                        raise
+                nodes += 1
+                engine.place(idx, digit)
+                engine.trail.append(idx)
+                if not propagate or engine.propagate():
+                    branch = bytes(engine.cells)
+                    if 0 not in branch:
+                        return [], branch, nodes
+                    branches.append(branch)
+                engine.undo(0)
+        if not branches:
+            return [], None, nodes
+        frontier = branches
+    return frontier, None, nodes
+
+
+def _searchSubproblem(args: tuple) -> tuple:
+    """
+    Searches one branch of the tree in a worker process.
+    Called by the parallel_search function.
+
+    Returns a tuple (solution, nodes, reason) where solution is the
+    cell values of a solution (None if there isn't one), nodes is the
+    number of digits tried and reason is why the budget ran out (see
+    budget.BudgetExceeded), or None if it didn't.
+    """
+    cells, strategy, propagate, limits = args
+    # Budgets hold on to their cancellation token, which can't always
+    # be sent to another process, so we only get the limits. The
+    # parent process keeps an eye on the token.
+    engine = BitmaskEngine(None if limits is None else Budget(*limits))
+    engine.load(cells)
+    empties = [idx for idx in range(81) if not cells[idx]]
+    # BudgetExceeded is falsy, which executors take for "no
+    # exception", so we hand back the reason instead of raising.
+    try:
+        found = engine.search(empties, strategy=strategy, propagate=propagate)
+    except BudgetExceeded as exceeded:
+        return None, engine.nodes, exceeded.reason
+    if found:
+        return bytes(engine.cells), engine.nodes, None
+    return None, engine.nodes, None
+
+
+def parallel_search(engine: BitmaskEngine, workers: int, strategy=MRV,
+                    propagate=True, split_factor=8, budget=None) -> tuple:
+    """
+    Searches for a solution to the puzzle loaded in engine with a
+    pool of worker processes.
+
+    The top of the search tree is expanded into about
+    workers * split_factor independent subproblems, which are handed
+    out to the workers one at a time, so there are never more than
+    workers of them in flight. The first solution found stops the
+    pool: the subproblems not yet started are dropped, and the ones
+    running are left to finish in the background. To prove there is
+    no solution, every subproblem has to be searched to the end.
+
+    With a budget (a budget.Budget), the digits guessed while
+    splitting count against it, and every worker gets the time left
+    and a share of the nodes left for its own search. The shares of
+    the searches in flight never add up to more than the nodes left,
+    so the workers can't go over max_nodes together (though one of
+    them may run out of its share first). We check the time limit,
+    the cancellation token and the nodes of the finished workers
+    every POLL_SECONDS. BudgetExceeded is raised as soon as one of
+    them runs out, with its nodes set to the number of digits tried
+    so far, by the workers that finished or ran out (as for the
+    return value).
+
+    Returns a pair (solution, nodes) where solution is the 81 cell
+    values of a solution (None if there isn't one) and nodes is the
+    number of digits tried while splitting and by the workers that
+    finished. The engine itself is left untouched.
+    """
+    scratch = BitmaskEngine()
+    scratch.load(engine.cells)
+    subproblems, solution, nodes = _splitSubproblems(
+        scratch, workers * split_factor, propagate, budget)
+    if not subproblems:
+        return solution, nodes
+
+    subproblems = deque(subproblems)
+    executor = ProcessPoolExecutor(min(workers, len(subproblems)))
+    # Each search in flight maps to its share of the nodes (0 for no
+    # limit).
+    pending = {}
+    try:
+        while subproblems or pending:
+            while subproblems and len(pending) < workers:
+                limits = share = None
+                if budget is not None:
+                    share = 0
+                    if budget.max_nodes:
+                        left = budget.max_nodes - nodes - sum(pending.values())
+                        if left <= 0:
+                            break
+                        share = max(1, left // (workers - len(pending)))
+                    limits = (share, budget.remaining())
+                future = executor.submit(
+                    _searchSubproblem,
+                    (subproblems.popleft(), strategy, propagate, limits))
+                pending[future] = share or 0
+            if not pending:
+                # The nodes are all used up.
+                budget.check(nodes)
+            done, _ = wait(pending, None if budget is None else POLL_SECONDS,
+                           FIRST_COMPLETED)
+            for future in done:
+                del pending[future]
+                solution, branch_nodes, reason = future.result()
+                nodes += branch_nodes
+                if reason is not None:
+                    raise BudgetExceeded(reason)
+                if solution is not None:
+                    return solution, nodes
+            if budget is not None:
+                budget.check(nodes)
+    except BudgetExceeded as exceeded:
+        exceeded.nodes = nodes
+        raise
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return None, nodes
+
+
+class SolveStats:
+    """
+    The statistics of one solve, as found in the result of
+    SudokuSolver.solve(stats=True) and returned by
+    SudokuSolver.solveSudoku(stats=True).
+
+    Attributes:
+        - backend -> the backend used.
+        - nodes -> values (or choices, for DLX) tried by the search.
+        - backtracks -> tried values that had to be taken back.
+        - max_depth -> most guesses stacked on top of each other.
+        - propagated -> cells filled by propagation.
+        - validation_time, propagation_time, search_time -> seconds
+            spent checking the puzzle, filling singles before the
+            search and searching (propagation during the search
+            counts as search).
+        - total_time -> seconds spent in solveSudoku.
+    """
+
+    FIELDS = ('backend', 'nodes', 'backtracks', 'max_depth', 'propagated',
+              'validation_time', 'propagation_time', 'search_time',
+              'total_time')
+    __slots__ = FIELDS + ('start', 'last')
+
+    def __init__(self, backend: str) -> None:
+        self.backend = backend
+        self.nodes = self.backtracks = self.max_depth = self.propagated = 0
+        self.validation_time = self.propagation_time = self.search_time = 0.0
+        self.total_time = 0.0
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, field: str) -> None:
+        """
+        Adds the time since the last lap (or since the start) to
+        the timing field.
+        """
+        now = time.perf_counter()
+        setattr(self, field, getattr(self, field) + now - self.last)
+        self.last = now
+
+    def finish(self, solver: 'SudokuSolver') -> None:
+        """
+        Takes the counters from solver and stops the clock.
+        """
+        self.nodes = solver.nodes
+        self.backtracks = solver.backtracks
+        self.max_depth = solver.max_depth
+        self.propagated = solver.propagated
+        self.total_time = time.perf_counter() - self.start
+
+    def asDict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{field}={value!r}'
+                           for field, value in self.asDict().items())
+        return f'SolveStats({fields})'
+
+
 class SudokuSolver:
     """
     A sudoku solver.
     """
 
-    def __init__(self, puzzle=None) -> None:
+    def __init__(self, puzzle=None, rng=None) -> None:
+        """
+        Takes as input:
+            - puzzle -> the sudoku to solve.
+            - rng -> a random.Random for generating sudokus. Pass a
+                seeded one to make the sudokus generated
+                reproducible. A fresh, unseeded one if None.
+        """
         self.puzzle = puzzle
+        self.rng = rng if rng is not None else Random()
+        # The rng the search shuffles candidates with. Only set while
+        # generating; solving never shuffles, so it is deterministic.
+        self.search_rng = None
+        # The budget of the current solve, if any, and the node count
+        # at which the list-scan search checks it next.
+        self.budget = None
+        self.next_check = NO_CHECK
+        self.nodes = 0
+        self.backtracks = 0
+        self.propagated = 0
+        self.max_depth = 0
+        # The SolveStats of the current solve, if asked for.
+        self.stats = None
+        # The observer of the bitmask engine during the current
+        # solve, if any, and how often it hears from it.
+        self.observer = None
+        self.observe_every = 1
         # self.validator = None
         # self.row_ids = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
 
-    def solveSudoku(self, generate=False):
+    def solve(self, backend=BITMASK, strategy=ROW_MAJOR, propagate=True,
+              workers=1, max_nodes=0, timeout=None, cancel=None,
+              stats=False, observer=None, observe_every=1) -> SolveResult:
+        """
+        Solves self.puzzle without printing anything.
+
+        The backend argument picks the search used:
+            - BITMASK -> the bitmask candidate engine (default).
+            - LIST_SCAN -> the original list-scanning search in
+                _recursiveSolveSudoku, kept for comparison.
+            - DLX -> Dancing Links over the 324 exact cover
+                constraints. Best for the hardest puzzles and for
+                proving there is no solution.
+
+        The strategy argument picks the order in which empty cells
+        are visited by the bitmask engine:
+            - ROW_MAJOR -> fixed row-major order (default).
+            - MRV -> the cell with the fewest candidates first.
+        The list-scan backend only supports ROW_MAJOR. DLX ignores
+        the strategy, as it always picks the constraint with the
+        fewest choices left.
+
+        If propagate is True (the default), the bitmask engine fills
+        naked and hidden singles before the search and after every
+        guess, dropping guesses that lead to a contradiction. The
+        list-scan and DLX backends do no propagation.
+
+        With workers > 1, the bitmask engine splits the top of the
+        search tree into independent subproblems and searches them
+        in a pool of that many processes. This only pays off for
+        puzzles that take seconds to solve (or to prove unsolvable).
+
+        The search can be given a budget, checked every few thousand
+        nodes:
+            - max_nodes -> the most values the search may try
+                (0 means no limit).
+            - timeout -> the most seconds the solve may take.
+            - cancel -> a cancellation token (e.g. a threading.Event)
+                that stops the search once it is set.
+        If the budget runs out, the puzzle is left as it was and the
+        result has the BUDGET_EXCEEDED status, with the
+        budget.BudgetExceeded (the reason and the statistics of the
+        search so far) in its exceeded attribute.
+
+        To follow the search step by step (e.g. to animate it), pass
+        an observer, which the bitmask engine calls as
+        observer(event, idx, digit) for every observe_every-th digit
+        placed or taken back (see BitmaskEngine.observe). Only the
+        bitmask backend in a single process supports observers.
+
+        Solving is deterministic: candidates are always tried in
+        increasing order, so the same puzzle gives the same solution
+        and node counts on every run. With generate, they are
+        shuffled with self.rng instead.
+
+        The number of search nodes visited, guesses taken back,
+        cells filled by propagation and the search depth reached are
+        left in self.nodes, self.backtracks, self.propagated and
+        self.max_depth. With stats, these and the time spent on each
+        step are also gathered in a SolveStats, found in the stats of
+        the result. Without it, no timings are taken at all.
+
+        On success, the solution is also written into self.puzzle.
+
+        Returns a SolveResult with the status, the solution, the
+        stats and any warnings. Raises ValueError on options that
+        don't go together.
+        """
+        return self._solve(False, backend, strategy, propagate, workers,
+                           max_nodes, timeout, cancel, stats, observer,
+                           observe_every)
+
+    def solveSudoku(self, generate=False, backend=BITMASK, strategy=ROW_MAJOR,
+                    propagate=True, workers=1, max_nodes=0, timeout=None,
+                    cancel=None, stats=False, observer=None, observe_every=1):
         """
         Main function.
         Takes as input, a 9 x 9 sudoku represented
         as a list of lists.
 
-        If solved successfully, it prints out the solved puzzle,
-        else, it prints an appropriate message.
+        Solves it with solve (see there for the arguments) and prints
+        out the warnings and, if the puzzle wasn't solved, an
+        appropriate message. With generate, self.puzzle is filled in
+        with candidates tried in an order drawn from self.rng, and
+        nothing is printed.
 
-        Returns boolean indicating whether or not the puzzle
-        was solved successfully.
+        Returns a pair (True, rows) if the puzzle was solved, rows
+        being the solution as 9 strings of 9 digits. Returns False if
+        there is no solution, and a budget.BudgetExceeded (which is
+        falsy) if the search ran out of budget.
 
         In the case where the puzzle was found to be invalid
-        due to type inconsistencies, it returns None.
+        due to type inconsistencies, or had no empty cell, it
+        returns None.
+
+        With stats, the return value becomes a pair (result, stats).
         """
+        result = self._solve(generate, backend, strategy, propagate, workers,
+                             max_nodes, timeout, cancel, stats, observer,
+                             observe_every)
+        if not generate:
+            SudokuPrinter().printResult(result, show_solution=False)
+
+        if result.status == SOLVED:
+            value = None if generate else (True, result.rows())
+        elif result.status == UNSOLVABLE:
+            value = False
+        elif result.status == BUDGET_EXCEEDED:
+            value = result.exceeded
+        else:
+            value = None
+        return (value, result.stats) if stats else value
+
+    def _solve(self, generate: bool, backend: str, strategy: str,
+               propagate: bool, workers: int, max_nodes: int, timeout,
+               cancel, stats: bool, observer, observe_every: int) -> SolveResult:
+        """
+        Checks the options of solve and solveSudoku and runs the
+        solve, gathering its stats if asked to.
+        """
+        if backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend {backend!r}. Choose one of {BACKENDS}.")
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy {strategy!r}. Choose one of {STRATEGIES}.")
+        if backend == LIST_SCAN and strategy != ROW_MAJOR:
+            raise ValueError(
+                "The list-scan backend only supports the row-major strategy.")
+        if backend != BITMASK and workers > 1:
+            raise ValueError("Only the bitmask backend can use workers.")
+        if observer is not None and (backend != BITMASK or workers > 1):
+            raise ValueError(
+                "Observers need the bitmask backend in a single process.")
+        if observe_every < 1:
+            raise ValueError("observe_every must be at least 1.")
+        self.observer = observer
+        self.observe_every = observe_every
+
+        self.stats = SolveStats(backend) if stats else None
+        result = self._solveSudoku(generate, backend, strategy, propagate,
+                                   workers, max_nodes, timeout, cancel)
+        if stats:
+            self.stats.finish(self)
+            result.stats = self.stats
+        return result
+
+    def _solveSudoku(self, generate: bool, backend: str, strategy: str,
+                     propagate: bool, workers: int, max_nodes: int,
+                     timeout, cancel) -> SolveResult:
+        """
+        The body of solve, once its arguments have been checked.
+        Nothing in here prints.
+        """
+        start = time.perf_counter()
+        self.nodes = self.backtracks = self.propagated = self.max_depth = 0
+        self.search_rng = self.rng if generate else None
+        if max_nodes or timeout is not None or cancel is not None:
+            self.budget = Budget(max_nodes, timeout, cancel)
+            self.next_check = 0
+        else:
+            self.budget = None
+            self.next_check = NO_CHECK
 
         if generate:
-            self._recursiveSolveSudoku([(i, j) for i in range(9) for j in range(9)
-                                        if self.puzzle[i][j] == 0])
-            return None
+            allzeros = [(i, j) for i in range(9) for j in range(9)
+                        if self.puzzle[i][j] == 0]
+            try:
+                solved = self._runBackend(allzeros, backend, strategy,
+                                          propagate, workers)
+                if self.stats is not None:
+                    self.stats.lap('search_time')
+            except BudgetExceeded as exceeded:
+                return self._budgetExceeded(exceeded, allzeros, start)
+            if not solved:
+                return SolveResult(UNSOLVABLE, message=PUZZLE_NOT_SOLVABLE)
+            return SolveResult(SOLVED, self._solution())
 
         # We do a validity check on the puzzle.
-        self.validator = SudokuValidator(self.puzzle)
+        self.validator = SudokuValidator(self.puzzle, quiet=True)
         if not self.validator.isValid:
-            # The puzzle is not valid. The appropriate message
-            # has been printed. We quit the program here.
-            return None
+            # The puzzle is not valid. We quit here, with the
+            # reason why.
+            return SolveResult(INVALID, message=self.validator.error)
         self.puzzle = self.validator.puzzle
-
-        # We use the _print_sudoku function to print
-        # our puzzle with one modification: We set empty
-        # cells to '*' just to make it easier to see
-        # what we know and what we don't.
-        # self._print_sudoku([['*' if num == 0 else num for num in row]
-        #                    for row in self.puzzle])
+        if self.stats is not None:
+            self.stats.lap('validation_time')
 
         # We collect all empty cells in one place.
         # This list is what we will use to recursively solve
@@ -175,32 +1130,167 @@ class SudokuSolver:
 
         # No point solving a "solved" puzzle.
         if not allzeros:
-            print("Puzzle has no zero entry.")
-            return None
+            return SolveResult(NO_EMPTY_CELLS, message=NO_EMPTY_CELLS_LEFT)
 
         # To be guaranteed a unique solution, the sudoku should have
         # at least 17 clues correctly placed (or put another way, it
         # should have at most 64 empty cells). If this is not the case
-        # we print an appropriate message and go on to attempt to
-        # solve the puzzle.
+        # we warn about it and go on to attempt to solve the puzzle.
+        warnings = []
         if len(allzeros) > 64:
-            print(NOT_ENOUGH_CLUES)
+            warnings.append(NOT_ENOUGH_CLUES)
 
-        # We call the _recursiveSolveSudoku function to solve
-        # the sudoku.
-        if self._recursiveSolveSudoku(allzeros):
-            # If we were able to solve the sudoku, we return True
-            # and print it out nicely with the _print_sudoku function.
-            #
-            # For the sake of testing, we also return the solved puzzle
-            # as a list of strings (each row is combined into a string).
-            # self._print_sudoku(self.puzzle)
-            return True, [''.join(str(itm) for itm in row) for row in self.puzzle]
+        # Clues that repeat in a unit can't be part of a solution, and
+        # there is no point in searching to find that out.
+        conflicts = self.validator.conflicts
+        if conflicts:
+            message = CONFLICTING_CLUES.format(conflicts='\n'.join(
+                f"  - {conflict}" for conflict in conflicts))
+            return SolveResult(UNSOLVABLE, warnings=warnings, message=message,
+                               conflicts=conflicts)
 
-        else:
-            print(PUZZLE_NOT_SOLVABLE)
+        # We call the chosen backend to solve the sudoku.
+        try:
+            solved = self._runBackend(allzeros, backend, strategy,
+                                      propagate, workers)
+            if self.stats is not None:
+                self.stats.lap('search_time')
+        except BudgetExceeded as exceeded:
+            result = self._budgetExceeded(exceeded, allzeros, start)
+            result.warnings = warnings
+            return result
+
+        if solved:
+            return SolveResult(SOLVED, self._solution(), warnings)
+        return SolveResult(UNSOLVABLE, warnings=warnings,
+                           message=PUZZLE_NOT_SOLVABLE)
+
+    def _solution(self) -> str:
+        """
+        Returns self.puzzle, once solved, in the one-line format.
+        """
+        return ''.join(str(num) for row in self.puzzle for num in row)
+
+    def _runBackend(self, allzeros: list[tuple], backend: str,
+                    strategy: str, propagate: bool, workers: int) -> bool:
+        """
+        Calls the search of the chosen backend on the empty cells.
+        Called by the solveSudoku function.
+        """
+        if backend == BITMASK:
+            return self._bitmaskSolveSudoku(allzeros, self.search_rng,
+                                            strategy, propagate, workers)
+        if backend == DLX:
+            return self._dlxSolveSudoku(allzeros, self.search_rng)
+        return self._recursiveSolveSudoku(allzeros)
+
+    def _budgetExceeded(self, exceeded: BudgetExceeded, allzeros: list[tuple],
+                        start: float) -> SolveResult:
+        """
+        Puts the puzzle back the way it was after a search ran out of
+        budget, and fills in the statistics of exceeded.
+        Called by the solveSudoku function.
+
+        Returns the SolveResult of the solve.
+        """
+        if self.stats is not None:
+            self.stats.lap('search_time')
+        # Only the list-scan search writes into the puzzle as it goes.
+        for row, col in allzeros:
+            self.puzzle[row][col] = 0
+        exceeded.nodes = self.nodes
+        exceeded.backtracks = self.backtracks
+        exceeded.propagated = self.propagated
+        exceeded.elapsed = time.perf_counter() - start
+        message = SEARCH_BUDGET_EXCEEDED.format(reason=exceeded.reason,
+                                                nodes=exceeded.nodes)
+        return SolveResult(BUDGET_EXCEEDED, message=message, exceeded=exceeded)
+
+    def _bitmaskSolveSudoku(self, allzeros: list[tuple], rng=None,
+                            strategy=ROW_MAJOR, propagate=True,
+                            workers=1) -> bool:
+        """
+        Solves the sudoku with the BitmaskEngine.
+        Takes as input:
+            - allzeros -> the list of all empty cells in the puzzle.
+            - rng, strategy, propagate -> passed on to
+                BitmaskEngine.search. With propagate, singles are
+                also filled once before the search starts.
+            - workers -> if more than 1, the search is split across
+                that many processes by parallel_search.
+
+        On success, the solution is written back into self.puzzle.
+        Returns a boolean indicating whether or not we were able to
+        solve the sudoku.
+        """
+        engine = BitmaskEngine(self.budget)
+        if self.observer is not None:
+            engine.observe(self.observer, self.observe_every)
+        if not engine.load(num for row in self.puzzle for num in row):
+            # Some given repeats in a row, column or box.
+            # No amount of searching will fix that.
+            return False
+
+        # The search only needs to visit the cells that are still
+        # empty after the first round of propagation. If it runs out
+        # of budget, we still want the statistics so far.
+        try:
+            solved = not propagate or engine.propagate()
+            if self.stats is not None:
+                self.stats.lap('propagation_time')
+            if solved and workers > 1:
+                try:
+                    cells, nodes = parallel_search(engine, workers, strategy,
+                                                   propagate, budget=self.budget)
+                except BudgetExceeded as exceeded:
+                    engine.nodes += exceeded.nodes
+                    raise
+                solved = cells is not None
+                if solved:
+                    engine.cells[:] = cells
+                engine.nodes += nodes
+            elif solved:
+                empties = [row * 9 + col for row, col in allzeros
+                           if not engine.cells[row * 9 + col]]
+                solved = engine.search(empties, rng=rng,
+                                       strategy=strategy, propagate=propagate)
+        finally:
+            self.nodes = engine.nodes
+            self.backtracks = engine.backtracks
+            self.propagated = engine.propagated
+            self.max_depth = engine.max_depth
+        if not solved:
             return False
 
+        for row, col in allzeros:
+            self.puzzle[row][col] = engine.cells[row * 9 + col]
+        return True
+
+    def _dlxSolveSudoku(self, allzeros: list[tuple], rng=None) -> bool:
+        """
+        Solves the sudoku with Dancing Links.
+        Takes as input:
+            - allzeros -> the list of all empty cells in the puzzle.
+            - rng -> passed on to DancingLinks.solve.
+
+        On success, the solution is written back into self.puzzle.
+        Returns a boolean indicating whether or not we were able to
+        solve the sudoku.
+        """
+        links = DancingLinks((num for row in self.puzzle for num in row),
+                             self.budget)
+        try:
+            cells = links.solve(rng)
+        finally:
+            self.nodes = links.nodes
+            self.max_depth = links.max_depth
+        if cells is None:
+            return False
+
+        for row, col in allzeros:
+            self.puzzle[row][col] = cells[row * 9 + col]
+        return True
+
     def _recursiveSolveSudoku(self, allzeros: list[tuple], pos=0) -> bool:
         """
         The recursive solver for the sudoku.
@@ -236,7 +1326,8 @@ class SudokuSolver:
                   j not in [self.puzzle[k][col] for k in range(9)] and
                   j not in grid]
 
-        shuffle(not_in)
+        if self.search_rng is not None:
+            self.search_rng.shuffle(not_in)
 
         ind = 0
         while ind < len(not_in):
@@ -257,8 +1348,13 @@ class SudokuSolver:
             # i.e, the not_in list turns out to be empty.
 
             possible_value = not_in[ind]
+            if self.nodes >= self.next_check:
+                self.next_check = self.budget.check(self.nodes)
+            self.nodes += 1
             self.puzzle[row][col] = possible_value
             pos += 1
+            if pos > self.max_depth:
+                self.max_depth = pos
             trial = self._recursiveSolveSudoku(allzeros, pos)
             if not trial:
                 self.puzzle[row][col] = 0
@@ -271,6 +1367,274 @@ class SudokuSolver:
         return False
 
 
+def solve(puzzle, **options) -> SolveResult:
+    """
+    Solves a puzzle without printing anything, and without changing
+    the puzzle passed in.
+
+    Takes as input the puzzle, in any of the formats SudokuSolver
+    accepts, and the options of SudokuSolver.solve.
+
+    Returns a SolveResult.
+    """
+    if isinstance(puzzle, (list, tuple)):
+        puzzle = [list(row) if isinstance(row, (list, tuple)) else row
+                  for row in puzzle]
+    return SudokuSolver(puzzle).solve(**options)
+
+
+def count_solutions(puzzle, limit=2) -> int:
+    """
+    Counts the solutions of a puzzle, stopping as soon as limit
+    of them have been found (0 means count them all). With the
+    default limit of 2, this tells us cheaply whether or not the
+    puzzle has a unique solution:
+        - 0 -> no solution,
+        - 1 -> a unique solution,
+        - 2 -> more than one solution.
+
+    The puzzle can be in any of the formats SudokuSolver accepts.
+    Raises ValueError if it is not a valid 9 x 9 sudoku.
+    """
+    if puzzle and not isinstance(puzzle, Board):
+        # The validator rewrites the rows in place, and the puzzle
+        # is the caller's.
+        puzzle = [list(row) if isinstance(row, (list, tuple)) else row
+                  for row in puzzle]
+    validator = SudokuValidator(puzzle, quiet=True)
+    if not validator.isValid:
+        raise ValueError("Not a valid 9 X 9 sudoku.")
+
+    engine = BitmaskEngine()
+    if not engine.load(num for row in validator.puzzle for num in row):
+        return 0
+    if not engine.propagate():
+        return 0
+    empties = [idx for idx in range(81) if not engine.cells[idx]]
+    return engine.count(empties, limit)
+
+
+def remove_clues(solution, rng, clues=0, engine=None, backend=BITMASK) -> list:
+    """
+    Turns a solved grid into a puzzle with a unique solution by
+    taking clues out one at a time, in an order drawn from rng, and
+    putting each back if the puzzle stops having a unique solution.
+
+    A removal only needs a search for a second solution: the puzzle
+    before it had a single solution, so the puzzle after it has
+    another one exactly when the removed cell can hold a different
+    digit. We try those digits, stopping at the first solution.
+    The engine keeps the current puzzle loaded throughout, so taking
+    a clue out or putting it back is a single unplace or place.
+
+    With the DLX backend, every removal instead counts the solutions
+    of the puzzle with DancingLinks.count, up to 2. That is slower,
+    as the links are built again each time, but checks the bitmask
+    engine against an independent counter.
+
+    Takes as input:
+        - solution -> the 81 cell values of a solved grid.
+        - rng -> a random.Random.
+        - clues -> the number of clues to stop at. We go on as long
+            as clues can be taken out if 0, or if the grid runs out
+            of removable clues before getting there.
+        - engine -> a BitmaskEngine to work in. A new one if None.
+            Only used by the bitmask backend.
+        - backend -> BITMASK or DLX, the solver that checks each
+            removal.
+
+    Returns the 81 cell values of the puzzle, with 0 for empty cells.
+    """
+    if backend not in (BITMASK, DLX):
+        raise ValueError(
+            f"remove_clues supports the {BITMASK!r} and {DLX!r} backends.")
+    if backend == DLX:
+        cells = bytearray(solution)
+    else:
+        if engine is None:
+            engine = BitmaskEngine()
+        engine.load(solution)
+        cells = engine.cells
+    order = list(range(81))
+    rng.shuffle(order)
+    remaining = 81
+    for idx in order:
+        if remaining <= clues:
+            break
+        digit = cells[idx]
+        if backend == DLX:
+            cells[idx] = 0
+            if DancingLinks(cells).count(2) > 1:
+                cells[idx] = digit
+            else:
+                remaining -= 1
+            continue
+        engine.unplace(idx)
+        if _hasOtherSolution(engine, idx, digit):
+            engine.place(idx, digit)
+        else:
+            remaining -= 1
+    return list(cells)
+
+
+def _hasOtherSolution(engine: BitmaskEngine, idx: int, digit: int) -> bool:
+    """
+    Tells whether the puzzle in the engine can be solved with
+    something other than digit in the empty cell idx. The engine is
+    left as it was. Called by the remove_clues function.
+    """
+    cells = engine.cells
+    for other in MASK_DIGITS[engine.candidates(idx) & ~DIGIT_BIT[digit]]:
+        engine.place(idx, other)
+        engine.trail.append(idx)
+        found = engine.propagate() and engine.search(
+            [empty for empty in range(81) if not cells[empty]],
+            strategy=MRV, propagate=True)
+        engine.undo(0)
+        if found:
+            return True
+    return False
+
+
+def parse_puzzle(line) -> bytes:
+    """
+    Parses a puzzle in the one-line format: 81 characters in
+    row-major order, with '0' or '.' for empty cells.
+
+    Takes as input a str, bytes, bytearray, memoryview or Board and
+    returns the 81 cell values as a bytearray. Raises ValueError if
+    the line is not a valid puzzle.
+    """
+    if isinstance(line, Board):
+        return line.cells
+    return Board.fromString(line).cells
+
+
+def format_puzzle(cells) -> str:
+    """
+    Turns 81 cell values into the one-line format.
+    """
+    return bytes(cells).translate(FORMAT_TABLE).decode('ascii')
+
+
+def solve_many(puzzles, strategy=MRV, propagate=True, jobs=1,
+               chunksize=256, ordered=True, backend=BITMASK):
+    """
+    Solves many puzzles in the one-line format.
+
+    Takes as input:
+        - puzzles -> an iterable of puzzles, each an 81-character str
+            or bytes with '0' or '.' for empty cells, or a Board.
+        - strategy, propagate -> as for SudokuSolver.solveSudoku.
+        - jobs -> number of worker processes. With 1 (the default),
+            everything runs in this process. None means one worker
+            per CPU.
+        - chunksize -> number of puzzles sent to a worker at a time.
+            Bigger chunks mean less pickling per puzzle.
+        - ordered -> if False, results come back as soon as their
+            chunk is done, in whatever order that happens.
+        - backend -> BITMASK or DLX.
+
+    With the bitmask backend, a single BitmaskEngine is reused for
+    all the puzzles of a process. Nothing is printed.
+
+    When ordered, yields the solution of each puzzle (in input order)
+    as an 81-character str, or None if the puzzle has no solution.
+    When not ordered, yields (index, solution) pairs instead, index
+    being the position of the puzzle in the input.
+    Raises ValueError on a line that isn't a valid puzzle.
+    """
+    if backend not in (BITMASK, DLX):
+        raise ValueError(
+            f"solve_many supports the {BITMASK!r} and {DLX!r} backends.")
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if jobs > 1:
+        return _solveManyParallel(puzzles, strategy, propagate, backend,
+                                  jobs, chunksize, ordered)
+    solutions = _solveManySerial(puzzles, strategy, propagate, backend)
+    return solutions if ordered else enumerate(solutions)
+
+
+def _solveManySerial(puzzles, strategy, propagate, backend=BITMASK):
+    """
+    The single-process generator behind solve_many.
+    """
+    if backend == DLX:
+        for line in puzzles:
+            cells = DancingLinks(parse_puzzle(line)).solve()
+            yield None if cells is None else format_puzzle(cells)
+        return
+
+    engine = BitmaskEngine()
+    cells = engine.cells
+    for line in puzzles:
+        if not engine.load(parse_puzzle(line)) or (
+                propagate and not engine.propagate()):
+            yield None
+            continue
+        empties = [idx for idx in range(81) if not cells[idx]]
+        if engine.search(empties, strategy=strategy, propagate=propagate):
+            yield format_puzzle(cells)
+        else:
+            yield None
+
+
+def _solveChunk(chunk: list, strategy: str, propagate: bool,
+                backend: str) -> list:
+    """
+    Solves a chunk of puzzles in a worker process.
+    Called by the _solveManyParallel function.
+    """
+    return list(_solveManySerial(chunk, strategy, propagate, backend))
+
+
+def _solveManyParallel(puzzles, strategy, propagate, backend, jobs,
+                       chunksize, ordered):
+    """
+    The process pool generator behind solve_many.
+
+    Puzzles are read lazily and sent to the workers in chunks. We
+    keep a few chunks per worker in flight, so the workers never
+    wait on us and we never hold the whole input in memory.
+    """
+    puzzles = iter(puzzles)
+    max_pending = jobs * 4
+    executor = ProcessPoolExecutor(jobs)
+    try:
+        if ordered:
+            pending = deque()
+            while chunk := list(islice(puzzles, chunksize)):
+                pending.append(executor.submit(
+                    _solveChunk, chunk, strategy, propagate, backend))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            # Each future maps to the index of the first puzzle
+            # of its chunk.
+            pending = {}
+            start = 0
+            while True:
+                chunk = list(islice(puzzles, chunksize))
+                if chunk:
+                    future = executor.submit(
+                        _solveChunk, chunk, strategy, propagate, backend)
+                    pending[future] = start
+                    start += len(chunk)
+                    if len(pending) < max_pending:
+                        continue
+                elif not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from enumerate(future.result(), pending.pop(future))
+    finally:
+        # If we stopped early, there's no point finishing the rest.
+        executor.shutdown(cancel_futures=True)
+
+
 class SudokuPrinter:
     ROW_IDS = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
 
@@ -289,6 +1653,18 @@ class SudokuPrinter:
             self.__print_sudoku(puzzle)
         return None
 
+    def printResult(self, result: SolveResult, show_solution=True) -> None:
+        """
+        Prints out a SolveResult: its warnings, then the solution as
+        a grid (if show_solution) or the reason there is none.
+        """
+        for warning in result.warnings:
+            print(warning)
+        if result.message is not None:
+            print(result.message)
+        elif show_solution and result.solution is not None:
+            self.__print_sudoku(result.rows())
+
     def __print_sudoku(self, puzzle: list[list]) -> None:
         """
         Helper function to print the sudoku.
@@ -306,11 +1682,48 @@ class SudokuPrinter:
 
 
 class SudokuGenerator:
-    def __init__(self) -> None:
+    def __init__(self, rng=None, source=SEARCH) -> None:
+        """
+        Takes as input:
+            - rng -> a random.Random all the randomness is drawn
+                from. Pass a seeded one to get the same sudoku every
+                time. A fresh, unseeded one if None.
+            - source -> where full grids come from: SEARCH or
+                TEMPLATE.
+        """
+        if source not in GRID_SOURCES:
+            raise ValueError(
+                f"Unknown grid source {source!r}. Choose one of {GRID_SOURCES}.")
+        self.rng = rng if rng is not None else Random()
+        self.source = source
         self.puzzle = [[0] * 9 for _ in range(9)]
-        self.puzzle[randint(0, 8)][randint(0, 8)] = randint(1, 9)
+        if source == SEARCH:
+            self.puzzle[self.rng.randint(0, 8)][self.rng.randint(0, 8)] = self.rng.randint(1, 9)
 
     def generateSudoku(self) -> list[list]:
-        solver = SudokuSolver(self.puzzle)
+        if self.source == TEMPLATE:
+            grid = random_transform(self.rng).apply(self.rng.choice(SEED_GRIDS))
+            self.puzzle = [list(grid[start:start + 9]) for start in range(0, 81, 9)]
+            return self.puzzle
+        solver = SudokuSolver(self.puzzle, self.rng)
         solver.solveSudoku(generate=True)
         return self.puzzle
+
+    def generatePuzzle(self, clues=0, backend=BITMASK) -> list[list]:
+        """
+        Generates a puzzle with a unique solution: a full grid (see
+        generateSudoku) with clues taken out by remove_clues, down
+        to clues of them if it can (as few as it can if clues is 0).
+        backend (BITMASK or DLX) is the solver that checks each
+        removal.
+
+        The full grid is kept in self.solution and the puzzle in
+        self.puzzle.
+
+        Returns the puzzle, with 0 for empty cells.
+        """
+        self.solution = [list(row) for row in self.generateSudoku()]
+        cells = remove_clues([num for row in self.solution for num in row],
+                             self.rng, clues, backend=backend)
+        self.puzzle = [cells[start:start + 9] for start in range(0, 81, 9)]
+        return self.puzzle
@@ -1,6 +1,6 @@
 import time
-from random import randint, shuffle
 
+from oop_solver import remove_clues
 from solver import SudokuSolver
 
 CHOOSE_LEVEL_MESSAGE = """
@@ -45,22 +45,28 @@ class PlaySudoku(SudokuSolver):
               '1': 'Medium',
               '2': 'Hard'}
     
-    # clues has the sense of ['Easy','Medium','Hard']
-    # We randomly decide how many clues the game instance
-    # will have, depending on the difficulty level. The
-    # fewer the clues, the higher the difficulty level.
-    # This is not true in general, but nevertheless,
-    # that's the principle we use here.
-    clues = [randint(36, 42), randint(
-        30, 35), randint(23, 29)]  # randint(74, 78) this is just for testing purposes
-
-    def __init__(self) -> None:
+    def __init__(self, rng=None) -> None:
+        """
+        Takes as input:
+            - rng -> a random.Random all the randomness of the game
+                is drawn from. Pass a seeded one to replay the same
+                games. A fresh, unseeded one if None.
+        """
+        super().__init__(rng=rng)
         self.puzzle = None
         self.indices = None
         self.moves_stack = None
         self.empty_cells = None
+
+        # clues has the sense of ['Easy','Medium','Hard']
+        # We randomly decide how many clues the game instance
+        # will have, depending on the difficulty level. The
+        # fewer the clues, the higher the difficulty level.
+        # This is not true in general, but nevertheless,
+        # that's the principle we use here.
+        self.clues = [self.rng.randint(36, 42), self.rng.randint(
+            30, 35), self.rng.randint(23, 29)]  # randint(74, 78) this is just for testing purposes
         self._generate_board()
-        super().__init__()
 
     def _generate_board(self):
         """
@@ -72,13 +78,13 @@ class PlaySudoku(SudokuSolver):
         board each time the player chooses to play.
         """
         self.puzzle = [[0] * 9 for _ in range(9)]
-        self.puzzle[0][0] = randint(1, 9)
+        self.puzzle[0][0] = self.rng.randint(1, 9)
         self.solveSudoku(True)
 
         # Used to decide which cells get set to empty before the game starts.
         # Shuffled to make it a random choice.
         self.indices = [(i, j) for i in range(9) for j in range(9)]
-        shuffle(self.indices)
+        self.rng.shuffle(self.indices)
 
         # Moves made will be placed here. Needed for when the player
         # needs to undo their last move for whatever reason.
@@ -108,7 +114,8 @@ class PlaySudoku(SudokuSolver):
         Called only once per session by the playGame function.
         Depending on the difficulty level chosen by the player,
         we set a random number of cells in the board to be
-        empty. These are the cells the player needs to fill
+        empty, making sure the board still has a unique
+        solution. These are the cells the player needs to fill
         correctly to complete the game.
 
         Differs from _generate_board because, among other things,
@@ -122,14 +129,16 @@ class PlaySudoku(SudokuSolver):
         """
         game_level = self.chooseLevel()
 
-        # This is just the number of empty cells the
-        # board will have. As we mentioned earlier,
+        # We take clues out of the full board one at a time, in
+        # the random order of self.indices, keeping only the
+        # removals that leave the board with a unique solution, until
+        # the board has the number of clues for the level (or as
+        # close as the board allows). As we mentioned earlier,
         # we decide difficulty based on number of clues
         # (or empty cells) the board has.
-        level = 81 - self.clues[int(game_level)]
-
-        # Leave only the required number of empty cells.
-        self.indices = self.indices[:level]
+        cells = [num for row in self.puzzle for num in row]
+        cells = remove_clues(cells, self.rng, self.clues[int(game_level)])
+        self.indices = [(r, c) for r, c in self.indices if not cells[r * 9 + c]]
         for r, c in self.indices:
             self.puzzle[r][c] = 0
 
@@ -1,12 +1,15 @@
 import tkinter as tk
-from random import randint, shuffle
 from tkinter import ttk
 
-from oop_solver import SudokuGenerator, SudokuSolver
+from oop_solver import PLACE, SudokuGenerator, SudokuSolver
 
 HEIGHT = 540
 WIDTH = 540
 BOX_RATIO = 1/3
+# The solve animation shows one in this many steps of the search.
+# Redrawing the board on every step made solving hard puzzles crawl;
+# _solve_board fills in the steps that were skipped once it's done.
+SOLVE_STEP_EVERY = 25
 
 
 class SudokuGame(SudokuSolver):
@@ -20,21 +23,22 @@ class SudokuGame(SudokuSolver):
     new_game_var = tk.StringVar(root)
     new_game_var.set(CHOOSE_LEVEL)
 
-    clues = [randint(36, 42), randint(
-        30, 35), randint(23, 29)]
-
-    def __init__(self) -> None:
+    def __init__(self, rng=None) -> None:
+        """
+        Takes as input:
+            - rng -> a random.Random all the randomness of the game
+                is drawn from. Pass a seeded one to replay the same
+                games. A fresh, unseeded one if None.
+        """
         self.moves_stack = []
         self.cells_with_str_keys = {}
         self.rows_and_cols_with_cells = {}
         self.can_append = True
         self.puzzle = []
         self.seconds_counter = 0
-        super().__init__(self.puzzle)
-
-    def __init_game(self):
-        self.indices = [(r, c) for r in range(9) for c in range(9)]
-        shuffle(self.indices)
+        super().__init__(self.puzzle, rng)
+        self.clues = [self.rng.randint(36, 42), self.rng.randint(
+            30, 35), self.rng.randint(23, 29)]
 
     def _reset_variables(self):
         self.seconds_counter = 0
@@ -47,16 +51,13 @@ class SudokuGame(SudokuSolver):
         if hasattr(self, 'timer_running'):
             self.stop_timer(self.timer_running)
         self._reset_variables()
-        sudoku = SudokuGenerator()
-        sudoku.generateSudoku()
-        self.puzzle = sudoku.puzzle
-
-        self.__init_game()
-
-        no_of_clues = 81 - self.clues[self.levels.index(input)]
-        self.indices = self.indices[:no_of_clues]
-        for row, col in self.indices:
-            self.puzzle[row][col] = 0
+        # The puzzle comes with its clues already taken out, as
+        # many as the level asks for while keeping its solution
+        # unique.
+        sudoku = SudokuGenerator(self.rng)
+        self.puzzle = sudoku.generatePuzzle(self.clues[self.levels.index(input)])
+        self.indices = [(row, col) for row in range(9) for col in range(9)
+                        if not self.puzzle[row][col]]
 
         self.new_game_var.set(self.CHOOSE_LEVEL)
 
@@ -92,11 +93,37 @@ class SudokuGame(SudokuSolver):
             self.stop_timer(self.timer_running)
             self.seconds_counter = 0
         self.tick()
-        self.solveSudoku()
+        # We animate the search through an observer on the solver,
+        # and don't want its steps to end up in the undo stack.
+        self.can_append = False
+        self.solveSudoku(observer=self._show_solve_step,
+                         observe_every=SOLVE_STEP_EVERY)
+        # Steps the animation skipped (and the solution, which the
+        # solver only writes into self.puzzle at the end) still need
+        # to be shown.
+        for (row, col), cell in self.rows_and_cols_with_cells.items():
+            value = str(self.puzzle[row][col] or '')
+            if cell.get() != value:
+                cell.delete(0, 'end')
+                cell.insert(0, value)
+        self.can_append = True
 
         # This doesn't yet work as intended.
         self.stop_timer(self.timer_running)
 
+    def _show_solve_step(self, event: str, idx: int, digit: int):
+        """
+        Shows a step of the search on the board.
+        Called by the solver for every SOLVE_STEP_EVERY-th step.
+        """
+        cell = self.rows_and_cols_with_cells[divmod(idx, 9)]
+        self.root.update_idletasks()
+        cell.delete(0, 'end')
+        if event == PLACE:
+            cell.insert(0, str(digit))
+        else:
+            cell.configure(foreground='red')
+
     def _get_legal_values(self, row: int, col: int) -> list:
         grid = [self.puzzle[row - row % 3 + i][col - col % 3 + j]
                 for i in range(3)
@@ -243,70 +270,6 @@ class SudokuGame(SudokuSolver):
                 cell.place(relx=(c % 3)*BOX_RATIO, rely=(r % 3) *
                            BOX_RATIO, relwidth=BOX_RATIO, relheight=BOX_RATIO)
 
-    def _recursiveSolveSudoku(self, allzeros: list[tuple], pos=0) -> bool:
-        """
-        The recursive solver for the sudoku.
-        It takes two inputs: 
-            - allzeros -> the list of all empty cells in the puzzle, and
-            - pos -> integer indicating which empty cell we are checking.
-
-        It returns one output:
-            - a boolean indicating whether or not we were able to solve
-                the sudoku.
-        """
-
-        if pos == len(allzeros):
-            # We've successfully processed all empty cells.
-            # This means we have a valid solution.
-            return True
-
-        row, col = allzeros[pos]
-
-        # A list of possible values for this position.
-        not_in = self._get_legal_values(row, col)
-
-        shuffle(not_in)
-
-        ind = 0
-        while ind < len(not_in):
-            # We progressively work through all possible values for the
-            # position by doing the following:
-            #   - take a value from the not_in list,
-            #   - set the current position in the puzzle to be this value,
-            #   - increment pos (that is, move to the next empty cell)
-            #   - if this doesn't work, backtrack (that is, decrement pos
-            #       and reset the current position to be zero again),
-            #       take the next possible value and go back to step 2.
-            #   - Else, return the solution.
-            #
-            # Observe that "works" here means we're able to fill in
-            # values for every empty cell starting from this position
-            # with this choice, and "doesn't work" means, for some empty
-            # cell further ahead, we're unable to find a possible value,
-            # i.e, the not_in list turns out to be empty.
-
-            possible_value = not_in[ind]
-            self.root.update_idletasks()
-            self.rows_and_cols_with_cells[(row, col)].delete(0, 'end')
-            # rows_and_cols_with_cells[(row, col)].configure(foreground='orange')
-            self.rows_and_cols_with_cells[(row, col)].insert(
-                0, str(possible_value))
-            self.puzzle[row][col] = possible_value
-            pos += 1
-            trial = self._recursiveSolveSudoku(allzeros, pos)
-            if not trial:
-                self.root.update_idletasks()
-                self.rows_and_cols_with_cells[(
-                    row, col)].configure(foreground='red')
-                self.puzzle[row][col] = 0
-                pos -= 1
-                ind += 1
-            else:
-                return trial
-
-        # We couldn't find a value that works.
-        return False
-
     def play(self):
         self._add_buttons()
         self._add_frames()
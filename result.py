@@ -0,0 +1,74 @@
+# What became of a solve.
+#   - SOLVED -> the puzzle was solved.
+#   - UNSOLVABLE -> the puzzle has no solution.
+#   - INVALID -> the puzzle isn't a 9 x 9 grid of digits.
+#   - NO_EMPTY_CELLS -> there was nothing left to solve.
+#   - BUDGET_EXCEEDED -> the search ran out of budget first.
+SOLVED = 'solved'
+UNSOLVABLE = 'unsolvable'
+INVALID = 'invalid'
+NO_EMPTY_CELLS = 'no-empty-cells'
+BUDGET_EXCEEDED = 'budget-exceeded'
+STATUSES = (SOLVED, UNSOLVABLE, INVALID, NO_EMPTY_CELLS, BUDGET_EXCEEDED)
+
+
+class SolveResult:
+    """
+    The outcome of a solve, as data. Building one never prints
+    anything; SudokuPrinter.printResult lays it out for people.
+
+    It is truthy only when the puzzle was solved.
+
+    Attributes:
+        - status -> one of STATUSES.
+        - solution -> the solved puzzle as an 81-character str in
+            the one-line format, when SOLVED. None otherwise.
+        - stats -> the SolveStats of the solve, if they were asked
+            for. None otherwise.
+        - warnings -> messages about the puzzle that didn't stop the
+            solve (e.g. too few clues for a unique solution).
+        - message -> why the puzzle wasn't solved. None when SOLVED.
+        - conflicts -> the clues that repeat in a row, column or box
+            (see SudokuValidator.conflicts), if that is why the
+            puzzle is UNSOLVABLE.
+        - exceeded -> the budget.BudgetExceeded, when
+            BUDGET_EXCEEDED.
+    """
+
+    __slots__ = ('status', 'solution', 'stats', 'warnings', 'message',
+                 'conflicts', 'exceeded')
+
+    def __init__(self, status: str, solution=None, warnings=None,
+                 message=None, conflicts=None, exceeded=None) -> None:
+        self.status = status
+        self.solution = solution
+        self.stats = None
+        self.warnings = warnings if warnings is not None else []
+        self.message = message
+        self.conflicts = conflicts if conflicts is not None else []
+        self.exceeded = exceeded
+
+    def rows(self) -> list[str] | None:
+        """
+        Returns the solution as 9 strings of 9 digits, one per row,
+        or None if there is no solution.
+        """
+        if self.solution is None:
+            return None
+        return [self.solution[start:start + 9] for start in range(0, 81, 9)]
+
+    def asDict(self) -> dict:
+        return {
+            'status': self.status,
+            'solution': self.solution,
+            'stats': None if self.stats is None else self.stats.asDict(),
+            'warnings': list(self.warnings),
+            'message': self.message,
+            'conflicts': [conflict.asDict() for conflict in self.conflicts],
+        }
+
+    def __bool__(self) -> bool:
+        return self.status == SOLVED
+
+    def __repr__(self) -> str:
+        return f"SolveResult(status={self.status!r}, solution={self.solution!r})"
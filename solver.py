@@ -1,7 +1,9 @@
 
-from random import shuffle
+from random import Random
 import time
 
+from result import INVALID, NO_EMPTY_CELLS, SOLVED, UNSOLVABLE, SolveResult
+
 PUZZLE_NOT_SOLVABLE = """
 Could not solve puzzle! Please, check that enough clues are given,
 all the given clues are correct, and there are no repeated entries
@@ -14,6 +16,15 @@ unique solution, you need to provide at least 17 correct clues
 (which unfortunately also doesn't guarantee uniqueness, but is
 necessary).
 """
+NO_EMPTY_CELLS_LEFT = "Puzzle has no zero entry."
+
+# The orders in which the search visits empty cells.
+#   - ROW_MAJOR -> fixed row-major order (the default).
+#   - MRV -> most constrained cell first (minimum remaining values),
+#       ties going to the cell that comes first in row-major order.
+ROW_MAJOR = 'row-major'
+MRV = 'mrv'
+STRATEGIES = (ROW_MAJOR, MRV)
 
 
 class SudokuSolver:
@@ -21,13 +32,25 @@ class SudokuSolver:
     A sudoku solver.
     """
 
-    def __init__(self, puzzle=None) -> None:
+    def __init__(self, puzzle=None, rng=None) -> None:
+        """
+        Takes as input:
+            - puzzle -> the sudoku to solve.
+            - rng -> a random.Random for generating sudokus. Pass a
+                seeded one to make the sudokus generated
+                reproducible. A fresh, unseeded one if None.
+        """
+        self.rng = rng if rng is not None else Random()
+        # The rng the search shuffles legal values with. Only set
+        # while generating; solving never shuffles.
+        self.search_rng = None
         if puzzle:
             if isinstance(puzzle, tuple):
                 self.puzzle = list(puzzle)
             else:
                 self.puzzle = puzzle
         self.row_ids = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i']
+        self.nodes = 0
 
     def printSudoku(self, generate=False):
         if generate:
@@ -101,7 +124,7 @@ class SudokuSolver:
         # Ensure cell entries are in range(10).
         return 0 <= self.puzzle[idx1][idx2] <= 9
 
-    def isValidSudoku(self) -> bool:
+    def isValidSudoku(self, quiet=False) -> bool:
         """
         Helper function to check if the given
         puzzle is 'valid'. Called by the
@@ -113,58 +136,120 @@ class SudokuSolver:
             - inner containers are lists/tuples/strings, 
             - cell entries are in range(10).
 
+        If quiet is True, nothing is printed. Either way, what is
+        wrong with an invalid puzzle is left in self.error.
+
         Returns boolean indicating if the sudoku is
         valid or not. 
         """
+        self.error = None
 
         # We permit tuples instead of lists for the puzzle.
         # In such a case, we transform the puzzle into a list.
         # Note that this transformation has already been done
         # in the init function.
         if not isinstance(self.puzzle, list):
-            print("Not a valid 9 X 9 sudoku. It should be either a list or tuple.")
-            return False
+            return self._invalid(
+                "Not a valid 9 X 9 sudoku. It should be either a list or tuple.", quiet)
 
         if len(self.puzzle) != 9:
-            print("Not a valid 9 X 9 sudoku. It should be a 9 x 9 grid.")
-            return False
+            return self._invalid(
+                "Not a valid 9 X 9 sudoku. It should be a 9 x 9 grid.", quiet)
 
         for row_index in range(9):
             # We permit tuples or strings instead of lists for the rows.
             if not self.isRightType((list, (tuple, str)), row_index):
-                print(
-                    "Not a valid 9 X 9 sudoku. Rows should be only lists, tuples or strings of length 9.")
-                return False
+                return self._invalid(
+                    "Not a valid 9 X 9 sudoku. Rows should be only lists, tuples or strings of length 9.", quiet)
 
             for entry_index in range(9):
                 # We also permit ints masked as strs for the cell entries.
                 if not self.isRightType((int, str), row_index, entry_index):
-                    print(
-                        "Not a valid 9 X 9 sudoku. All cell entries should be numerics in range(10).")
-                    return False
+                    return self._invalid(
+                        "Not a valid 9 X 9 sudoku. All cell entries should be numerics in range(10).", quiet)
 
         # All checks are fine.
         return True
 
-    def solveSudoku(self, generate=False):
+    def _invalid(self, error: str, quiet: bool) -> bool:
+        """
+        Records why the puzzle is invalid (and prints it, unless
+        quiet). Called by the isValidSudoku function.
+        """
+        self.error = error
+        if not quiet:
+            print(error)
+        return False
+
+    def solve(self, strategy=ROW_MAJOR) -> SolveResult:
+        """
+        Solves self.puzzle without printing anything. The strategy
+        is as for solveSudoku. On success, the solution is also
+        written into self.puzzle.
+
+        Returns a SolveResult with the status, the solution and any
+        warnings.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy {strategy!r}. Choose one of {STRATEGIES}.")
+        self.nodes = 0
+        self.search_rng = None
+
+        if not self.isValidSudoku(quiet=True):
+            return SolveResult(INVALID, message=self.error)
+
+        allzeros = [(i, k) for i in range(9)
+                    for k in range(9) if self.puzzle[i][k] == 0]
+        if not allzeros:
+            return SolveResult(NO_EMPTY_CELLS, message=NO_EMPTY_CELLS_LEFT)
+
+        # Fewer than 17 clues can't give a unique solution, but we
+        # still attempt to solve the puzzle.
+        warnings = [NOT_ENOUGH_CLUES] if len(allzeros) > 64 else []
+        if self.recursiveSolveSudoku(allzeros, strategy=strategy):
+            solution = ''.join(str(num) for row in self.puzzle for num in row)
+            return SolveResult(SOLVED, solution, warnings)
+        return SolveResult(UNSOLVABLE, warnings=warnings,
+                           message=PUZZLE_NOT_SOLVABLE)
+
+    def solveSudoku(self, generate=False, strategy=ROW_MAJOR):
         """
         Main function.
         Takes as input, a 9 x 9 sudoku represented
         as a list of lists.
 
-        If solved successfully, it prints out the solved puzzle,
-        else, it prints an appropriate message.
+        It prints what the solve (see the solve function) found: if
+        solved successfully, the solved puzzle, else, an appropriate
+        message.
 
         Returns boolean indicating whether or not the puzzle
         was solved successfully.
 
         In the case where the puzzle was found to be invalid
         due to type inconsistencies, it returns None.
+
+        The strategy argument picks the order in which empty
+        cells are visited:
+            - ROW_MAJOR -> fixed row-major order (default).
+            - MRV -> the cell with the fewest legal values first.
+
+        The number of search nodes visited is left in self.nodes.
+
+        Solving is deterministic: legal values are always tried in
+        increasing order. With generate, they are shuffled with
+        self.rng instead.
         """
 
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"Unknown strategy {strategy!r}. Choose one of {STRATEGIES}.")
+        self.nodes = 0
+        self.search_rng = self.rng if generate else None
+
         if generate:
             self.recursiveSolveSudoku([(i, j) for i in range(9) for j in range(9)
-                                       if self.puzzle[i][j] == 0])
+                                       if self.puzzle[i][j] == 0], strategy=strategy)
             return None
 
         # We do a validity check on the puzzle.
@@ -180,46 +265,56 @@ class SudokuSolver:
         self._print_sudoku([['*' if num == 0 else num for num in row]
                            for row in self.puzzle])
 
-        # We collect all empty cells in one place.
-        # This list is what we will use to recursively solve
-        # the sudoku.
-        allzeros = [(i, k) for i in range(9)
-                    for k in range(9) if self.puzzle[i][k] == 0]
+        # The solve itself prints nothing; we print what it found.
+        result = self.solve(strategy)
+        for warning in result.warnings:
+            print(warning)
+        if result.message is not None:
+            print(result.message)
 
-        # No point solving a "solved" puzzle.
-        if not allzeros:
-            print("Puzzle has no zero entry.")
-            return None
-
-        # To be guaranteed a unique solution, the sudoku should have
-        # at least 17 clues correctly placed (or put another way, it
-        # should have at most 64 empty cells). If this is not the case
-        # we print an appropriate message and go on to attempt to
-        # solve the puzzle.
-        if len(allzeros) > 64:
-            print(NOT_ENOUGH_CLUES)
-
-        # We call the recursiveSolveSudoku function to solve
-        # the sudoku.
-        if self.recursiveSolveSudoku(allzeros):
+        if result.status == SOLVED:
             # If we were able to solve the sudoku, we return True
             # and print it out nicely with the _print_sudoku function.
             #
             # For the sake of testing, we also return the solved puzzle
             # as a list of strings (each row is combined into a string).
             self._print_sudoku(self.puzzle)
-            return True, [''.join(str(itm) for itm in row) for row in self.puzzle]
+            return True, result.rows()
+        # No empty cell means there was nothing to solve.
+        return False if result.status == UNSOLVABLE else None
 
-        else:
-            print(PUZZLE_NOT_SOLVABLE)
-            return False
+    def legalValues(self, row: int, col: int) -> list:
+        """
+        Returns the list of values that can legally go in the cell
+        at (row, col).
+        Called by the recursiveSolveSudoku function.
+        """
+
+        # We generate the 3 x 3 sub-grid containing the cell.
+        grid = [self.puzzle[row - row % 3 + i][col - col % 3 + j]
+                for i in range(3)
+                for j in range(3)]
 
-    def recursiveSolveSudoku(self, allzeros: list[tuple], pos=0) -> bool:
+        # We generate this list by eliminating all numbers in the range(1, 10)
+        # currently in
+        #   - the 3 x 3 grid,
+        #   - the row containing this cell, and
+        #   - the column containing this cell.
+        return [j for j in range(1, 10)
+                if j not in self.puzzle[row] and
+                j not in [self.puzzle[k][col] for k in range(9)] and
+                j not in grid]
+
+    def recursiveSolveSudoku(self, allzeros: list[tuple], pos=0,
+                             strategy=ROW_MAJOR) -> bool:
         """
         The recursive solver for the sudoku.
-        It takes two inputs: 
-            - allzeros -> the list of all empty cells in the puzzle, and
-            - pos -> integer indicating which empty cell we are checking.
+        It takes three inputs: 
+            - allzeros -> the list of all empty cells in the puzzle,
+            - pos -> integer indicating which empty cell we are checking, and
+            - strategy -> ROW_MAJOR or MRV. With MRV, the remaining
+                empty cells are scanned for the one with the fewest
+                legal values, which is swapped into position pos.
 
         It returns one output:
             - a boolean indicating whether or not we were able to solve
@@ -231,25 +326,24 @@ class SudokuSolver:
             # This means we have a valid solution.
             return True
 
-        row, col = allzeros[pos]
-
-        # We generate the 3 x 3 sub-grid containing the current empty cell.
-        grid = [self.puzzle[row - row % 3 + i][col - col % 3 + j]
-                for i in range(3)
-                for j in range(3)]
-
-        # A list of possible values for this position.
-        # We generate this list by eliminating all numbers in the range(1, 10)
-        # currently in
-        #   - the 3 x 3 grid,
-        #   - the row containing this cell, and
-        #   - the column containing this cell.
-        not_in = [j for j in range(1, 10)
-                  if j not in self.puzzle[row] and
-                  j not in [self.puzzle[k][col] for k in range(9)] and
-                  j not in grid]
+        if strategy == MRV:
+            # Ties go to the first cell found, so the order is deterministic.
+            best_pos, not_in = pos, None
+            for i in range(pos, len(allzeros)):
+                values = self.legalValues(*allzeros[i])
+                if not_in is None or len(values) < len(not_in):
+                    best_pos, not_in = i, values
+                    if len(values) <= 1:
+                        break
+            allzeros[pos], allzeros[best_pos] = allzeros[best_pos], allzeros[pos]
+            row, col = allzeros[pos]
+        else:
+            row, col = allzeros[pos]
+            # A list of possible values for this position.
+            not_in = self.legalValues(row, col)
 
-        shuffle(not_in)
+        if self.search_rng is not None:
+            self.search_rng.shuffle(not_in)
 
         ind = 0
         while ind < len(not_in):
@@ -270,9 +364,10 @@ class SudokuSolver:
             # i.e, the not_in list turns out to be empty.
 
             possible_value = not_in[ind]
+            self.nodes += 1
             self.puzzle[row][col] = possible_value
             pos += 1
-            trial = self.recursiveSolveSudoku(allzeros, pos)
+            trial = self.recursiveSolveSudoku(allzeros, pos, strategy)
             if not trial:
                 self.puzzle[row][col] = 0
                 pos -= 1
@@ -0,0 +1,237 @@
+"""
+Command-line entry point for batch work.
+
+    python -m sudoku solve [FILE ...] [--jobs N] [--backend NAME]
+                           [--format {line,grid,json}] [--stats]
+                           [--cache DB] [--cache-size N]
+    python -m sudoku generate COUNT [--clues MIN MAX]
+                              [--difficulty {easy,medium,hard}]
+                              [--seed N] [--jobs N] [--output FILE]
+                              [--progress]
+
+Puzzles are read in the one-line format from the files given (or
+from stdin if there are none, or for '-') and one solution is written
+to stdout per puzzle, in the same order. Puzzles with no solution get
+a '# no solution' comment line (or null in json), which readers of
+the one-line format skip. Nothing else goes to stdout, so
+the command can sit in a shell pipeline; --stats are written to
+stderr.
+
+With --cache, solutions are kept in an SQLite database (see
+cache.PersistentCache) that later runs, and other processes running
+at the same time, reuse.
+
+generate writes COUNT puzzles with a unique solution in the one-line
+format (see generation.generate_many), to --output or stdout, with a
+progress counter on stderr if --progress is given.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from cache import PersistentCache
+from corpus import NO_SOLUTION_LINE, PuzzleWriter, read_puzzles
+from generation import DEFAULT_CHUNKSIZE, DEFAULT_CLUES, DIFFICULTIES, generate_many
+from oop_solver import BITMASK, DLX, MRV, SEARCH, STRATEGIES, TEMPLATE, solve_many
+
+NUMPY = 'numpy'
+LINE_FORMAT = 'line'
+GRID_FORMAT = 'grid'
+JSON_FORMAT = 'json'
+FORMATS = (LINE_FORMAT, GRID_FORMAT, JSON_FORMAT)
+
+
+def _readAll(paths: list):
+    """
+    Chains the puzzles of every input, in order. '-' is stdin.
+    """
+    for path in paths:
+        yield from read_puzzles(sys.stdin.buffer if path == '-' else path)
+
+
+def _solutions(puzzles, args):
+    """
+    Yields the solution (str or None) of each puzzle, in order,
+    with the backend picked on the command line.
+    """
+    if args.cache:
+        return _cachedSolutions(puzzles, args)
+    if args.backend == NUMPY:
+        # NumPy is optional, so we only import it when asked to.
+        from numpy_engine import solve_batch
+        return solve_batch(puzzles, strategy=args.strategy, jobs=args.jobs,
+                           chunksize=args.chunksize)
+    return solve_many(puzzles, strategy=args.strategy, jobs=args.jobs,
+                      chunksize=args.chunksize, backend=args.backend)
+
+
+def _cachedSolutions(puzzles, args):
+    """
+    Yields the solution of each puzzle, in order, through the
+    --cache database.
+    """
+    with PersistentCache(args.cache, args.cache_size, args.backend,
+                         args.strategy) as cache:
+        yield from cache.solveMany(puzzles, jobs=args.jobs or os.cpu_count() or 1)
+        if args.stats:
+            print(f"cache hits: {cache.hits}  misses: {cache.misses}  "
+                  f"evictions: {cache.evictions}", file=sys.stderr)
+
+
+def _writeGrid(writer: PuzzleWriter, solution) -> None:
+    """
+    Writes a solution as 9 lines of 9 digits followed by a blank line,
+    or NO_SOLUTION_LINE followed by a blank line if there is none.
+    """
+    if solution is None:
+        writer.writeText(NO_SOLUTION_LINE + '\n\n')
+        return
+    writer.writeText(''.join(solution[start:start + 9] + '\n'
+                             for start in range(0, 81, 9)) + '\n')
+
+
+def solve(args) -> int:
+    """
+    Runs the solve subcommand. Returns the exit status.
+    """
+    start = time.perf_counter()
+    puzzles = _readAll(args.files or ['-'])
+    if args.format == JSON_FORMAT:
+        # The json format repeats the puzzle next to its solution.
+        puzzles, originals = itertools.tee(puzzles)
+    solved = unsolved = 0
+
+    with PuzzleWriter(sys.stdout.buffer) as writer:
+        try:
+            for solution in _solutions(puzzles, args):
+                if solution is None:
+                    unsolved += 1
+                else:
+                    solved += 1
+                if args.format == LINE_FORMAT:
+                    writer.write(solution)
+                elif args.format == GRID_FORMAT:
+                    _writeGrid(writer, solution)
+                else:
+                    record = {'puzzle': str(next(originals)),
+                              'solution': solution}
+                    writer.writeText(json.dumps(record) + '\n')
+        except ValueError as error:
+            print(f"sudoku: {error}", file=sys.stderr)
+            return 1
+
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        total = solved + unsolved
+        rate = total / elapsed if elapsed else 0.0
+        print(f"puzzles: {total}  solved: {solved}  unsolved: {unsolved}  "
+              f"time: {elapsed:.3f}s  rate: {rate:.1f} puzzles/s",
+              file=sys.stderr)
+    return 0
+
+
+def generate(args) -> int:
+    """
+    Runs the generate subcommand. Returns the exit status.
+    """
+    start = time.perf_counter()
+
+    def progress(generated: int, attempts: int) -> None:
+        # We rewrite the same stderr line, so it stays a counter.
+        print(f"\rgenerated: {generated}/{args.count}  attempts: {attempts}",
+              end='', file=sys.stderr, flush=True)
+
+    puzzles = generate_many(args.count, tuple(args.clues), args.difficulty,
+                            args.seed, args.jobs, args.chunksize, args.source,
+                            progress if args.progress else None)
+    with PuzzleWriter(args.output or sys.stdout.buffer) as writer:
+        try:
+            for puzzle in puzzles:
+                writer.write(puzzle)
+        except ValueError as error:
+            print(f"sudoku: {error}", file=sys.stderr)
+            return 1
+    if args.progress:
+        print(file=sys.stderr)
+
+    if writer.count < args.count:
+        print(f"sudoku: only {writer.count} of {args.count} puzzles found; "
+              "try a wider --clues range or another --difficulty",
+              file=sys.stderr)
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        rate = writer.count / elapsed if elapsed else 0.0
+        print(f"puzzles: {writer.count}  time: {elapsed:.3f}s  "
+              f"rate: {rate:.1f} puzzles/s", file=sys.stderr)
+    return 0
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='sudoku', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    solver = commands.add_parser('solve', help="solve puzzles in the one-line format")
+    solver.add_argument('files', nargs='*', metavar='FILE',
+                        help="corpus files to read ('-' or none for stdin)")
+    solver.add_argument('--jobs', '-j', type=int, default=1,
+                        help="worker processes (0 for one per CPU)")
+    solver.add_argument('--chunksize', type=int, default=256,
+                        help="puzzles sent to a worker at a time")
+    solver.add_argument('--backend', choices=(BITMASK, DLX, NUMPY), default=BITMASK)
+    solver.add_argument('--strategy', choices=STRATEGIES, default=MRV)
+    solver.add_argument('--format', choices=FORMATS, default=LINE_FORMAT)
+    solver.add_argument('--stats', action='store_true',
+                        help="print counts and timings to stderr")
+    solver.add_argument('--cache', metavar='DB',
+                        help="SQLite database to keep solutions in across runs")
+    solver.add_argument('--cache-size', type=int, default=0, metavar='N',
+                        help="most solutions kept in the cache (0 for no limit)")
+    solver.set_defaults(run=solve)
+
+    generator = commands.add_parser(
+        'generate', help="generate puzzles with a unique solution")
+    generator.add_argument('count', type=int, metavar='COUNT',
+                           help="number of puzzles to generate")
+    generator.add_argument('--clues', type=int, nargs=2, default=DEFAULT_CLUES,
+                           metavar=('MIN', 'MAX'),
+                           help="range of the number of clues")
+    generator.add_argument('--difficulty', choices=tuple(DIFFICULTIES),
+                           help="only keep puzzles of this difficulty")
+    generator.add_argument('--seed', type=int,
+                           help="seed for reproducible output")
+    generator.add_argument('--jobs', '-j', type=int, default=1,
+                           help="worker processes (0 for one per CPU)")
+    generator.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE,
+                           help="attempts sent to a worker at a time")
+    generator.add_argument('--source', choices=(SEARCH, TEMPLATE), default=TEMPLATE,
+                           help="where the full grids come from")
+    generator.add_argument('--output', '-o', metavar='FILE',
+                           help="corpus file to write (stdout if not given)")
+    generator.add_argument('--progress', action='store_true',
+                           help="show a progress counter on stderr")
+    generator.add_argument('--stats', action='store_true',
+                           help="print counts and timings to stderr")
+    generator.set_defaults(run=generate)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = buildParser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'cache', None) and args.backend == NUMPY:
+        parser.error("--cache works with the bitmask and dlx backends")
+    if getattr(args, 'jobs', 1) == 0:
+        args.jobs = None
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); that's not an error.
+        sys.stderr.close()
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import copy
+import json
+
+import pytest
+import benchmark
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert benchmark.percentile(values, 0.5) == 50
+    assert benchmark.percentile(values, 0.95) == 95
+    assert benchmark.percentile(values, 0.99) == 99
+    assert benchmark.percentile([7], 0.99) == 7
+
+
+@pytest.mark.parametrize("backend", benchmark.DEFAULT_BACKENDS)
+def test_run_corpus(backend):
+    metrics = benchmark.runCorpus(benchmark.CORPORA['easy'], backend, repeat=2)
+    assert metrics['puzzles'] == 2 and metrics['solves'] == 4
+    assert 0 < metrics['median_ms'] <= metrics['p95_ms'] <= metrics['p99_ms']
+    assert metrics['puzzles_per_second'] > 0
+    assert metrics['nodes_per_puzzle'] > 0
+    assert metrics['peak_memory_kb'] > 0
+    assert metrics['budget_exceeded'] == 0
+
+
+def test_run_corpus_timeout():
+    metrics = benchmark.runCorpus(benchmark.CORPORA['hard'][:1], 'list',
+                                  repeat=1, timeout=0)
+    assert metrics['budget_exceeded'] == 1
+
+
+def test_compare_results():
+    report = benchmark.runBenchmarks({'easy': benchmark.CORPORA['easy']},
+                                     ['bitmask'], repeat=1)
+    assert benchmark.compareResults(report, report) == []
+
+    baseline = copy.deepcopy(report)
+    baseline['results']['bitmask']['easy']['puzzles_per_second'] *= 2
+    regressions = benchmark.compareResults(report, baseline, threshold=0.1)
+    assert len(regressions) == 1 and regressions[0].startswith('bitmask/easy')
+    # Pairs missing from the baseline are not compared.
+    assert benchmark.compareResults(report, {'results': {}}) == []
+
+
+def test_main_compare(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    args = ['--backends', 'bitmask', '--corpora', 'easy', '--repeat', '1']
+    assert benchmark.main(args + ['--output', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert set(report['results']['bitmask']) == {'easy'}
+
+    report['results']['bitmask']['easy']['puzzles_per_second'] *= 100
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(report))
+    assert benchmark.main(args + ['--compare', str(baseline)]) == 1
+    assert 'REGRESSION bitmask/easy' in capsys.readouterr().err
+
+
+def test_main_extra_corpus(tmp_path, capsys):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(benchmark.CORPORA['easy'][0] + '\n')
+    assert benchmark.main(['--backends', 'dlx', '--corpora', 'easy',
+                           '--corpus', f'mine={path}', '--repeat', '1']) == 0
+    assert 'mine' in capsys.readouterr().out
+
+
+def test_run_benchmarks_strategies():
+    report = benchmark.runBenchmarks({'hard': benchmark.CORPORA['hard']},
+                                     ['bitmask', 'dlx'], repeat=1)
+    results = report['results']
+    assert set(results) == {'bitmask', 'bitmask-mrv', 'dlx'}
+    assert results['bitmask']['hard']['strategy'] == 'row-major'
+    assert results['bitmask-mrv']['hard']['strategy'] == 'mrv'
+    # Picking the most constrained cell first prunes the search.
+    assert (results['bitmask-mrv']['hard']['nodes_per_puzzle']
+            < results['bitmask']['hard']['nodes_per_puzzle'])
+
+    report = benchmark.runBenchmarks({'hard': benchmark.CORPORA['hard']},
+                                     ['bitmask'], repeat=1, strategies=['mrv'])
+    assert set(report['results']) == {'bitmask-mrv'}
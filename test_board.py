@@ -0,0 +1,88 @@
+import pytest
+from board import Board
+from oop_solver import SudokuSolver, SudokuValidator, solve_many
+
+# Valid and solvable with naked and hidden singles alone.
+easy_puzzle_line = (
+    '003020600900305001001806400008102900'
+    '700000008006708200002609500800203009005010300'
+)
+
+easy_puzzle_rows = [
+    (0, 0, 3, 0, 2, 0, 6, 0, 0),
+    [9, 0, 0, 3, 0, 5, 0, 0, 1],
+    ['0', '0', '1', '8', '0', '6', '4', '0', '0'],
+    '008102900',
+    (7, 0, 0, 0, 0, 0, 0, 0, 8),
+    (0, 0, 6, 7, 0, 8, 2, 0, 0),
+    (0, 0, 2, 6, 0, 9, 5, 0, 0),
+    (8, 0, 0, 2, 0, 3, 0, 0, 9),
+    (0, 0, 5, 0, 1, 0, 3, 0, 0)
+]
+
+
+@pytest.mark.parametrize("line", [
+    easy_puzzle_line,
+    easy_puzzle_line.replace('0', '.'),
+    easy_puzzle_line.encode(),
+    bytearray(easy_puzzle_line.encode()),
+    memoryview(easy_puzzle_line.encode())
+])
+def test_board_from_string(line):
+    board = Board.fromString(line)
+    assert str(board) == easy_puzzle_line
+    assert board[0, 2] == 3 and board[8, 8] == 0
+
+
+@pytest.mark.parametrize("line", [
+    easy_puzzle_line[:80],
+    easy_puzzle_line + '0',
+    easy_puzzle_line[:80] + '*',
+    easy_puzzle_line[:80] + 'é'
+])
+def test_board_from_string_invalid(line):
+    with pytest.raises(ValueError):
+        Board.fromString(line)
+
+
+def test_board_rows_round_trip():
+    board = Board.fromRows(easy_puzzle_rows)
+    assert board == Board.fromString(easy_puzzle_line)
+    assert Board.fromRows(board.toRows()) == board
+
+
+@pytest.mark.parametrize("puzzle", [
+    easy_puzzle_rows[:8],
+    easy_puzzle_rows[:8] + [(0, 0, 5, 0, 1, 0, 3, 0, 10)],
+    easy_puzzle_rows[:8] + [(0, 0, 5, 0, 1, 0, 3, 0, '')],
+    easy_puzzle_rows[:8] + [(0, 0, 5, 0, 1, 0, 3, 0, 1.0)],
+    easy_puzzle_rows[:8] + [{0, 5, 1, 3}],
+    easy_puzzle_rows[:8] + ['0.5010300']
+])
+def test_board_from_rows_invalid(puzzle):
+    with pytest.raises(ValueError):
+        Board.fromRows(puzzle)
+
+
+def test_board_set_item():
+    board = Board()
+    board[4, 5] = 7
+    assert board.cells[41] == 7
+    with pytest.raises(ValueError):
+        board[4, 5] = 10
+
+
+def test_board_copy_is_independent():
+    board = Board.fromString(easy_puzzle_line)
+    copy = board.copy()
+    copy[0, 0] = 4
+    assert board[0, 0] == 0
+
+
+def test_board_with_solver():
+    board = Board.fromString(easy_puzzle_line)
+    assert SudokuValidator(board).isValid
+    solution = SudokuSolver(board).solveSudoku()
+    assert solution[0] and ''.join(solution[1]) == next(solve_many([board]))
+    # The board itself is left alone.
+    assert str(board) == easy_puzzle_line
@@ -0,0 +1,42 @@
+import pickle
+import threading
+
+import pytest
+from budget import (CANCELLED, CHECK_INTERVAL, NODES, TIMEOUT, Budget,
+                    BudgetExceeded)
+
+
+def test_no_limits():
+    assert Budget().check(10 ** 9) == 10 ** 9 + CHECK_INTERVAL
+    assert Budget().remaining() is None
+
+
+@pytest.mark.parametrize("limits", [{'max_nodes': -1}, {'timeout': -0.5}])
+def test_negative_limits(limits):
+    with pytest.raises(ValueError):
+        Budget(**limits)
+
+
+def test_next_check_stops_at_max_nodes():
+    budget = Budget(max_nodes=100)
+    assert budget.check(0) == 100
+    assert Budget(max_nodes=10 ** 6).check(0) == CHECK_INTERVAL
+
+
+@pytest.mark.parametrize("budget, nodes, reason", [
+    (Budget(max_nodes=100), 100, NODES),
+    (Budget(timeout=0), 0, TIMEOUT),
+    (Budget(cancel=threading.Event()), 0, CANCELLED),
+])
+def test_check_raises(budget, nodes, reason):
+    if budget.cancel is not None:
+        budget.cancel.set()
+    with pytest.raises(BudgetExceeded) as info:
+        budget.check(nodes)
+    assert info.value.reason == reason
+
+
+def test_budget_exceeded_is_falsy_and_picklable():
+    exceeded = pickle.loads(pickle.dumps(BudgetExceeded(TIMEOUT)))
+    assert not exceeded
+    assert exceeded.reason == TIMEOUT
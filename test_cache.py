@@ -0,0 +1,181 @@
+from multiprocessing import Pool
+from random import Random
+
+import pytest
+from board import Board
+from cache import FIFO, LRU, PersistentCache, SolutionCache
+from canonical import random_transform
+from oop_solver import DLX, LIST_SCAN, solve_many
+from test_canonical import puzzles
+
+easy, hard, minimal, unsolvable, conflicting = puzzles
+
+
+def variants(line, count, seed=3):
+    rng = Random(seed)
+    cells = Board.fromString(line).cells
+    return [str(Board(random_transform(rng).apply(cells))) for _ in range(count)]
+
+
+@pytest.mark.parametrize('backend', ['bitmask', DLX])
+def test_equivalent_puzzles_solved_once(backend):
+    cache = SolutionCache(backend=backend)
+    lines = [hard] + variants(hard, 4)
+    for line in lines:
+        assert cache.solve(line) == next(solve_many([line]))
+    assert (cache.misses, cache.hits) == (1, 4)
+    assert len(cache) == 1
+
+
+def test_unsolvable_results_are_cached():
+    cache = SolutionCache()
+    for line in [unsolvable, conflicting] + variants(unsolvable, 2):
+        assert cache.solve(line) is None
+    assert (cache.misses, cache.hits) == (2, 2)
+
+
+def test_nested_puzzle():
+    cache = SolutionCache()
+    rows = Board.fromString(easy).toRows()
+    assert cache.solve(rows) == next(solve_many([easy]))
+    assert cache.solve(easy) == next(solve_many([easy]))
+    assert cache.hits == 1
+
+
+def test_lru_eviction():
+    cache = SolutionCache(maxsize=2, eviction=LRU)
+    cache.solve(easy)
+    cache.solve(hard)
+    cache.solve(easy)
+    cache.solve(minimal)
+    assert cache.evictions == 1
+    cache.solve(easy)
+    assert cache.hits == 2
+    cache.solve(hard)
+    assert cache.misses == 4
+
+
+def test_fifo_eviction():
+    cache = SolutionCache(maxsize=2, eviction=FIFO)
+    cache.solve(easy)
+    cache.solve(hard)
+    cache.solve(easy)
+    cache.solve(minimal)
+    assert cache.evictions == 1
+    cache.solve(hard)
+    assert cache.hits == 2
+    cache.solve(easy)
+    assert cache.misses == 4
+
+
+def test_unlimited_size():
+    cache = SolutionCache(maxsize=0)
+    for line in puzzles:
+        cache.solve(line)
+    assert len(cache) == len(puzzles)
+    assert cache.evictions == 0
+
+
+def test_symmetric_puzzle_bypasses_cache():
+    cache = SolutionCache()
+    solution = cache.solve('0' * 81)
+    assert solution is not None and '0' not in solution
+    assert cache.bypasses == 1
+    assert len(cache) == 0
+
+
+def test_clear():
+    cache = SolutionCache()
+    cache.solve(easy)
+    cache.solve(easy)
+    cache.clear()
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+@pytest.mark.parametrize('kwargs', [{'maxsize': -1}, {'eviction': 'random'},
+                                    {'backend': LIST_SCAN}])
+def test_bad_arguments(kwargs):
+    with pytest.raises(ValueError):
+        SolutionCache(**kwargs)
+
+
+def test_invalid_puzzle():
+    with pytest.raises(ValueError):
+        SolutionCache().solve('12x')
+
+
+@pytest.fixture
+def database(tmp_path):
+    return str(tmp_path / 'cache.db')
+
+
+@pytest.mark.parametrize('canonical', [True, False])
+def test_persistent_cache_survives_reopening(database, canonical):
+    lines = [easy, hard, unsolvable, conflicting, hard]
+    expected = list(solve_many(lines))
+    with PersistentCache(database, canonical=canonical) as cache:
+        assert list(cache.solveMany(lines)) == expected
+        assert (cache.misses, cache.hits) == (4, 1)
+    with PersistentCache(database, canonical=canonical) as cache:
+        assert list(cache.solveMany(lines)) == expected
+        assert (cache.misses, cache.hits) == (0, 5)
+
+
+def test_persistent_cache_shares_equivalent_puzzles(database):
+    lines = variants(minimal, 3)
+    with PersistentCache(database) as cache:
+        assert cache.solve(minimal) == next(solve_many([minimal]))
+        for line in lines:
+            assert cache.solve(line) == next(solve_many([line]))
+        assert (cache.misses, cache.hits) == (1, 3)
+
+
+def test_persistent_cache_bulk_api(database):
+    with PersistentCache(database, canonical=False) as cache:
+        cache.putMany([(easy, next(solve_many([easy])), 10, 0.5),
+                       (unsolvable, None, 20, 1.5)])
+        found = cache.getMany([easy, unsolvable, hard])
+    assert found == {easy: (next(solve_many([easy])), 10, 0.5),
+                     unsolvable: (None, 20, 1.5)}
+
+
+def test_persistent_cache_stores_stats(database):
+    with PersistentCache(database, canonical=False) as cache:
+        cache.solve(hard)
+        solution, nodes, seconds = cache.getMany([hard])[hard]
+    assert solution == next(solve_many([hard]))
+    assert nodes > 0 and seconds > 0
+
+
+def test_persistent_cache_evicts_least_recently_used(database):
+    with PersistentCache(database, maxsize=2, canonical=False) as cache:
+        cache.solve(easy)
+        cache.solve(hard)
+        cache.solve(easy)
+        cache.solve(minimal)
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert set(cache.getMany([easy, hard, minimal])) == {easy, minimal}
+
+
+def _solveInProcess(args):
+    database, lines = args
+    with PersistentCache(database) as cache:
+        return list(cache.solveMany(lines))
+
+
+def test_persistent_cache_shared_by_processes(database):
+    lines = [easy, hard, minimal, unsolvable] + variants(hard, 4)
+    with Pool(4) as pool:
+        results = pool.map(_solveInProcess, [(database, lines)] * 4)
+    assert results == [list(solve_many(lines))] * 4
+    with PersistentCache(database) as cache:
+        assert list(cache.solveMany(lines)) == results[0]
+        assert cache.misses == 0
+
+
+def test_persistent_cache_with_workers(database):
+    lines = [easy, hard, minimal, unsolvable]
+    with PersistentCache(database) as cache:
+        assert list(cache.solveMany(lines, jobs=2)) == list(solve_many(lines))
@@ -0,0 +1,52 @@
+from random import Random
+
+import pytest
+from board import Board
+from canonical import canonicalize, random_transform
+
+# Puzzles from the benchmark corpora, one of them with no solution
+# and one with conflicting givens.
+puzzles = [
+    '003020600900305001001806400008102900700000008006708200002609500800203009005010300',
+    '005300000800000020070010500400005300010070006003200080060500009004000030000009700',
+    '000000012003600000000007000410020000000500300700000600280000040000300500000000000',
+    '400100805030000000000700000020000060000080400000010000000603070500200000104000000',
+    '000000702000000702020817009562798104137042890090351627273900000609004073810273956',
+]
+
+
+@pytest.mark.parametrize('line', puzzles)
+def test_transform_round_trip(line):
+    cells = Board.fromString(line).cells
+    canonical, transform = canonicalize(cells)
+    assert transform.apply(cells) == canonical
+    assert transform.revert(canonical) == cells
+
+
+@pytest.mark.parametrize('line', puzzles)
+def test_equivalent_puzzles_share_canonical_form(line):
+    rng = Random(7)
+    cells = Board.fromString(line).cells
+    canonical, _ = canonicalize(cells)
+    for _ in range(5):
+        other = random_transform(rng).apply(cells)
+        assert other != cells
+        assert canonicalize(other)[0] == canonical
+
+
+def test_different_puzzles_have_different_canonical_forms():
+    forms = {bytes(canonicalize(Board.fromString(line).cells)[0])
+             for line in puzzles}
+    assert len(forms) == len(puzzles)
+
+
+def test_canonical_form_relabels_digits_in_order():
+    canonical, _ = canonicalize(Board.fromString(puzzles[1]).cells)
+    seen = [value for value in canonical if value]
+    firsts = list(dict.fromkeys(seen))
+    assert firsts == list(range(1, len(firsts) + 1))
+
+
+def test_too_much_symmetry_gives_up():
+    assert canonicalize(bytes(81)) is None
+    assert canonicalize(Board.fromString(puzzles[0]).cells, max_states=1) is None
@@ -0,0 +1,75 @@
+import io
+
+import pytest
+from board import Board
+from corpus import NO_SOLUTION_LINE, PuzzleWriter, read_puzzles
+from oop_solver import solve_many
+
+easy_puzzle_line = (
+    '003020600900305001001806400008102900'
+    '700000008006708200002609500800203009005010300'
+)
+
+hard_puzzle_line = (
+    '400000805030000000000700000020000060'
+    '000080400000010000000603070500200000104000000'
+)
+
+corpus_text = (
+    '# Two puzzles, with comments and blank lines around them.\n'
+    '\n'
+    + easy_puzzle_line + '\r\n'
+    + '   \n'
+    + '# ' + hard_puzzle_line + '\n'
+    + hard_puzzle_line.replace('0', '.')
+)
+
+
+def test_read_puzzles_from_path(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(corpus_text)
+    assert [str(board) for board in read_puzzles(path)] == [
+        easy_puzzle_line, hard_puzzle_line]
+
+
+def test_read_puzzles_from_stream():
+    stream = io.BytesIO(corpus_text.encode())
+    assert [str(board) for board in read_puzzles(stream)] == [
+        easy_puzzle_line, hard_puzzle_line]
+
+
+def test_read_puzzles_empty_file(tmp_path):
+    path = tmp_path / 'empty.txt'
+    path.write_bytes(b'')
+    assert list(read_puzzles(path)) == []
+
+
+def test_read_puzzles_reports_line_number(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(easy_puzzle_line + '\n\n' + easy_puzzle_line[:80] + '\n')
+    with pytest.raises(ValueError, match='Line 3'):
+        list(read_puzzles(path))
+
+
+def test_puzzle_writer_round_trip(tmp_path):
+    path = tmp_path / 'solutions.txt'
+    puzzles = [easy_puzzle_line, hard_puzzle_line] * 10
+    with PuzzleWriter(path, buffer_size=100) as writer:
+        writer.writeComment('solutions')
+        for solution in solve_many(read_puzzles(io.BytesIO(
+                '\n'.join(puzzles).encode()))):
+            writer.write(solution)
+        writer.write(Board.fromString(easy_puzzle_line))
+        writer.write(None)
+    assert writer.count == 22
+    solutions = [str(board) for board in read_puzzles(path)]
+    assert solutions[:20] == list(solve_many(puzzles))
+    assert solutions[20:] == [easy_puzzle_line]
+    assert path.read_text().splitlines()[-1] == NO_SOLUTION_LINE
+
+
+def test_puzzle_writer_leaves_stream_open():
+    stream = io.BytesIO()
+    with PuzzleWriter(stream) as writer:
+        writer.write(easy_puzzle_line)
+    assert stream.getvalue() == easy_puzzle_line.encode() + b'\n'
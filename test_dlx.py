@@ -0,0 +1,100 @@
+import pytest
+from budget import NODES, Budget, BudgetExceeded
+from dlx import DancingLinks
+
+
+def cells_of(puzzle):
+    return [int(num) for row in puzzle for num in row]
+
+
+# Valid and solvable.
+solvable_puzzle1 = (
+    '100007090',
+    '030020008',
+    '009600500',
+    '005300900',
+    '010080002',
+    '600004000',
+    '300000010',
+    '040000007',
+    '007000300'
+)
+
+solution_to_puzzle1 = (
+    '162857493',
+    '534129678',
+    '789643521',
+    '475312986',
+    '913586742',
+    '628794135',
+    '356478219',
+    '241935867',
+    '897261354'
+)
+
+# Valid in terms of types, but not solvable because
+# the first two rows are the same.
+non_solvable_puzzle1 = (
+    '000000702',
+    '000000702',
+    '020817009',
+    '562798104',
+    '137042890',
+    '090351627',
+    '273900000',
+    '609004073',
+    '810273956'
+)
+
+# The solution to solvable_puzzle1 with a rectangle of 7s and 9s
+# blanked out in the first two rows. They can go either way round.
+two_solution_puzzle1 = (
+    '162850403',
+    '534120608',
+    '789643521',
+    '475312986',
+    '913586742',
+    '628794135',
+    '356478219',
+    '241935867',
+    '897261354'
+)
+
+
+def test_dancing_links_solve():
+    assert DancingLinks(cells_of(solvable_puzzle1)).solve() == cells_of(
+        solution_to_puzzle1)
+
+
+def test_dancing_links_non_solvable():
+    links = DancingLinks(cells_of(non_solvable_puzzle1))
+    assert not links.consistent
+    assert links.solve() is None
+    assert links.count() == 0
+
+
+def test_dancing_links_count_unique():
+    assert DancingLinks(cells_of(solvable_puzzle1)).count() == 1
+
+
+def test_dancing_links_count_two_solutions():
+    assert DancingLinks(cells_of(two_solution_puzzle1)).count() == 2
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5])
+def test_dancing_links_count_stops_at_limit(limit):
+    assert DancingLinks([0] * 81).count(limit) == limit
+
+
+def test_dancing_links_links_restored_after_count():
+    links = DancingLinks(cells_of(solvable_puzzle1))
+    assert links.count(1) == 1
+    assert links.solve() == cells_of(solution_to_puzzle1)
+
+
+def test_solve_with_budget():
+    links = DancingLinks([0] * 81, Budget(max_nodes=10))
+    with pytest.raises(BudgetExceeded) as info:
+        links.solve()
+    assert info.value.reason == NODES
+    assert links.nodes == 10
@@ -0,0 +1,104 @@
+import pytest
+from board import Board
+from canonical import canonicalize
+from generation import DIFFICULTIES, EASY, HARD, MEDIUM, generate_many, rate_puzzle
+from oop_solver import DLX, SEARCH, TEMPLATE, count_solutions
+
+easy_puzzle_line = (
+    '003020600900305001001806400008102900'
+    '700000008006708200002609500800203009005010300'
+)
+
+# Takes 4 digits tried.
+medium_puzzle_line = (
+    '200080004090000601000060820000070000'
+    '589000007070100085000040006017290000005000040'
+)
+
+hard_puzzle_line = (
+    '400000805030000000000700000020000060'
+    '000080400000010000000603070500200000104000000'
+)
+
+
+def _clues(line: str) -> int:
+    return 81 - line.count('0')
+
+
+@pytest.mark.parametrize('source', [SEARCH, TEMPLATE])
+def test_generated_puzzles_have_a_unique_solution(source):
+    puzzles = list(generate_many(12, clues=(24, 30), seed=1, source=source))
+    assert len(puzzles) == 12
+    for line in puzzles:
+        assert len(line) == 81
+        assert 24 <= _clues(line) <= 30
+        assert count_solutions(Board.fromString(line).toRows()) == 1
+
+
+def test_dlx_backend_gives_same_puzzles():
+    assert list(generate_many(4, seed=8, chunksize=4, backend=DLX)) == list(
+        generate_many(4, seed=8, chunksize=4))
+
+
+def test_generated_puzzles_are_distinct_up_to_symmetry():
+    puzzles = list(generate_many(40, clues=(28, 32), seed=2))
+    forms = {bytes(canonicalize(Board.fromString(line).cells)[0]) for line in puzzles}
+    assert len(forms) == len(puzzles)
+
+
+def test_same_seed_gives_same_puzzles_whatever_the_jobs():
+    serial = list(generate_many(20, seed=3, chunksize=8))
+    assert list(generate_many(20, seed=3, chunksize=8)) == serial
+    assert list(generate_many(20, seed=3, chunksize=8, jobs=2)) == serial
+    assert list(generate_many(20, seed=4, chunksize=8)) != serial
+
+
+@pytest.mark.parametrize('difficulty', [EASY, MEDIUM, HARD])
+def test_difficulty_band(difficulty):
+    low, high = DIFFICULTIES[difficulty]
+    for line in generate_many(3, clues=(22, 28), difficulty=difficulty, seed=5):
+        tried = rate_puzzle(Board.fromString(line).cells)
+        assert tried >= low
+        assert high is None or tried <= high
+
+
+@pytest.mark.parametrize('line, difficulty, tried', [
+    (easy_puzzle_line, EASY, 0),
+    (medium_puzzle_line, MEDIUM, 4),
+    (hard_puzzle_line, HARD, 162),
+])
+def test_rate_puzzle(line, difficulty, tried):
+    assert rate_puzzle(Board.fromString(line).cells) == tried
+    low, high = DIFFICULTIES[difficulty]
+    assert low <= tried and (high is None or tried <= high)
+
+
+def test_progress_is_reported():
+    calls = []
+    puzzles = list(generate_many(10, seed=6, chunksize=4,
+                                 progress=lambda *args: calls.append(args)))
+    assert calls
+    assert calls[-1][0] == len(puzzles) == 10
+    assert [attempts for _, attempts in calls] == [4 * k for k in range(1, len(calls) + 1)]
+
+
+def test_gives_up_on_an_unreachable_band():
+    # Puzzles with every clue need no search at all.
+    assert list(generate_many(2, clues=(81, 81), difficulty=HARD, seed=7)) == []
+
+
+@pytest.mark.parametrize('count', [0, -3])
+def test_bad_count(count):
+    with pytest.raises(ValueError):
+        next(generate_many(count))
+
+
+@pytest.mark.parametrize('clues', [(16, 30), (30, 24), (24, 82)])
+def test_bad_clue_range(clues):
+    with pytest.raises(ValueError):
+        next(generate_many(1, clues=clues))
+
+
+def test_bad_difficulty():
+    with pytest.raises(ValueError):
+        next(generate_many(1, difficulty='fiendish'))
@@ -0,0 +1,57 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+import numpy_engine  # noqa: E402
+from oop_solver import solve_many  # noqa: E402
+
+# Solvable with naked and hidden singles alone.
+easy_puzzle1 = (
+    '003020600900305001001806400008102900'
+    '700000008006708200002609500800203009005010300'
+)
+
+# Needs search after propagation.
+hard_puzzle1 = (
+    '400000805030000000000700000020000060'
+    '000080400000010000000603070500200000104000000'
+)
+
+# Valid givens but no solution.
+no_solution_puzzle1 = (
+    '400100805030000000000700000020000060'
+    '000080400000010000000603070500200000104000000'
+)
+
+# The first two rows are the same.
+conflict_puzzle1 = (
+    '000000702000000702020817009562798104'
+    '137042890090351627273900000609004073810273956'
+)
+
+
+def test_candidate_masks():
+    grid = numpy_engine.load_batch([easy_puzzle1, conflict_puzzle1])
+    candidates, conflicts = numpy_engine.candidate_masks(grid)
+    assert candidates.shape == (2, 9, 9)
+    # Cell a1 of easy_puzzle1 can only be 4 or 5.
+    assert candidates[0, 0, 0] == 0b11000
+    assert candidates[0, 0, 2] == 0
+    assert conflicts.tolist() == [False, True]
+
+
+def test_propagate_batch():
+    grid = numpy_engine.load_batch(
+        [easy_puzzle1, hard_puzzle1, conflict_puzzle1])
+    dead = numpy_engine.propagate_batch(grid)
+    assert dead.tolist() == [False, False, True]
+    assert (grid[0] > 0).all()
+    assert (grid[1] == 0).any()
+
+
+def test_solve_batch_matches_solve_many():
+    puzzles = [easy_puzzle1, hard_puzzle1, no_solution_puzzle1,
+               conflict_puzzle1, easy_puzzle1.replace('0', '.')] * 3
+    expected = list(solve_many(puzzles))
+    assert list(numpy_engine.solve_batch(puzzles, batch_size=4)) == expected
+    assert list(numpy_engine.solve_batch(puzzles, batch_size=4, jobs=2,
+                                         chunksize=1)) == expected
@@ -1,5 +1,10 @@
+import sys
+import threading
+from random import Random
+
 import pytest
 import oop_solver as solver
+from budget import CANCELLED, NODES, BudgetExceeded
 
 
 # Invalid puzzle: outer container is a set.
@@ -282,3 +287,710 @@ def test_sudoku_generator():
     sudoku = solver.SudokuGenerator()
     assert sudoku.generateSudoku()
     assert not any(item == 0 for row in sudoku.puzzle for item in row)
+
+
+# Valid and solvable.
+solvable_puzzle1 = [
+    [0, 0, 6, 0, 0, 7, 3, 0, 0],
+    [0, 0, 1, 0, 0, 0, 0, 4, 0],
+    [0, 0, 0, 4, 2, 0, 0, 5, 0],
+    [0, 7, 0, 9, 0, 5, 0, 0, 0],
+    [0, 2, 5, 6, 0, 0, 0, 0, 0],
+    [9, 0, 0, 0, 0, 0, 8, 0, 0],
+    [0, 8, 0, 0, 0, 4, 0, 3, 0],
+    [7, 0, 0, 0, 9, 0, 0, 6, 0],
+    [0, 0, 0, 3, 0, 2, 4, 0, 0]
+]
+
+solution_to_puzzle1 = [
+    '496157382',
+    '251836947',
+    '837429156',
+    '178945623',
+    '325681794',
+    '964273815',
+    '682714539',
+    '743598261',
+    '519362478'
+]
+
+solution_to_puzzle3 = [
+    '162857493',
+    '534129678',
+    '789643521',
+    '475312986',
+    '913586742',
+    '628794135',
+    '356478219',
+    '241935867',
+    '897261354'
+]
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+@pytest.mark.parametrize("puzzle, expected_answer", [
+    (solvable_puzzle1, solution_to_puzzle1),
+    (valid_puzzle3, solution_to_puzzle3)
+])
+def test_sudoku_solver_backends_agree(puzzle, expected_answer, backend):
+    solution = solver.SudokuSolver(
+        [list(row) for row in puzzle]).solveSudoku(backend=backend)
+    assert solution == (True, expected_answer)
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_sudoku_solver_backends_non_solvable(backend):
+    puzzle = [list(row) for row in non_solvable_puzzle1]
+    assert solver.SudokuSolver(puzzle).solveSudoku(backend=backend) is False
+
+
+def test_validator_finds_conflicts():
+    validator = solver.SudokuValidator([list(row) for row in non_solvable_puzzle1])
+    assert validator.isValid
+    assert [(c.unit, c.index, c.digit, c.cells) for c in validator.conflicts] == [
+        (solver.COL_UNIT, 6, 7, ((0, 6), (1, 6))),
+        (solver.COL_UNIT, 8, 2, ((0, 8), (1, 8))),
+        (solver.BOX_UNIT, 2, 2, ((0, 8), (1, 8))),
+        (solver.BOX_UNIT, 2, 7, ((0, 6), (1, 6))),
+    ]
+    assert validator.conflicts[0].asDict() == {
+        'unit': 'column', 'index': 6, 'digit': 7, 'cells': [[0, 6], [1, 6]]}
+
+
+def test_validator_no_conflicts():
+    assert solver.SudokuValidator([list(row) for row in solvable_puzzle1]).conflicts == []
+    assert solver.SudokuValidator(invalid_puzzle1).conflicts == []
+
+
+def test_validator_finds_conflicts_on_boards():
+    board = solver.Board.fromString('5' + '0' * 9 + '5' + '0' * 70)
+    conflicts = solver.SudokuValidator(board).conflicts
+    assert [(c.unit, c.index, c.digit, c.cells) for c in conflicts] == [
+        (solver.BOX_UNIT, 0, 5, ((0, 0), (1, 1)))]
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_conflicting_clues_fail_before_searching(backend, capsys):
+    # Two 1s in the first row of an otherwise empty grid. Without the
+    # check, the list-scan search would take forever to give up.
+    puzzle = [[1, 1] + [0] * 7] + [[0] * 9 for _ in range(8)]
+    sudoku = solver.SudokuSolver(puzzle)
+    result, stats = sudoku.solveSudoku(backend=backend, stats=True)
+    assert result is False
+    assert stats.nodes == 0
+    assert "1 appears in row 0 at (0, 0), (0, 1)" in capsys.readouterr().out
+
+
+def test_sudoku_solver_unknown_backend():
+    with pytest.raises(ValueError):
+        solver.SudokuSolver(valid_puzzle3).solveSudoku(backend='abacus')
+
+
+def test_bitmask_engine_place_and_unplace():
+    engine = solver.BitmaskEngine()
+    assert engine.load(num for row in solvable_puzzle1 for num in row)
+    # Cell a1 sees 6, 7, 3 in its row, 9, 7 in its column
+    # and 6, 1 in its box.
+    assert solver.MASK_DIGITS[engine.candidates(0)] == (2, 4, 5, 8)
+    engine.place(0, 4)
+    assert solver.MASK_DIGITS[engine.candidates(1)] == (5, 9)
+    engine.unplace(0)
+    assert solver.MASK_DIGITS[engine.candidates(1)] == (4, 5, 9)
+
+
+def test_bitmask_engine_detects_conflicting_givens():
+    engine = solver.BitmaskEngine()
+    assert not engine.load(num for row in non_solvable_puzzle1 for num in row)
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+def test_sudoku_solver_strategies_agree(strategy):
+    sudoku = solver.SudokuSolver([list(row) for row in solvable_puzzle1])
+    assert sudoku.solveSudoku(strategy=strategy) == (True, solution_to_puzzle1)
+    assert sudoku.nodes > 0
+
+
+def test_sudoku_solver_mrv_visits_fewer_nodes():
+    row_major = solver.SudokuSolver([list(row) for row in solvable_puzzle1])
+    row_major.solveSudoku(strategy=solver.ROW_MAJOR, propagate=False)
+    mrv = solver.SudokuSolver([list(row) for row in solvable_puzzle1])
+    mrv.solveSudoku(strategy=solver.MRV, propagate=False)
+    assert mrv.nodes < row_major.nodes
+
+
+def test_sudoku_solver_list_scan_rejects_mrv():
+    with pytest.raises(ValueError):
+        solver.SudokuSolver(valid_puzzle3).solveSudoku(
+            backend=solver.LIST_SCAN, strategy=solver.MRV)
+
+
+# Valid and solvable with naked and hidden singles alone.
+easy_puzzle1 = (
+    '003020600',
+    '900305001',
+    '001806400',
+    '008102900',
+    '700000008',
+    '006708200',
+    '002609500',
+    '800203009',
+    '005010300'
+)
+
+solution_to_easy_puzzle1 = [
+    '483921657',
+    '967345821',
+    '251876493',
+    '548132976',
+    '729564138',
+    '136798245',
+    '372689514',
+    '814253769',
+    '695417382'
+]
+
+
+def test_sudoku_solver_propagation_needs_no_search():
+    sudoku = solver.SudokuSolver(easy_puzzle1)
+    assert sudoku.solveSudoku() == (True, solution_to_easy_puzzle1)
+    assert sudoku.nodes == 0 and sudoku.backtracks == 0
+    assert sudoku.propagated == 49
+
+
+@pytest.mark.parametrize("propagate", [True, False])
+def test_sudoku_solver_propagate_option_agrees(propagate):
+    sudoku = solver.SudokuSolver(valid_puzzle3)
+    solution = sudoku.solveSudoku(propagate=propagate)
+    assert solution == (True, solution_to_puzzle3)
+    assert bool(sudoku.propagated) == propagate
+
+
+def test_bitmask_engine_propagate_reports_contradiction():
+    # Row a needs a 1 in its last cell, but column 9 already has one.
+    engine = solver.BitmaskEngine()
+    assert engine.load([2, 3, 4, 5, 6, 7, 8, 9, 0] + [0] * 71 + [1])
+    assert not engine.propagate()
+
+
+def test_bitmask_engine_undo_restores_state():
+    engine = solver.BitmaskEngine()
+    engine.load(num for row in solvable_puzzle1 for num in row)
+    cells = list(engine.cells)
+    assert engine.propagate() and engine.propagated
+    engine.undo(0)
+    assert engine.cells == cells
+
+
+def test_bitmask_engine_search_does_not_recurse():
+    # 81 empty cells and no propagation means 81 nested guesses,
+    # which would blow this recursion limit if search recursed.
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(60)
+    try:
+        engine = solver.BitmaskEngine()
+        engine.load([0] * 81)
+        assert engine.search(list(range(81)))
+    finally:
+        sys.setrecursionlimit(limit)
+    assert all(engine.cells)
+
+
+@pytest.mark.parametrize("strategy", solver.STRATEGIES)
+@pytest.mark.parametrize("propagate", [True, False])
+def test_bitmask_engine_failed_search_restores_state(strategy, propagate):
+    engine = solver.BitmaskEngine()
+    engine.load(num for row in non_solvable_puzzle1 for num in row[::-1])
+    cells = list(engine.cells)
+    empties = [idx for idx in range(81) if not cells[idx]]
+    assert not engine.search(empties, strategy=strategy, propagate=propagate)
+    assert engine.cells == cells and not engine.trail
+
+
+# The solution to valid_puzzle3 with a rectangle of 7s and 9s
+# blanked out in the first two rows. They can go either way round.
+two_solution_puzzle1 = (
+    '162850403',
+    '534120608',
+    '789643521',
+    '475312986',
+    '913586742',
+    '628794135',
+    '356478219',
+    '241935867',
+    '897261354'
+)
+
+
+@pytest.mark.parametrize("puzzle, limit, expected_count", [
+    (valid_puzzle3, 2, 1),
+    (easy_puzzle1, 2, 1),
+    (two_solution_puzzle1, 2, 2),
+    (two_solution_puzzle1, 0, 2),
+    (two_solution_puzzle1, 1, 1),
+    (non_solvable_puzzle1, 2, 0),
+    (('000000000',) * 9, 5, 5)
+])
+def test_count_solutions(puzzle, limit, expected_count):
+    assert solver.count_solutions(puzzle, limit) == expected_count
+
+
+def test_count_solutions_invalid_puzzle(capsys):
+    with pytest.raises(ValueError):
+        solver.count_solutions(invalid_puzzle5)
+    assert capsys.readouterr().out == ''
+
+
+def test_count_solutions_leaves_puzzle_alone():
+    puzzle = [[str(num) for num in row] for row in easy_puzzle1]
+    before = [list(row) for row in puzzle]
+    assert solver.count_solutions(puzzle) == 1
+    assert puzzle == before
+
+
+def test_count_solutions_board():
+    board = solver.Board.fromString(''.join(easy_puzzle1))
+    assert solver.count_solutions(board) == 1
+    assert solver.count_solutions(solver.Board()) == 2
+
+
+def test_bitmask_engine_count_restores_state():
+    engine = solver.BitmaskEngine()
+    engine.load(int(num) for row in two_solution_puzzle1 for num in row)
+    cells = list(engine.cells)
+    empties = [idx for idx in range(81) if not cells[idx]]
+    assert engine.count(empties, 3) == 2
+    assert engine.cells == cells and not engine.trail
+
+
+def test_solve_many():
+    puzzles = [
+        ''.join(easy_puzzle1),
+        ''.join(easy_puzzle1).replace('0', '.').encode(),
+        ''.join(two_solution_puzzle1[:2]) + '0' * 63,
+        ''.join(str(num) for row in non_solvable_puzzle1 for num in row)
+    ]
+    solutions = list(solver.solve_many(puzzles))
+    assert solutions[:2] == [''.join(solution_to_easy_puzzle1)] * 2
+    assert solver.count_solutions([solutions[2][i:i + 9]
+                                   for i in range(0, 81, 9)]) == 1
+    assert solutions[2].startswith('162')
+    assert solutions[3] is None
+
+
+@pytest.mark.parametrize("line", [
+    '0' * 80,
+    '0' * 82,
+    '0' * 80 + 'x',
+    '0' * 80 + ' '
+])
+def test_parse_puzzle_invalid(line):
+    with pytest.raises(ValueError):
+        solver.parse_puzzle(line)
+
+
+def test_parse_and_format_puzzle():
+    line = ''.join(easy_puzzle1)
+    cells = solver.parse_puzzle(memoryview(line.replace('0', '.').encode()))
+    assert list(cells) == [int(num) for num in line]
+    assert solver.format_puzzle(cells) == line
+
+
+# valid_puzzle3 in the one-line format.
+valid_puzzle3_line = (
+    '1....7.9.'
+    '.3..2...8'
+    '..96..5..'
+    '..53..9..'
+    '.1..8...2'
+    '6....4...'
+    '3......1.'
+    '.4......7'
+    '..7...3..'
+)
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_solve_many_parallel(ordered):
+    puzzles = [''.join(easy_puzzle1), valid_puzzle3_line] * 5
+    expected = list(solver.solve_many(puzzles))
+    results = list(solver.solve_many(puzzles, jobs=2, chunksize=3,
+                                     ordered=ordered))
+    if not ordered:
+        assert sorted(index for index, _ in results) == list(range(10))
+        results = [solution for _, solution in sorted(results)]
+    assert results == expected
+
+
+def test_solve_many_parallel_invalid_puzzle():
+    with pytest.raises(ValueError):
+        list(solver.solve_many(['0' * 80] * 4, jobs=2, chunksize=2))
+
+
+# Valid givens with no repeats, but no solution: every branch
+# of the search has to be explored to prove it.
+no_solution_puzzle_line = (
+    '400100805'
+    '030000000'
+    '000700000'
+    '020000060'
+    '000080400'
+    '000010000'
+    '000603070'
+    '500200000'
+    '104000000'
+)
+
+hard_puzzle_line = (
+    '400000805'
+    '030000000'
+    '000700000'
+    '020000060'
+    '000080400'
+    '000010000'
+    '000603070'
+    '500200000'
+    '104000000'
+)
+
+
+def test_sudoku_solver_workers_solve():
+    rows = [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)]
+    expected = solver.SudokuSolver(list(rows)).solveSudoku()
+    sudoku = solver.SudokuSolver(list(rows))
+    assert sudoku.solveSudoku(workers=2) == expected
+    assert sudoku.nodes > 0
+
+
+def test_sudoku_solver_workers_solved_by_propagation():
+    sudoku = solver.SudokuSolver([list(row) for row in easy_puzzle1])
+    result = sudoku.solve(workers=2)
+    assert result.status == solver.SOLVED
+    assert result.rows() == solution_to_easy_puzzle1
+
+
+def test_sudoku_solver_workers_no_solution():
+    rows = [no_solution_puzzle_line[i:i + 9] for i in range(0, 81, 9)]
+    assert solver.SudokuSolver(rows).solveSudoku(workers=2) is False
+
+
+def test_parallel_search_exhausts_subproblems():
+    engine = solver.BitmaskEngine()
+    engine.load(solver.parse_puzzle(no_solution_puzzle_line))
+    cells = list(engine.cells)
+    solution, nodes = solver.parallel_search(engine, 2, split_factor=4)
+    assert solution is None and nodes > 0
+    assert engine.cells == cells
+
+
+def test_sudoku_solver_workers_need_bitmask_backend():
+    with pytest.raises(ValueError):
+        solver.SudokuSolver(valid_puzzle3).solveSudoku(
+            backend=solver.DLX, workers=2)
+
+
+def test_solve_many_dlx_backend():
+    puzzles = [''.join(easy_puzzle1), valid_puzzle3_line, no_solution_puzzle_line]
+    assert list(solver.solve_many(puzzles, backend=solver.DLX)) == list(
+        solver.solve_many(puzzles))
+
+
+def test_solve_many_list_scan_backend():
+    with pytest.raises(ValueError):
+        solver.solve_many([valid_puzzle3_line], backend=solver.LIST_SCAN)
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_solve_is_deterministic(backend):
+    results = set()
+    for _ in range(3):
+        sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+        solution = sudoku.solveSudoku(backend=backend)
+        results.add((tuple(solution[1]), sudoku.nodes))
+    assert len(results) == 1
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_generate_with_seeded_rng(backend):
+    puzzles = []
+    for seed in (3, 3, 4):
+        sudoku = solver.SudokuSolver([[0] * 9 for _ in range(9)], Random(seed))
+        sudoku.solveSudoku(generate=True, backend=backend)
+        puzzles.append(sudoku.puzzle)
+    assert puzzles[0] == puzzles[1]
+    assert puzzles[0] != puzzles[2]
+
+
+def test_sudoku_generator_with_seeded_rng():
+    first = solver.SudokuGenerator(Random(11)).generateSudoku()
+    second = solver.SudokuGenerator(Random(11)).generateSudoku()
+    assert first == second
+    assert not any(item == 0 for row in first for item in row)
+
+
+def test_template_grids():
+    grids = set()
+    for seed in range(20):
+        grid = solver.SudokuGenerator(Random(seed), solver.TEMPLATE).generateSudoku()
+        cells = [num for row in grid for num in row]
+        assert 0 not in cells
+        assert solver.SudokuValidator(grid).conflicts == []
+        grids.add(tuple(cells))
+    assert len(grids) == 20
+
+
+def test_template_grids_are_reproducible():
+    first = solver.SudokuGenerator(Random(4), solver.TEMPLATE)
+    second = solver.SudokuGenerator(Random(4), solver.TEMPLATE)
+    assert first.generatePuzzle(30) == second.generatePuzzle(30)
+    assert solver.count_solutions(first.puzzle) == 1
+
+
+def test_unknown_grid_source():
+    with pytest.raises(ValueError):
+        solver.SudokuGenerator(source='magic')
+
+
+@pytest.mark.parametrize("clues", [0, 25, 32])
+def test_remove_clues_keeps_solution_unique(clues):
+    grid = solver.SudokuGenerator(Random(5)).generateSudoku()
+    solution = [num for row in grid for num in row]
+    cells = solver.remove_clues(solution, Random(5), clues)
+    remaining = 81 - cells.count(0)
+    assert remaining == clues or (clues == 0 and remaining < 30)
+    assert all(cell in (0, digit) for cell, digit in zip(cells, solution))
+    puzzle = [cells[start:start + 9] for start in range(0, 81, 9)]
+    assert solver.count_solutions(puzzle) == 1
+
+
+def test_remove_clues_dlx_backend():
+    grid = solver.SudokuGenerator(Random(6)).generateSudoku()
+    solution = [num for row in grid for num in row]
+    # Both backends agree on every removal, so they end up with the
+    # same puzzle.
+    assert solver.remove_clues(solution, Random(6), 25, backend=solver.DLX) == (
+        solver.remove_clues(solution, Random(6), 25))
+    with pytest.raises(ValueError):
+        solver.remove_clues(solution, Random(6), backend=solver.LIST_SCAN)
+
+
+def test_remove_clues_is_minimal():
+    grid = solver.SudokuGenerator(Random(8)).generateSudoku()
+    cells = solver.remove_clues([num for row in grid for num in row], Random(8))
+    # Taking out any one of the clues left gives a second solution.
+    for idx in range(81):
+        if cells[idx]:
+            fewer = list(cells)
+            fewer[idx] = 0
+            puzzle = [fewer[start:start + 9] for start in range(0, 81, 9)]
+            assert solver.count_solutions(puzzle) == 2
+
+
+def test_generate_puzzle():
+    first = solver.SudokuGenerator(Random(3))
+    second = solver.SudokuGenerator(Random(3))
+    puzzle = first.generatePuzzle(28)
+    assert puzzle == second.generatePuzzle(28)
+    assert sum(1 for row in puzzle for num in row if num) == 28
+    assert solver.count_solutions(puzzle) == 1
+    result = solver.solve(puzzle)
+    assert result.rows() == [''.join(map(str, row)) for row in first.solution]
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_solve_max_nodes(backend):
+    rows = [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)]
+    sudoku = solver.SudokuSolver(rows)
+    result = sudoku.solveSudoku(backend=backend, propagate=False, max_nodes=5)
+    assert isinstance(result, BudgetExceeded) and not result
+    assert result.reason == NODES
+    assert result.nodes == sudoku.nodes == 5
+    # The puzzle is left as it was.
+    assert ''.join(str(num) for row in sudoku.puzzle for num in row) == hard_puzzle_line
+
+
+def test_solve_workers_node_budget_covers_split():
+    sudoku = solver.SudokuSolver(
+        [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)])
+    result = sudoku.solve(workers=2, max_nodes=5)
+    assert result.status == solver.BUDGET_EXCEEDED
+    assert result.exceeded.reason == NODES
+    assert sudoku.nodes == 5
+
+
+@pytest.mark.parametrize("max_nodes", [30, 40, 60])
+def test_solve_workers_node_budget_is_a_cap(max_nodes):
+    sudoku = solver.SudokuSolver(
+        [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)])
+    result = sudoku.solve(workers=2, max_nodes=max_nodes)
+    assert result.status in (solver.SOLVED, solver.BUDGET_EXCEEDED)
+    assert sudoku.nodes <= max_nodes
+    if result.exceeded is not None:
+        assert result.exceeded.nodes == sudoku.nodes
+
+
+@pytest.mark.parametrize("limits", [{'max_nodes': -1}, {'timeout': -1}])
+def test_solve_negative_budget(limits):
+    with pytest.raises(ValueError):
+        solver.SudokuSolver(valid_puzzle3).solve(**limits)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_solve_cancelled(workers):
+    cancel = threading.Event()
+    cancel.set()
+    sudoku = solver.SudokuSolver(
+        [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)])
+    result = sudoku.solveSudoku(strategy=solver.MRV, workers=workers,
+                                cancel=cancel)
+    assert isinstance(result, BudgetExceeded)
+    assert result.reason == CANCELLED
+
+
+def test_solve_within_budget():
+    sudoku = solver.SudokuSolver(
+        [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)])
+    result = sudoku.solveSudoku(max_nodes=10 ** 6, timeout=60)
+    assert result[0] is True
+
+
+@pytest.mark.parametrize("backend", solver.BACKENDS)
+def test_solve_stats(backend):
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    result, stats = sudoku.solveSudoku(backend=backend, stats=True)
+    assert result[1] == solution_to_puzzle3
+    assert stats is sudoku.stats
+    assert stats.backend == backend
+    assert stats.nodes == sudoku.nodes > 0
+    assert 0 < stats.max_depth <= stats.nodes
+    assert stats.total_time >= (stats.validation_time + stats.propagation_time
+                                + stats.search_time) > 0
+    assert set(stats.asDict()) == set(solver.SolveStats.FIELDS)
+
+
+def test_solve_stats_off():
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    assert sudoku.solveSudoku()[1] == solution_to_puzzle3
+    assert sudoku.stats is None
+
+
+def test_solve_stats_budget_exceeded():
+    sudoku = solver.SudokuSolver(
+        [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)])
+    result, stats = sudoku.solveSudoku(propagate=False, max_nodes=5, stats=True)
+    assert isinstance(result, BudgetExceeded)
+    assert stats.nodes == 5
+
+
+def test_solve_observer_replays_search():
+    events = []
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    result = sudoku.solveSudoku(
+        observer=lambda *event: events.append(event))
+    assert result[1] == solution_to_puzzle3
+
+    # Replaying the events over the puzzle gives the solution.
+    cells = [int(num) for num in valid_puzzle3_line.replace('.', '0')]
+    for event, idx, digit in events:
+        if event == solver.PLACE:
+            assert cells[idx] == 0
+            cells[idx] = digit
+        else:
+            assert event == solver.UNPLACE and cells[idx] == digit
+            cells[idx] = 0
+    assert ''.join(map(str, cells)) == ''.join(solution_to_puzzle3)
+    assert sum(event == solver.PLACE for event, _, _ in events) == (
+        sudoku.nodes + sudoku.propagated)
+
+
+def test_solve_observer_every():
+    events = []
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    sudoku.solveSudoku(observer=lambda *event: events.append(event))
+    sampled = []
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    sudoku.solveSudoku(observer=lambda *event: sampled.append(event),
+                       observe_every=5)
+    assert sampled == events[4::5]
+
+
+def test_solve_observer_every_must_be_positive():
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    with pytest.raises(ValueError):
+        sudoku.solve(observer=print, observe_every=0)
+    with pytest.raises(ValueError):
+        solver.BitmaskEngine().observe(print, 0)
+
+
+def test_engine_observe_detach():
+    engine = solver.BitmaskEngine()
+    engine.observe(print)
+    assert 'place' in vars(engine)
+    engine.observe(None)
+    assert 'place' not in vars(engine) and 'unplace' not in vars(engine)
+
+
+@pytest.mark.parametrize("backend, workers", [
+    (solver.DLX, 1), (solver.LIST_SCAN, 1), (solver.BITMASK, 2)])
+def test_solve_observer_unsupported(backend, workers):
+    sudoku = solver.SudokuSolver([list(row) for row in valid_puzzle3])
+    with pytest.raises(ValueError):
+        sudoku.solveSudoku(backend=backend, workers=workers, observer=print)
+
+
+def test_solve_returns_result_without_printing(capsys):
+    puzzle = [list(row) for row in solvable_puzzle1]
+    result = solver.solve(puzzle, stats=True)
+    assert result and result.status == solver.SOLVED
+    assert result.rows() == solution_to_puzzle1
+    assert result.solution == ''.join(solution_to_puzzle1)
+    assert result.stats.nodes > 0
+    assert result.warnings == [] and result.message is None
+    # The puzzle passed in is left alone.
+    assert puzzle == [list(row) for row in solvable_puzzle1]
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize("puzzle, status", [
+    (invalid_puzzle1, solver.INVALID),
+    (invalid_puzzle3, solver.INVALID),
+    (no_zero_entry1, solver.NO_EMPTY_CELLS),
+    (non_solvable_puzzle1, solver.UNSOLVABLE),
+])
+def test_solve_statuses(puzzle, status, capsys):
+    result = solver.solve(puzzle)
+    assert not result
+    assert result.status == status
+    assert result.solution is None and result.message
+    assert capsys.readouterr().out == ''
+
+
+def test_solve_result_details(capsys):
+    result = solver.solve(non_solvable_puzzle1)
+    assert [conflict.digit for conflict in result.conflicts] == [7, 2, 2, 7]
+    assert result.asDict()['conflicts'][0]['unit'] == solver.COL_UNIT
+
+    result = solver.solve([[0] * 9 for _ in range(9)])
+    assert result.status == solver.SOLVED
+    assert result.warnings == [solver.NOT_ENOUGH_CLUES]
+
+    rows = [hard_puzzle_line[i:i + 9] for i in range(0, 81, 9)]
+    result = solver.solve(rows, propagate=False, max_nodes=5)
+    assert result.status == solver.BUDGET_EXCEEDED
+    assert result.exceeded.reason == NODES
+    assert capsys.readouterr().out == ''
+
+
+def test_quiet_validator(capsys):
+    validator = solver.SudokuValidator(invalid_puzzle2, quiet=True)
+    assert not validator.isValid and validator.error
+    assert capsys.readouterr().out == ''
+    solver.SudokuValidator(invalid_puzzle2)
+    assert capsys.readouterr().out.strip() == validator.error
+
+
+def test_printer_prints_results(capsys):
+    printer = solver.SudokuPrinter()
+    printer.printResult(solver.solve(solvable_puzzle1))
+    assert solution_to_puzzle1[0][0] in capsys.readouterr().out
+    printer.printResult(solver.solve(non_solvable_puzzle1))
+    assert 'Could not solve puzzle!' in capsys.readouterr().out
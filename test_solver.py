@@ -1,6 +1,7 @@
+from random import Random
 
-
-from solver import SudokuSolver
+from result import INVALID, NO_EMPTY_CELLS, SOLVED, UNSOLVABLE
+from solver import MRV, SudokuSolver
 import pytest
 
 
@@ -341,3 +342,50 @@ solution_to_puzzle3 = [
 def test_solvable_puzzle(puzzle, expected_answer):
     solution = SudokuSolver(puzzle).solveSudoku()
     assert len(solution) == 2 and solution[1] == expected_answer
+
+
+def test_solvable_puzzle_mrv():
+    # solvable_puzzle3 is all tuples, so earlier tests can't
+    # have solved it in place.
+    sudoku = SudokuSolver([list(row) for row in solvable_puzzle3])
+    solution = sudoku.solveSudoku(strategy=MRV)
+    assert len(solution) == 2 and solution[1] == solution_to_puzzle3
+    assert sudoku.nodes > 0
+
+
+def test_solve_is_deterministic():
+    nodes = set()
+    for _ in range(3):
+        sudoku = SudokuSolver([list(row) for row in solvable_puzzle3])
+        sudoku.solveSudoku()
+        nodes.add(sudoku.nodes)
+    assert len(nodes) == 1
+
+
+def test_generate_with_seeded_rng():
+    puzzles = []
+    for _ in range(2):
+        sudoku = SudokuSolver([[5] + [0] * 8] + [[0] * 9 for _ in range(8)],
+                              rng=Random(7))
+        sudoku.solveSudoku(generate=True)
+        puzzles.append(sudoku.puzzle)
+    assert puzzles[0] == puzzles[1]
+    assert all(num for row in puzzles[0] for num in row)
+
+
+def test_solve_returns_result_without_printing(capsys):
+    result = SudokuSolver([list(row) for row in solvable_puzzle3]).solve()
+    assert result.status == SOLVED
+    assert result.rows() == list(solution_to_puzzle3)
+    assert capsys.readouterr().out == ''
+
+
+@pytest.mark.parametrize("puzzle, status", [
+    (invalid_puzzle2, INVALID),
+    (no_zero_entry1, NO_EMPTY_CELLS),
+    (non_solvable_puzzle1, UNSOLVABLE),
+])
+def test_solve_statuses(puzzle, status, capsys):
+    result = SudokuSolver(puzzle).solve()
+    assert not result and result.status == status and result.message
+    assert capsys.readouterr().out == ''
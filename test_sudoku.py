@@ -0,0 +1,152 @@
+import io
+import json
+import sys
+
+import pytest
+import sudoku
+from corpus import NO_SOLUTION_LINE
+from oop_solver import solve_many
+
+easy_puzzle_line = (
+    '003020600900305001001806400008102900'
+    '700000008006708200002609500800203009005010300'
+)
+
+hard_puzzle_line = (
+    '400000805030000000000700000020000060'
+    '000080400000010000000603070500200000104000000'
+)
+
+# Two 1s in the first row.
+conflicting_puzzle_line = '11' + '0' * 79
+
+corpus_text = (
+    '# A comment line.\n'
+    + easy_puzzle_line + '\n'
+    + conflicting_puzzle_line + '\n'
+    + hard_puzzle_line.replace('0', '.') + '\n'
+)
+
+expected_lines = [
+    next(iter(solve_many([easy_puzzle_line]))),
+    NO_SOLUTION_LINE,
+    next(iter(solve_many([hard_puzzle_line]))),
+]
+
+
+@pytest.fixture
+def corpus_file(tmp_path):
+    path = tmp_path / 'corpus.txt'
+    path.write_text(corpus_text)
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", ['bitmask', 'dlx'])
+def test_solve_line_format(corpus_file, capsysbinary, backend):
+    assert sudoku.main(['solve', corpus_file, '--backend', backend]) == 0
+    out, err = capsysbinary.readouterr()
+    assert out.decode().splitlines() == expected_lines
+    assert err == b''
+
+
+def test_solve_from_stdin(monkeypatch, capsysbinary):
+    monkeypatch.setattr(sys, 'stdin',
+                        io.TextIOWrapper(io.BytesIO(corpus_text.encode())))
+    assert sudoku.main(['solve']) == 0
+    assert capsysbinary.readouterr().out.decode().splitlines() == expected_lines
+
+
+def test_solve_several_files_in_order(corpus_file, capsysbinary):
+    assert sudoku.main(['solve', corpus_file, corpus_file]) == 0
+    out = capsysbinary.readouterr().out.decode().splitlines()
+    assert out == expected_lines * 2
+
+
+def test_solve_parallel(corpus_file, capsysbinary):
+    assert sudoku.main(['solve', corpus_file, '--jobs', '2', '--chunksize', '1']) == 0
+    assert capsysbinary.readouterr().out.decode().splitlines() == expected_lines
+
+
+def test_solve_grid_format(corpus_file, capsysbinary):
+    assert sudoku.main(['solve', corpus_file, '--format', 'grid']) == 0
+    blocks = capsysbinary.readouterr().out.decode().split('\n\n')
+    assert blocks[-1] == ''
+    assert [block.replace('\n', '') for block in blocks[:-1]] == expected_lines
+
+
+def test_solve_output_reads_back(corpus_file, tmp_path, capsysbinary):
+    # The no solution line must not read back as the empty grid.
+    assert sudoku.main(['solve', corpus_file]) == 0
+    output = tmp_path / 'solutions.txt'
+    output.write_bytes(capsysbinary.readouterr().out)
+    assert sudoku.main(['solve', str(output)]) == 0
+    assert capsysbinary.readouterr().out.decode().splitlines() == [
+        expected_lines[0], expected_lines[2]]
+
+
+def test_solve_json_format(corpus_file, capsysbinary):
+    assert sudoku.main(['solve', corpus_file, '--format', 'json']) == 0
+    records = [json.loads(line) for line in
+               capsysbinary.readouterr().out.decode().splitlines()]
+    assert [record['puzzle'] for record in records] == [
+        easy_puzzle_line, conflicting_puzzle_line, hard_puzzle_line]
+    assert [record['solution'] for record in records] == [
+        expected_lines[0], None, expected_lines[2]]
+
+
+def test_solve_stats_go_to_stderr(corpus_file, capsysbinary):
+    assert sudoku.main(['solve', corpus_file, '--stats']) == 0
+    out, err = capsysbinary.readouterr()
+    assert out.decode().splitlines() == expected_lines
+    assert b'puzzles: 3  solved: 2  unsolved: 1' in err
+
+
+def test_solve_invalid_line(tmp_path, capsysbinary):
+    path = tmp_path / 'bad.txt'
+    path.write_text(easy_puzzle_line + '\n' + '0' * 80 + '\n')
+    assert sudoku.main(['solve', str(path)]) == 1
+    out, err = capsysbinary.readouterr()
+    assert b'Line 2' in err
+
+
+@pytest.mark.parametrize("options", [[], ['--jobs', '2', '--chunksize', '1']])
+def test_solve_numpy_backend(corpus_file, capsysbinary, options):
+    pytest.importorskip('numpy')
+    assert sudoku.main(['solve', corpus_file, '--backend', 'numpy'] + options) == 0
+    assert capsysbinary.readouterr().out.decode().splitlines() == expected_lines
+
+
+def test_solve_with_cache(corpus_file, tmp_path, capsysbinary):
+    database = str(tmp_path / 'cache.db')
+    for misses in (b'misses: 3', b'misses: 0'):
+        assert sudoku.main(['solve', corpus_file, '--cache', database, '--stats']) == 0
+        out, err = capsysbinary.readouterr()
+        assert out.decode().splitlines() == expected_lines
+        assert misses in err
+
+
+def test_generate(tmp_path, capsysbinary):
+    assert sudoku.main(['generate', '5', '--seed', '1', '--clues', '26', '30']) == 0
+    lines = capsysbinary.readouterr().out.decode().splitlines()
+    assert len(lines) == 5
+    assert all(26 <= 81 - line.count('0') <= 30 for line in lines)
+
+    output = tmp_path / 'generated.txt'
+    assert sudoku.main(['generate', '5', '--seed', '1', '--clues', '26', '30',
+                        '--output', str(output), '--progress']) == 0
+    out, err = capsysbinary.readouterr()
+    assert out == b''
+    assert b'generated: 5/5' in err
+    assert output.read_text().splitlines() == lines
+
+
+def test_generate_bad_clue_range(capsysbinary):
+    assert sudoku.main(['generate', '5', '--clues', '30', '20']) == 1
+    assert b'clue range' in capsysbinary.readouterr().err
+
+
+def test_generate_nothing(capsysbinary):
+    assert sudoku.main(['generate', '0']) == 1
+    out, err = capsysbinary.readouterr()
+    assert out == b''
+    assert b'at least 1' in err